@@ -0,0 +1,195 @@
+import gc
+import hashlib
+import os
+import pickle
+import tempfile
+from Interpreter import Interpreter
+from Statement import Stmt
+
+# Bump whenever the syntax tree classes or the resolver output change,
+# so entries written by an older interpreter are never loaded.
+INTERPRETER_VERSION = 11
+
+class ASTCache:
+    def __init__(self, directory, max_bytes = 64 * 1024 * 1024):
+        """Initializes an ASTCache object, a
+        directory of parsed and resolved scripts
+        keyed by a hash of their source and the
+        interpreter version. When the entries grow
+        past max_bytes, the least recently used
+        ones are evicted. Entries are pickled, so
+        loading one from a directory someone else
+        can write to may run their code.
+        >>> cache = ASTCache('cache', 1024)
+        >>> cache.directory, cache.max_bytes
+        ('cache', 1024)
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def key(self, source):
+        """Returns the hex digest identifying
+        source, which may be a str, bytes or a
+        memory-mapped file.
+        >>> cache = ASTCache('cache')
+        >>> cache.key('print 1;') == cache.key(b'print 1;')
+        True
+        >>> cache.key('print 1;') == cache.key('print 2;')
+        False
+        """
+        if isinstance(source, str):
+            source = source.encode('utf-8')
+        digest = hashlib.sha256(f"plox {INTERPRETER_VERSION}\0".encode('utf-8'))
+        digest.update(source)
+        return digest.hexdigest()
+
+    def path(self, source):
+        """Returns the path of the entry
+        for source.
+        """
+        return os.path.join(self.directory, self.key(source) + '.loxc')
+
+    def load(self, source):
+        """Returns an Interpreter holding the
+        cached syntax tree of source, with the
+        resolver output stored on its nodes and the
+        global cells they are bound to, ready
+        to interpret, or None when
+        there is no usable entry: an entry that does
+        not unpickle to the version, statements and
+        names store writes is a miss, and is removed.
+        Entries are pickles, and unpickling can run
+        any code the file asks for, so the cache
+        directory must be one only trusted users can
+        write to. The garbage collector
+        is paused while the tree is unpickled, since its
+        passes over millions of fresh nodes would cost
+        more than the load itself.
+        >>> import tempfile
+        >>> from Parser import Parser
+        >>> from Resolver import Resolver
+        >>> from Scanner import Scanner
+        >>> cache = ASTCache(tempfile.mkdtemp())
+        >>> source = "var a = 1; { var b = a + 1; print b; }"
+        >>> cache.load(source)
+        >>> interpreter = Interpreter(Parser(Scanner(source).get_tokens()).parse())
+        >>> Resolver(interpreter).resolve(interpreter.tree)
+        >>> cache.store(source, interpreter)
+        True
+        >>> cached = cache.load(source)
+        >>> variable = cached.tree[1].statements[1].expression
+        >>> len(cached.tree), variable.access, variable.slot
+        (2, 0, 0)
+        >>> cached.interpret(cached.tree)
+        2
+        >>> with open(cache.path(source), 'wb') as file:
+        ...     pickle.dump((INTERPRETER_VERSION, 1, []), file)
+        >>> cache.load(source), os.path.exists(cache.path(source))
+        (None, False)
+        >>> with open(cache.path(source), 'wb') as file:
+        ...     __ = file.write(b'not a pickle')
+        >>> cache.load(source), os.path.exists(cache.path(source))
+        (None, False)
+        """
+        path = self.path(source)
+        if not os.path.exists(path):
+            return None
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            with open(path, 'rb') as file:
+                version, tree, global_names = pickle.load(file)
+            if not is_entry(version, tree, global_names):
+                raise ValueError(f"{path} is not a cache entry")
+            os.utime(path)
+        except Exception:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        finally:
+            if collecting:
+                gc.enable()
+
+        interpreter = Interpreter(tree)
+        for name in global_names:
+            interpreter.globals.slot(name)
+        return interpreter
+
+    def store(self, source, interpreter):
+        """Writes the resolved syntax tree and
+        the global names held by interpreter, in
+        cell order, as the entry for
+        source, then evicts old entries. Returns
+        whether the entry was written. Trees too deep
+        to pickle on the Python stack, which the
+        resolver marked deep, are skipped, and so is
+        a tree holding a value pickle cannot write.
+        >>> from Interpreter import Interpreter
+        >>> cache = ASTCache(tempfile.mkdtemp())
+        >>> interpreter = Interpreter([lambda: None])
+        >>> cache.store('print 1;', interpreter), os.listdir(cache.directory)
+        (False, [])
+        """
+        if len(interpreter.deep_nodes) > 0:
+            return False
+        temporary = None
+        try:
+            os.makedirs(self.directory, exist_ok = True)
+            with tempfile.NamedTemporaryFile(dir = self.directory, suffix = '.tmp', delete = False) as file:
+                temporary = file.name
+                pickle.dump((INTERPRETER_VERSION, interpreter.tree, list(interpreter.globals.names)), file, pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, self.path(source))
+        except (OSError, RecursionError, pickle.PicklingError, TypeError, AttributeError):
+            if temporary != None and os.path.exists(temporary):
+                os.remove(temporary)
+            return False
+        self.evict()
+        return True
+
+    def evict(self):
+        """Removes the least recently used
+        entries until the cache fits in
+        max_bytes.
+        >>> import os, tempfile
+        >>> cache = ASTCache(tempfile.mkdtemp(), 100)
+        >>> for i, name in enumerate(['old', 'mid', 'new']):
+        ...     with open(os.path.join(cache.directory, name + '.loxc'), 'wb') as file:
+        ...         __ = file.write(b'x' * 40)
+        ...     os.utime(file.name, (i, i))
+        >>> cache.evict()
+        >>> sorted(os.listdir(cache.directory))
+        ['mid.loxc', 'new.loxc']
+        """
+        entries = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if name.endswith('.loxc'):
+                status = os.stat(os.path.join(self.directory, name))
+                entries.append((status.st_mtime, status.st_size, name))
+                total += status.st_size
+        entries.sort()
+        for __, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            total -= size
+
+def is_entry(version, tree, global_names):
+    """Checks that an unpickled entry is one
+    store wrote: the current version, a list of
+    statements and a list of global names.
+    >>> is_entry(INTERPRETER_VERSION, [], ['clock']), is_entry(INTERPRETER_VERSION, 1, [])
+    (True, False)
+    """
+    return (version == INTERPRETER_VERSION and type(tree) is list and type(global_names) is list
+        and all(isinstance(statement, Stmt) for statement in tree)
+        and all(type(name) is str for name in global_names))
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,620 @@
+import struct
+import sys
+from array import array
+from ExprSubClasses import Assign, Binary, Call, Get, Grouping, Literal, Logical, Set, Super, This, Unary, Variable
+from StmtSubClasses import Block, Class, Expression, If, Function, Print, Return, While, Var
+from Expression import Expr
+from InlineCache import InlineCache
+from Operators import OPERATIONS, OPERATION_CODES
+from Statement import Stmt
+from Scanner import TOKEN_TYPES, TOKEN_CODES
+from Token import Token
+
+# How every field of a node is kept in its operand slot: the index of a
+# child node, of a token or of a constant, or the position in the lists
+# array of a count followed by node or token indices. -1 stands for None.
+# The Resolver output follows the fields in the same operand block.
+FIELD_LAYOUTS = {
+    Assign:('TOKEN', 'NODE'),
+    Binary:('NODE', 'TOKEN', 'NODE'),
+    Call:('NODE', 'TOKEN', 'NODES'),
+    Get:('NODE', 'TOKEN'),
+    Grouping:('NODE',),
+    Literal:('VALUE',),
+    Logical:('NODE', 'TOKEN', 'NODE'),
+    Set:('NODE', 'TOKEN', 'NODE'),
+    Super:('TOKEN', 'TOKEN'),
+    This:('TOKEN',),
+    Unary:('TOKEN', 'NODE'),
+    Variable:('TOKEN',),
+    Block:('NODES',),
+    Class:('TOKEN', 'NODE', 'NODES'),
+    Expression:('NODE',),
+    If:('NODE', 'NODE', 'NODE'),
+    Function:('TOKEN', 'TOKENS', 'NODES'),
+    Print:('NODE',),
+    Return:('TOKEN', 'NODE'),
+    While:('NODE', 'NODE'),
+    Var:('TOKEN', 'NODE')
+}
+NODE_CLASSES = tuple(FIELD_LAYOUTS)
+KIND_CODES = {node_class:code for code, node_class in enumerate(NODE_CLASSES)}
+
+# Serialized form: a header followed by the raw bytes of every array in
+# ARRAY_SECTIONS order and the UTF-8 text of the string table.
+MAGIC = b'LOXA'
+FORMAT_VERSION = 7
+ARRAY_SECTIONS = (
+    ('kinds', 'B'),
+    ('starts', 'I'),
+    ('operands', 'i'),
+    ('lists', 'i'),
+    ('token_types', 'B'),
+    ('token_lines', 'I'),
+    ('token_lexemes', 'i'),
+    ('token_literals', 'i'),
+    ('constant_tags', 'B'),
+    ('constant_numbers', 'd'),
+    ('constant_strings', 'i'),
+    ('string_lengths', 'I')
+)
+HEADER = struct.Struct('<4sBBq' + 'Q' * (len(ARRAY_SECTIONS) + 1))
+CONSTANT_TAGS = {type(None):0, bool:1, float:2, str:3}
+ARENA_SECTIONS = ARRAY_SECTIONS[:8]
+
+# How the Resolver output stored on nodes is kept after their fields: a
+# number, the position in the lists array of a count followed by
+# numbers, the code of an operator handler, or 0 for an inline cache,
+# which lives in the caches table of the arena. -1 stands for None.
+RESOLUTION_LAYOUTS = {
+    'operation':'OPERATION',
+    'cache':'CACHE',
+    'access':'INT',
+    'slot':'INT',
+    'this_access':'INT',
+    'this_slot':'INT',
+    'upvalues':'INTS',
+    'cells':'INTS'
+}
+
+class ArenaNode:
+    __slots__ = ('arena', 'index')
+
+    def __init__(self, arena, index):
+        """Initializes an ArenaNode object, a
+        view of node index of arena. Views are made
+        on demand, so two views of the same node
+        compare and hash equal.
+        >>> from Parser import Parser
+        >>> from Scanner import Scanner
+        >>> arena = from_tree(Parser(Scanner("print 1;").get_tokens()).parse())
+        >>> statement = arena.statements()[0]
+        >>> statement
+        <Print 0>
+        >>> statement == arena.node(0), hash(statement) == hash(arena.node(0))
+        (True, True)
+        >>> statement.expression == statement
+        False
+        """
+        self.arena = arena
+        self.index = index
+
+    def __eq__(self, other):
+        """Returns whether other is a view
+        of the same node.
+        """
+        return isinstance(other, ArenaNode) and other.arena is self.arena and other.index == self.index
+
+    def __hash__(self):
+        """Returns the hash of the node index.
+        """
+        return self.index
+
+    def __repr__(self):
+        """Returns a string naming the kind
+        and index of the node.
+        """
+        return f"<{type(self).__name__} {self.index}>"
+
+def node_field(offset):
+    """Returns a property reading a child
+    node from operand offset.
+    """
+    def get(self):
+        arena = self.arena
+        child = arena.operands[arena.starts[self.index] + offset]
+        if child == -1:
+            return None
+        return VIEW_CLASSES[arena.kinds[child]](arena, child)
+    return property(get)
+
+def token_field(offset):
+    """Returns a property reading a token
+    from operand offset.
+    """
+    def get(self):
+        arena = self.arena
+        return arena.token(arena.operands[arena.starts[self.index] + offset])
+    return property(get)
+
+def value_field(offset):
+    """Returns a property reading a constant
+    from operand offset.
+    """
+    def get(self):
+        arena = self.arena
+        return arena.constants[arena.operands[arena.starts[self.index] + offset]]
+    return property(get)
+
+def nodes_field(offset):
+    """Returns a property reading a list
+    of child nodes from operand offset.
+    """
+    def get(self):
+        arena = self.arena
+        position = arena.operands[arena.starts[self.index] + offset]
+        return [arena.node(child) for child in arena.lists[position + 1:position + 1 + arena.lists[position]]]
+    return property(get)
+
+def tokens_field(offset):
+    """Returns a property reading a list
+    of tokens from operand offset.
+    """
+    def get(self):
+        arena = self.arena
+        position = arena.operands[arena.starts[self.index] + offset]
+        return [arena.token(token) for token in arena.lists[position + 1:position + 1 + arena.lists[position]]]
+    return property(get)
+
+def int_field(offset):
+    """Returns a property reading and
+    writing a number at operand offset, so the
+    Resolver can store its output on views.
+    Output stored on the object tree is carried
+    over by from_tree.
+    >>> from Interpreter import Interpreter
+    >>> from Parser import Parser
+    >>> from Resolver import Resolver
+    >>> from Scanner import Scanner
+    >>> tree = Parser(Scanner("var g; { var a; var b; print b + g; }").get_tokens()).parse()
+    >>> Resolver(Interpreter(tree)).resolve(tree)
+    >>> addition = from_bytes(from_tree(tree).to_bytes()).statements()[1].statements[2].expression
+    >>> (addition.left.access, addition.left.slot), (addition.right.access, addition.right.slot)
+    ((0, 1), (None, 1))
+    >>> addition.right.slot = 3
+    >>> addition.right.slot
+    3
+    """
+    def get(self):
+        arena = self.arena
+        value = arena.operands[arena.starts[self.index] + offset]
+        if value == -1:
+            return None
+        return value
+    def set(self, value):
+        arena = self.arena
+        arena.operands[arena.starts[self.index] + offset] = -1 if value == None else value
+    return property(get, set)
+
+def ints_field(offset):
+    """Returns a property reading and
+    writing a tuple of numbers, kept in the
+    lists array at the position in operand
+    offset. Every write appends a new list.
+    >>> from Interpreter import Interpreter
+    >>> from Parser import Parser
+    >>> from Resolver import Resolver
+    >>> from Scanner import Scanner
+    >>> tree = from_tree(Parser(Scanner("fun f(a) { fun g() { return a; } }").get_tokens()).parse()).statements()
+    >>> Resolver(Interpreter(tree)).resolve(tree)
+    >>> tree[0].cells, tree[0].body[0].upvalues, tree[0].body[0].cells
+    ((0,), (0,), ())
+    """
+    def get(self):
+        arena = self.arena
+        position = arena.operands[arena.starts[self.index] + offset]
+        if position == -1:
+            return None
+        return tuple(arena.lists[position + 1:position + 1 + arena.lists[position]])
+    def set(self, value):
+        arena = self.arena
+        if value == None:
+            position = -1
+        else:
+            position = len(arena.lists)
+            arena.lists.append(len(value))
+            arena.lists.extend(value)
+        arena.operands[arena.starts[self.index] + offset] = position
+    return property(get, set)
+
+def operation_field(offset):
+    """Returns a property reading and
+    writing the operator handler whose code
+    is at operand offset.
+    >>> from Interpreter import Interpreter
+    >>> from Parser import Parser
+    >>> from Resolver import Resolver
+    >>> from Scanner import Scanner
+    >>> tree = Parser(Scanner("print -1 < 2;").get_tokens()).parse()
+    >>> Resolver(Interpreter(tree)).resolve(tree)
+    >>> comparison = from_bytes(from_tree(tree).to_bytes()).statements()[0].expression
+    >>> comparison.operation.__name__, comparison.left.operation.__name__
+    ('less', 'negate')
+    """
+    def get(self):
+        arena = self.arena
+        code = arena.operands[arena.starts[self.index] + offset]
+        if code == -1:
+            return None
+        return OPERATIONS[code]
+    def set(self, value):
+        arena = self.arena
+        arena.operands[arena.starts[self.index] + offset] = -1 if value == None else OPERATION_CODES[value]
+    return property(get, set)
+
+def cache_field(offset):
+    """Returns a property reading and
+    writing the inline cache of a node, kept
+    in the caches table of the arena by node
+    index. Caches are not serialized, so a
+    node loaded with one gets an empty cache
+    the first time it is read.
+    >>> from Interpreter import Interpreter
+    >>> from Parser import Parser
+    >>> from Resolver import Resolver
+    >>> from Scanner import Scanner
+    >>> tree = Parser(Scanner("var a; print a.size;").get_tokens()).parse()
+    >>> Resolver(Interpreter(tree)).resolve(tree)
+    >>> get = from_bytes(from_tree(tree).to_bytes()).statements()[1].expression
+    >>> get.cache.name, get.cache is get.cache
+    ('size', True)
+    """
+    def get(self):
+        arena = self.arena
+        cache = arena.caches.get(self.index)
+        if cache == None and arena.operands[arena.starts[self.index] + offset] != -1:
+            cache = arena.caches[self.index] = InlineCache(self.name.get_lexeme())
+        return cache
+    def set(self, value):
+        arena = self.arena
+        arena.operands[arena.starts[self.index] + offset] = -1 if value == None else 0
+        if value == None:
+            arena.caches.pop(self.index, None)
+        else:
+            arena.caches[self.index] = value
+    return property(get, set)
+
+FIELD_PROPERTIES = {
+    'NODE':node_field,
+    'TOKEN':token_field,
+    'VALUE':value_field,
+    'NODES':nodes_field,
+    'TOKENS':tokens_field,
+    'INT':int_field,
+    'INTS':ints_field,
+    'OPERATION':operation_field,
+    'CACHE':cache_field
+}
+
+def node_layouts(node_class):
+    """Returns the layouts of the operand
+    block of node_class: its fields, then the
+    Resolver output it stores.
+    >>> node_layouts(Variable)
+    ('TOKEN', 'INT', 'INT')
+    """
+    resolution = node_class.__slots__[len(node_class.fields):]
+    return FIELD_LAYOUTS[node_class] + tuple(RESOLUTION_LAYOUTS[field] for field in resolution)
+
+def view_class(node_class):
+    """Returns the view class standing in for
+    node_class: it has the same name, fields and
+    accept method, with every field read from the
+    arena, and is registered as a virtual subclass
+    of node_class.
+    >>> view_class(Binary).fields
+    ('left', 'operator', 'right')
+    >>> issubclass(view_class(Binary), Expr), issubclass(view_class(Print), Stmt)
+    (True, True)
+    >>> issubclass(view_class(Print), Print)
+    True
+    """
+    namespace = {'__slots__':(), 'fields':node_class.fields, 'accept':node_class.accept}
+    for offset, field in enumerate(node_class.__slots__):
+        namespace[field] = FIELD_PROPERTIES[node_layouts(node_class)[offset]](offset)
+    base = Expr if issubclass(node_class, Expr) else Stmt
+    view = type(node_class.__name__, (ArenaNode, base), namespace)
+    node_class.register(view)
+    return view
+
+VIEW_CLASSES = tuple(view_class(node_class) for node_class in NODE_CLASSES)
+
+class Arena:
+    def __init__(self):
+        """Initializes an empty Arena object, a
+        syntax tree stored as parallel arrays: one
+        kind code and operand start per node, the
+        operands themselves, followed by the
+        Resolver output, lists of children, and
+        tables of tokens, constants and strings,
+        and the inline caches of its nodes.
+        Nodes are plain indices, and the Resolver and
+        Interpreter read them through ArenaNode views.
+        >>> arena = Arena()
+        >>> len(arena), arena.roots
+        (0, -1)
+        """
+        self.kinds = array('B')
+        self.starts = array('I')
+        self.operands = array('i')
+        self.lists = array('i')
+        self.token_types = array('B')
+        self.token_lines = array('I')
+        self.token_lexemes = array('i')
+        self.token_literals = array('i')
+        self.tokens = []
+        self.constants = []
+        self.strings = []
+        self.caches = {}
+        self.roots = -1
+
+    def __len__(self):
+        """Returns the number of nodes.
+        """
+        return len(self.kinds)
+
+    def node(self, index):
+        """Returns a view of node index.
+        """
+        return VIEW_CLASSES[self.kinds[index]](self, index)
+
+    def token(self, index):
+        """Returns token index, building the
+        Token object the first time it is read.
+        """
+        if index == -1:
+            return None
+        token = self.tokens[index]
+        if token == None:
+            lexeme = self.token_lexemes[index]
+            literal = self.token_literals[index]
+            token = Token(TOKEN_TYPES[self.token_types[index]], self.token_lines[index],
+                None if lexeme == -1 else self.strings[lexeme],
+                None if literal == -1 else self.constants[literal])
+            self.tokens[index] = token
+        return token
+
+    def statements(self):
+        """Returns views of the top-level
+        statements, which the Resolver and Interpreter
+        take in place of the Parser's tree.
+        >>> from Parser import Parser
+        >>> from Scanner import Scanner
+        >>> from Interpreter import Interpreter
+        >>> from Resolver import Resolver
+        >>> source = '''
+        ... class A { init(n) { this.n = n; } twice() { return this.n * 2; } }
+        ... fun count(limit) { var i = 0; while (i < limit) i = i + 1; return i; }
+        ... print A(count(3)).twice();'''
+        >>> tree = from_bytes(from_tree(Parser(Scanner(source).get_tokens()).parse()).to_bytes()).statements()
+        >>> interpreter = Interpreter(tree)
+        >>> Resolver(interpreter).resolve(tree)
+        >>> interpreter.interpret(tree)
+        6
+        """
+        count = self.lists[self.roots]
+        return [None if index == -1 else self.node(index) for index in self.lists[self.roots + 1:self.roots + 1 + count]]
+
+    def to_bytes(self):
+        """Serializes the arena without pickle:
+        a header of section lengths followed by the
+        raw bytes of every array.
+        >>> from Parser import Parser
+        >>> from Scanner import Scanner
+        >>> arena = from_tree(Parser(Scanner('var a = "x"; print a + "y";').get_tokens()).parse())
+        >>> data = arena.to_bytes()
+        >>> data[:4]
+        b'LOXA'
+        >>> copy = from_bytes(data)
+        >>> copy.statements()[1].expression.right.value, copy.statements()[0].name
+        ('y', Token('IDENTIFIER', 1, 'a', None))
+        """
+        constant_tags = array('B')
+        constant_numbers = array('d')
+        constant_strings = array('i')
+        string_indices = {text:index for index, text in enumerate(self.strings)}
+        strings = list(self.strings)
+        for value in self.constants:
+            tag = CONSTANT_TAGS[type(value)]
+            constant_tags.append(tag)
+            if tag == 1:
+                constant_numbers.append(1.0 if value else 0.0)
+            elif tag == 2:
+                constant_numbers.append(value)
+            elif tag == 3:
+                if value not in string_indices:
+                    string_indices[value] = len(strings)
+                    strings.append(value)
+                constant_strings.append(string_indices[value])
+        encoded = [text.encode('utf-8') for text in strings]
+        string_lengths = array('I', [len(text) for text in encoded])
+
+        sections = {'constant_tags':constant_tags, 'constant_numbers':constant_numbers,
+            'constant_strings':constant_strings, 'string_lengths':string_lengths}
+        arrays = [sections[name] if name in sections else getattr(self, name) for name, __ in ARRAY_SECTIONS]
+        text = b''.join(encoded)
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, sys.byteorder == 'big', self.roots, *[len(section) for section in arrays], len(text))
+        return b''.join([header] + [section.tobytes() for section in arrays] + [text])
+
+def from_tree(statements):
+    """Returns an Arena holding the syntax tree
+    rooted at the statements the Parser returned.
+    The tree is walked with an explicit stack, so
+    any nesting depth converts.
+    >>> from Parser import Parser
+    >>> from Scanner import Scanner
+    >>> arena = from_tree(Parser(Scanner("fun f(a, b) { return a * -b; }").get_tokens()).parse())
+    >>> function = arena.statements()[0]
+    >>> [parameter.get_lexeme() for parameter in function.params]
+    ['a', 'b']
+    >>> product = function.body[0].value
+    >>> product, product.operator.get_lexeme(), product.right.right.name.get_lexeme()
+    (<Binary 2>, '*', 'b')
+    >>> len(arena), len(arena.tokens)
+    (6, 8)
+    """
+    arena = Arena()
+    tokens = {}
+    constants = {}
+    strings = {}
+
+    def add_string(text):
+        if text == None:
+            return -1
+        index = strings.get(text)
+        if index == None:
+            index = strings[text] = len(arena.strings)
+            arena.strings.append(text)
+        return index
+
+    def add_constant(value):
+        key = (type(value), value)
+        index = constants.get(key)
+        if index == None:
+            index = constants[key] = len(arena.constants)
+            arena.constants.append(value)
+        return index
+
+    def add_token(token):
+        if token == None:
+            return -1
+        index = tokens.get(id(token))
+        if index == None:
+            index = tokens[id(token)] = len(arena.token_types)
+            arena.token_types.append(TOKEN_CODES[token.TOKEN_TYPE])
+            arena.token_lines.append(token.LINE)
+            arena.token_lexemes.append(add_string(token.LEXEME))
+            arena.token_literals.append(-1 if token.LITERAL == None else add_constant(token.LITERAL))
+            arena.tokens.append(token)
+        return index
+
+    def add_list(count):
+        position = len(arena.lists)
+        arena.lists.append(count)
+        arena.lists.extend(array('i', bytes(4 * count)))
+        return position
+
+    pending = []
+    arena.roots = add_list(len(statements))
+    for i, statement in enumerate(statements):
+        pending.append((statement, arena.lists, arena.roots + 1 + i))
+
+    while len(pending) > 0:
+        node, target, position = pending.pop()
+        if node == None:
+            target[position] = -1
+            continue
+        index = len(arena.kinds)
+        target[position] = index
+        layouts = node_layouts(type(node))
+        start = len(arena.operands)
+        arena.kinds.append(KIND_CODES[type(node)])
+        arena.starts.append(start)
+        arena.operands.extend(array('i', bytes(4 * len(layouts))))
+        for offset, layout in enumerate(layouts):
+            value = getattr(node, node.__slots__[offset])
+            if layout == 'INT':
+                arena.operands[start + offset] = -1 if value == None else value
+            elif layout == 'OPERATION':
+                arena.operands[start + offset] = -1 if value == None else OPERATION_CODES[value]
+            elif layout == 'CACHE':
+                arena.operands[start + offset] = -1 if value == None else 0
+                if value != None:
+                    arena.caches[index] = value
+            elif layout == 'INTS':
+                if value == None:
+                    arena.operands[start + offset] = -1
+                else:
+                    list_position = add_list(len(value))
+                    arena.operands[start + offset] = list_position
+                    for i, number in enumerate(value):
+                        arena.lists[list_position + 1 + i] = number
+            elif layout == 'NODE':
+                pending.append((value, arena.operands, start + offset))
+            elif layout == 'TOKEN':
+                arena.operands[start + offset] = add_token(value)
+            elif layout == 'VALUE':
+                arena.operands[start + offset] = add_constant(value)
+            elif layout == 'NODES':
+                list_position = add_list(len(value))
+                arena.operands[start + offset] = list_position
+                for i, child in enumerate(value):
+                    pending.append((child, arena.lists, list_position + 1 + i))
+            else:
+                list_position = add_list(len(value))
+                arena.operands[start + offset] = list_position
+                for i, token in enumerate(value):
+                    arena.lists[list_position + 1 + i] = add_token(token)
+    return arena
+
+def from_bytes(data):
+    """Returns the Arena serialized in data by
+    Arena.to_bytes. Arrays are copied straight from
+    the buffer and tokens are only built when read,
+    so loading creates almost no Python objects.
+    >>> from_bytes(b'LOXB')
+    Traceback (most recent call last):
+    ...
+    ValueError: not a serialized arena
+    """
+    view = memoryview(data)
+    if len(view) < HEADER.size or bytes(view[:4]) != MAGIC:
+        raise ValueError("not a serialized arena")
+    fields = HEADER.unpack_from(view)
+    __, version, big_endian, roots = fields[:4]
+    lengths = fields[4:]
+    if version != FORMAT_VERSION:
+        raise ValueError(f"unsupported arena format {version}")
+
+    arena = Arena()
+    sections = {}
+    offset = HEADER.size
+    for (name, typecode), length in zip(ARRAY_SECTIONS, lengths):
+        section = array(typecode)
+        end = offset + length * section.itemsize
+        section.frombytes(view[offset:end])
+        if big_endian != (sys.byteorder == 'big'):
+            section.byteswap()
+        sections[name] = section
+        offset = end
+    text = bytes(view[offset:offset + lengths[-1]])
+
+    strings = []
+    position = 0
+    for length in sections['string_lengths']:
+        strings.append(sys.intern(text[position:position + length].decode('utf-8')))
+        position += length
+    constants = []
+    numbers = iter(sections['constant_numbers'])
+    texts = iter(sections['constant_strings'])
+    for tag in sections['constant_tags']:
+        if tag == 0:
+            constants.append(None)
+        elif tag == 1:
+            constants.append(next(numbers) == 1.0)
+        elif tag == 2:
+            constants.append(next(numbers))
+        else:
+            constants.append(strings[next(texts)])
+
+    for name, __ in ARENA_SECTIONS:
+        setattr(arena, name, sections[name])
+    arena.tokens = [None] * len(arena.token_types)
+    arena.constants = constants
+    arena.strings = strings
+    arena.roots = roots
+    return arena
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
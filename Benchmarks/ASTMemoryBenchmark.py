@@ -0,0 +1,43 @@
+"""Measures the bytes used per syntax tree node
+by the Parser on a generated script. Tokens are
+scanned before tracing starts, so only the nodes
+and the lists holding them are counted.
+Usage: python Benchmarks/ASTMemoryBenchmark.py [size ...]
+Sizes accept KB/MB/GB suffixes (default 2MB).
+"""
+import sys
+import tracemalloc
+from BenchmarkUtils import generate_source, parse_sizes
+from Expression import Expr
+from Statement import Stmt
+from Scanner import Scanner
+from Parser import Parser
+
+def count_nodes(statements):
+    """Counts the nodes reachable from
+    statements by following the fields tuple
+    of every node class.
+    >>> count_nodes(Parser(Scanner("print -(1 + a);").get_tokens()).parse())
+    6
+    """
+    count = 0
+    pending = list(statements)
+    while len(pending) > 0:
+        node = pending.pop()
+        if isinstance(node, list):
+            pending.extend(node)
+        elif isinstance(node, (Expr, Stmt)):
+            count += 1
+            for field in node.fields:
+                pending.append(getattr(node, field))
+    return count
+
+if __name__ == '__main__':
+    for size in parse_sizes(sys.argv[1:], [2 * 1000 ** 2]):
+        tokens = Scanner(generate_source(size)).get_tokens()
+        tracemalloc.start()
+        tree = Parser(tokens).parse()
+        current, __ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        nodes = count_nodes(tree)
+        print(f"{size / 1000 ** 2:8.1f} MB  {nodes:9d} nodes  {current / 1000 ** 2:8.1f} MB  {current / nodes:6.1f} bytes/node")
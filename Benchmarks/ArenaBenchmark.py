@@ -0,0 +1,87 @@
+"""Compares the object syntax tree with the flat
+ArenaAST on a generated script: memory held once
+loaded, load time from pickle versus from_bytes,
+serialized size, and resolving time. Execution speed
+is compared on a small recursive program.
+Usage: python Benchmarks/ArenaBenchmark.py [size ...]
+Sizes accept KB/MB/GB suffixes (default 100KB 1MB).
+"""
+import contextlib
+import gc
+import io
+import pickle
+import sys
+import tracemalloc
+from BenchmarkUtils import generate_source, best_time, parse_sizes
+import ArenaAST
+from Scanner import Scanner
+from Interpreter import Interpreter
+from Parser import Parser
+from Resolver import Resolver
+
+PROGRAM = """
+fun fib(n) { if (n < 2) return n; return fib(n - 2) + fib(n - 1); }
+var total = 0;
+for (var i = 0; i < 20000; i = i + 1) total = total + i;
+print fib(17) + total;
+"""
+
+def traced(load):
+    """Returns the result of load and the
+    bytes it left allocated.
+    """
+    tracemalloc.start()
+    result = load()
+    current, __ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+def unpickle(data):
+    """Loads a pickled tree the way ASTCache
+    does, with the garbage collector paused.
+    """
+    gc.disable()
+    try:
+        return pickle.loads(data)
+    finally:
+        gc.enable()
+
+def resolve(statements):
+    """Resolves statements and returns
+    the interpreter.
+    """
+    interpreter = Interpreter(statements)
+    Resolver(interpreter).resolve(statements)
+    return interpreter
+
+def run(statements):
+    """Resolves and interprets statements,
+    discarding what they print.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        interpreter = resolve(statements)
+        interpreter.interpret(statements)
+
+if __name__ == '__main__':
+    sys.setrecursionlimit(10000)
+    for size in parse_sizes(sys.argv[1:], [100 * 1000, 1000 ** 2]):
+        tree = Parser(Scanner(generate_source(size)).get_tokens()).parse()
+        pickled = pickle.dumps(tree, pickle.HIGHEST_PROTOCOL)
+        flat = ArenaAST.from_tree(tree).to_bytes()
+        __, tree_bytes = traced(lambda: unpickle(pickled))
+        arena, arena_bytes = traced(lambda: ArenaAST.from_bytes(flat))
+        nodes = len(arena)
+        pickle_load, __ = best_time(lambda: unpickle(pickled))
+        arena_load, __ = best_time(lambda: ArenaAST.from_bytes(flat))
+        tree_resolve, __ = best_time(lambda: resolve(tree))
+        arena_resolve, __ = best_time(lambda: resolve(ArenaAST.from_bytes(flat).statements()))
+        print(f"{size / 1000 ** 2:6.2f} MB  {nodes:8d} nodes")
+        print(f"    memory   objects {tree_bytes / nodes:6.1f} B/node   arena {arena_bytes / nodes:6.1f} B/node")
+        print(f"    size     pickle {len(pickled) / 1000 ** 2:7.2f} MB   arena {len(flat) / 1000 ** 2:7.2f} MB")
+        print(f"    load     pickle {pickle_load * 1000:7.1f} ms   arena {arena_load * 1000:7.1f} ms  ({pickle_load / arena_load:5.1f}x)")
+        print(f"    resolve  objects {tree_resolve * 1000:6.1f} ms   arena {arena_resolve * 1000:7.1f} ms  ({arena_resolve / tree_resolve:5.2f}x slower)")
+
+    tree = Parser(Scanner(PROGRAM).get_tokens()).parse()
+    objects, __ = best_time(lambda: run(tree))
+    arena, __ = best_time(lambda: run(ArenaAST.from_tree(tree).statements()))
+    print(f"run fib(17) + loop  objects {objects * 1000:7.1f} ms   arena {arena * 1000:7.1f} ms  ({arena / objects:5.2f}x slower)")
@@ -0,0 +1,47 @@
+"""Times the execution backends selectable from
+Core.py on call-heavy, loop-heavy and method-heavy
+Lox programs. Scanning, parsing and resolving are not
+timed; compiling is, as it happens on every run.
+Usage: python Benchmarks/BackendBenchmark.py [backend ...]
+"""
+import sys
+from BenchmarkUtils import best_time, prepare, run
+from Core import BACKENDS
+
+PROGRAMS = {
+    'fib': """
+fun fib(n) { if (n < 2) return n; return fib(n - 2) + fib(n - 1); }
+print fib(20);
+""",
+    'loops': """
+fun run(n) {
+    var total = 0;
+    for (var i = 0; i < n; i = i + 1) {
+        var j = 0;
+        while (j < 10) { total = total + i * j; j = j + 1; }
+    }
+    return total;
+}
+print run(10000);
+""",
+    'methods': """
+class Counter {
+    init() { this.count = 0; }
+    add(n) { this.count = this.count + n; return this; }
+}
+class Doubler < Counter { add(n) { return super.add(n * 2); } }
+fun run(n) { var counter = Doubler(); for (var i = 0; i < n; i = i + 1) counter.add(i); return counter.count; }
+print run(30000);
+"""
+}
+
+if __name__ == '__main__':
+    backends = sys.argv[1:] or BACKENDS
+    for name, source in PROGRAMS.items():
+        baseline = None
+        for backend in backends:
+            interpreters = iter([prepare(source) for __ in range(3)])
+            seconds, output = best_time(lambda: run(next(interpreters), backend))
+            if baseline == None:
+                baseline = seconds
+            print(f"{name:8s} {backend:9s} {seconds * 1000:8.1f} ms  {baseline / seconds:5.2f}x  -> {output.strip()}")
@@ -0,0 +1,139 @@
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Core import execute
+from Scanner import Scanner
+from Interpreter import Interpreter
+from Parser import Parser
+from Resolver import Resolver
+
+UNIT_TEMPLATE = """// generated unit {index}
+var counter{index} = {index};
+var label{index} = "unit {index} label";
+fun step{index}(a, b) {{
+    var total = a + b * 2 - 1;
+    if (total >= 100.5 and a != b) {{
+        total = total / 2;
+    }} else {{
+        total = -total;
+    }}
+    return total;
+}}
+class Point{index} {{
+    init(x, y) {{
+        this.x = x;
+        this.y = y;
+    }}
+    sum() {{
+        return this.x + this.y;
+    }}
+}}
+for (var i = 0; i < 3; i = i + 1) {{
+    counter{index} = step{index}(counter{index}, i);
+}}
+print Point{index}(counter{index}, 2).sum() <= 10 or !false;
+"""
+
+def generate_source(size):
+    """Returns generated lox source code
+    of at least size characters, built by
+    repeating UNIT_TEMPLATE with fresh names.
+    >>> source = generate_source(1000)
+    >>> len(source) >= 1000
+    True
+    >>> source.startswith("// generated unit 0")
+    True
+    """
+    units = []
+    length = 0
+    index = 0
+    while length < size:
+        unit = UNIT_TEMPLATE.format(index = index)
+        units.append(unit)
+        length += len(unit)
+        index += 1
+    return "".join(units)
+
+def write_source(file_path, size):
+    """Writes generated lox source code of
+    at least size characters to file_path, one
+    unit at a time, and returns the number of
+    bytes written.
+    >>> import os, tempfile
+    >>> file_path = os.path.join(tempfile.mkdtemp(), 'unit.lox')
+    >>> write_source(file_path, 10) == os.path.getsize(file_path)
+    True
+    """
+    written = 0
+    index = 0
+    with open(file_path, 'w') as file:
+        while written < size:
+            unit = UNIT_TEMPLATE.format(index = index)
+            file.write(unit)
+            written += len(unit)
+            index += 1
+    return written
+
+def best_time(function, repeat = 3):
+    """Calls function repeat times and returns
+    the fastest wall-clock time in seconds
+    together with the last result.
+    """
+    best = None
+    result = None
+    for __ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        if best == None or elapsed < best:
+            best = elapsed
+    return best, result
+
+def prepare(source):
+    """Returns a resolved interpreter
+    for source.
+    """
+    interpreter = Interpreter(Parser(Scanner(source).get_tokens()).parse())
+    Resolver(interpreter).resolve(interpreter.tree)
+    return interpreter
+
+def run(interpreter, backend = 'tree'):
+    """Runs the tree of interpreter once
+    with backend, returning what it printed.
+    >>> run(prepare("print 1 + 2;"), 'vm')
+    '3\\n'
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        execute(interpreter, backend)
+    return output.getvalue()
+
+def parse_sizes(arguments, default):
+    """Parses command-line sizes such as
+    '2MB' or '512KB' into a list of
+    character counts.
+    >>> parse_sizes(['2MB', '512KB', '100'], [])
+    [2000000, 512000, 100]
+    >>> parse_sizes([], [10])
+    [10]
+    """
+    if len(arguments) == 0:
+        return list(default)
+    UNITS = {"KB":1000, "MB":1000 ** 2, "GB":1000 ** 3}
+    sizes = []
+    for argument in arguments:
+        argument = argument.upper()
+        if argument[-2:] in UNITS:
+            sizes.append(int(float(argument[:-2]) * UNITS[argument[-2:]]))
+        else:
+            sizes.append(int(argument))
+    return sizes
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,48 @@
+"""Measures the start of run_file with and without
+an ASTCache: cold runs scan, parse and resolve the
+script, warm runs load the cached syntax tree and
+resolver output instead. Interpretation is not timed.
+Usage: python Benchmarks/CacheBenchmark.py [size ...]
+Sizes accept KB/MB/GB suffixes (default 10KB 100KB 1MB 4MB).
+"""
+import os
+import sys
+import tempfile
+from BenchmarkUtils import write_source, best_time, parse_sizes
+from ASTCache import ASTCache
+from Scanner import Scanner, mapped_source
+from Interpreter import Interpreter
+from Parser import Parser
+from Resolver import Resolver
+from TokenBuffer import TokenBuffer
+
+def front_end(file_path, cache = None):
+    """Returns an Interpreter ready to run the
+    script at file_path, the way run_file builds it.
+    """
+    with open(file_path, 'rb') as file, mapped_source(file) as source:
+        if cache != None:
+            interpreter = cache.load(source)
+            if interpreter != None:
+                return interpreter
+        scnr = Scanner(source)
+        parser = Parser(TokenBuffer(scnr.iter_tokens()), scnr)
+        interpreter = Interpreter(parser.parse())
+        Resolver(interpreter).resolve(interpreter.tree)
+        if cache != None:
+            cache.store(source, interpreter)
+        return interpreter
+
+if __name__ == '__main__':
+    directory = tempfile.mkdtemp()
+    cache = ASTCache(os.path.join(directory, 'cache'), max_bytes = 1 << 40)
+    for size in parse_sizes(sys.argv[1:], [10 * 1000, 100 * 1000, 1000 ** 2, 4 * 1000 ** 2]):
+        file_path = os.path.join(directory, f'script{size}.lox')
+        write_source(file_path, size)
+        cold, __ = best_time(lambda: front_end(file_path))
+        store, __ = best_time(lambda: front_end(file_path, ASTCache(os.path.join(directory, 'fresh' + os.urandom(4).hex()))))
+        front_end(file_path, cache)
+        warm, __ = best_time(lambda: front_end(file_path, cache))
+        with open(file_path, 'rb') as file:
+            entry = os.path.getsize(cache.path(file.read()))
+        print(f"{size / 1000 ** 2:8.2f} MB  cold {cold * 1000:9.1f} ms  cold+store {store * 1000:9.1f} ms  warm {warm * 1000:8.1f} ms  ({cold / warm:5.1f}x)  entry {entry / 1000 ** 2:6.2f} MB")
@@ -0,0 +1,53 @@
+"""Times method lookups through a deep inheritance
+hierarchy and instantiation-heavy code, where every
+call of a class finds its initializer. Scanning,
+parsing and resolving are not timed.
+Usage: python Benchmarks/ClassBenchmark.py [backend ...]
+"""
+import sys
+from BenchmarkUtils import best_time, prepare, run
+
+DEPTH = 30
+
+def hierarchy(depth):
+    """Returns the source of a chain of depth
+    classes, each inheriting from the previous
+    one, whose root defines init and value.
+    >>> print(hierarchy(2))
+    class C0 { init(n) { this.n = n; } value() { return this.n; } }
+    class C1 < C0 {}
+    class C2 < C1 {}
+    """
+    lines = ["class C0 { init(n) { this.n = n; } value() { return this.n; } }"]
+    for index in range(1, depth + 1):
+        lines.append(f"class C{index} < C{index - 1} {{}}")
+    return "\n".join(lines)
+
+PROGRAMS = {
+    'lookup': hierarchy(DEPTH) + f"""
+fun run(n) {{ var leaf = C{DEPTH}(1); var total = 0; for (var i = 0; i < n; i = i + 1) total = total + leaf.value(); return total; }}
+print run(20000);
+""",
+    'instances': """
+class Point { init(x, y) { this.x = x; this.y = y; } }
+fun run(n) { var total = 0; for (var i = 0; i < n; i = i + 1) total = total + Point(i, 1).y; return total; }
+print run(20000);
+""",
+    'inherited': hierarchy(DEPTH) + f"""
+fun run(n) {{ var total = 0; for (var i = 0; i < n; i = i + 1) total = total + C{DEPTH}(i).n; return total; }}
+print run(20000);
+""",
+    'bare': """
+class Empty {}
+fun run(n) { var last = nil; for (var i = 0; i < n; i = i + 1) last = Empty(); return last; }
+print run(20000);
+"""
+}
+
+if __name__ == '__main__':
+    backends = sys.argv[1:] or ('tree', 'closures')
+    for name, source in PROGRAMS.items():
+        for backend in backends:
+            interpreters = iter([prepare(source) for __ in range(3)])
+            seconds, output = best_time(lambda: run(next(interpreters), backend))
+            print(f"{name:10s} {backend:9s} {seconds * 1000:8.1f} ms  -> {output.strip()}")
@@ -0,0 +1,50 @@
+"""Measures closure-heavy callbacks: the memory a
+list of small closures keeps alive once the functions
+that made them have returned, and the time to call
+them all. Each closure reads one variable from a few
+blocks deep inside a function with many locals.
+Usage: python Benchmarks/ClosureBenchmark.py [count ...]
+"""
+import contextlib
+import io
+import sys
+import tracemalloc
+from BenchmarkUtils import best_time, prepare
+from Scanner import Scanner
+from Parser import Parser
+
+MAKE = """
+class Link { init(callback, next) { this.callback = callback; this.next = next; } }
+fun make(i) {
+    var a = i; var b = i; var c = i; var d = i; var e = i;
+    var f = i; var g = i; var h = i; var j = i; var k = i;
+    for (var step = 0; step < 1; step = step + 1) {
+        var x = a + step;
+        { { fun callback() { return x; } return callback; } }
+    }
+}
+var callbacks = nil;
+for (var i = 0; i < {n}; i = i + 1) callbacks = Link(make(i), callbacks);
+"""
+
+CALL = """
+var total = 0;
+for (var link = callbacks; link != nil; link = link.next) total = total + link.callback();
+print total;
+"""
+
+if __name__ == '__main__':
+    for count in [int(argument) for argument in sys.argv[1:]] or [10000]:
+        source = MAKE.replace('{n}', str(count))
+        interpreter = prepare(source + CALL)
+        tree = interpreter.tree
+        split = len(Parser(Scanner(source).get_tokens()).parse())
+        make, call = tree[:split], tree[split:]
+        tracemalloc.start()
+        interpreter.interpret(make)
+        retained, __ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            seconds, __ = best_time(lambda: interpreter.interpret(call))
+        print(f"{count:8d} closures  {retained / count:8.0f} bytes/closure retained  {seconds * 1e9 / count:7.0f} ns/call  -> {output.getvalue().split()[0]}")
@@ -0,0 +1,59 @@
+"""Measures parsing, resolving and interpreting
+generated scripts nested to a given depth, which
+run on explicit stacks past DEEP_NESTING levels.
+The time per level should stay flat as the depth
+grows, with the default recursion limit.
+Usage: python Benchmarks/DeepNestingBenchmark.py [depth ...]
+Depths accept KB/MB suffixes (default 10000 100000 1000000).
+"""
+import sys
+import time
+from BenchmarkUtils import parse_sizes
+from Scanner import Scanner
+from Parser import Parser
+from Resolver import Resolver
+from Interpreter import Interpreter
+
+SHAPES = {
+    "parentheses": lambda depth: "print " + "(1 + " * depth + "1" + ")" * depth + ";",
+    "chain": lambda depth: "print 1" + " + 1" * depth + ";",
+    "unary": lambda depth: "print " + "-" * depth + "1;",
+    "blocks": lambda depth: "var a = 1;\n" + "{\n" * depth + "print a;" + "}\n" * depth,
+    "ifs": lambda depth: "if (true) " * depth + "print 1;",
+    "function": lambda depth: "fun f(a) { return " + "(a + " * depth + "a" + ")" * depth + "; }\nprint f(1);"
+}
+
+def run_phases(source):
+    """Scans, parses, resolves and interprets
+    source. Returns the seconds spent in each
+    phase and the printed lines.
+    """
+    import io, contextlib
+    timings = []
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        start = time.perf_counter()
+        tokens = Scanner(source).get_tokens()
+        timings.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        tree = Parser(tokens).parse()
+        timings.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        interpreter = Interpreter(tree)
+        Resolver(interpreter).resolve(tree)
+        timings.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        interpreter.interpret(tree)
+        timings.append(time.perf_counter() - start)
+    return timings, output.getvalue().split()
+
+if __name__ == '__main__':
+    print(f"recursion limit {sys.getrecursionlimit()}")
+    for depth in parse_sizes(sys.argv[1:], [10 ** 4, 10 ** 5, 10 ** 6]):
+        for name, generate in SHAPES.items():
+            timings, printed = run_phases(generate(depth))
+            per_level = " ".join(f"{phase} {timing / depth * 1e6:5.2f}" for phase, timing in zip(("scan", "parse", "resolve", "run"), timings))
+            print(f"{depth:8d} {name:12s} us/level: {per_level}  printed {printed[-1] if printed else None}")
@@ -0,0 +1,41 @@
+"""Times method calls, where the callee of a
+call is a property: methods with and without
+arguments, methods calling methods on this, and
+functions held in fields, which are not methods.
+Scanning, parsing and resolving are not timed.
+Usage: python Benchmarks/InvokeBenchmark.py [backend ...]
+"""
+import sys
+from BenchmarkUtils import best_time, prepare, run
+
+PROGRAMS = {
+    'no arguments': """
+class Counter { init() { this.n = 0; } step() { this.n = this.n + 1; } }
+fun run(n) { var counter = Counter(); for (var i = 0; i < n; i = i + 1) counter.step(); return counter.n; }
+print run(30000);
+""",
+    'arguments': """
+class Vector { init(x, y) { this.x = x; this.y = y; } dot(x, y) { return this.x * x + this.y * y; } }
+fun run(n) { var v = Vector(1, 2); var total = 0; for (var i = 0; i < n; i = i + 1) total = total + v.dot(i, 1); return total; }
+print run(30000);
+""",
+    'this': """
+class Shape { area() { return this.width() * this.height(); } width() { return 2; } height() { return 3; } }
+fun run(n) { var shape = Shape(); var total = 0; for (var i = 0; i < n; i = i + 1) total = total + shape.area(); return total; }
+print run(15000);
+""",
+    'field': """
+class Box {}
+fun double(n) { return n * 2; }
+fun run(n) { var box = Box(); box.f = double; var total = 0; for (var i = 0; i < n; i = i + 1) total = total + box.f(i); return total; }
+print run(30000);
+"""
+}
+
+if __name__ == '__main__':
+    backends = sys.argv[1:] or ('tree', 'closures', 'vm', 'python')
+    for name, source in PROGRAMS.items():
+        for backend in backends:
+            interpreters = iter([prepare(source) for __ in range(3)])
+            seconds, output = best_time(lambda: run(next(interpreters), backend))
+            print(f"{name:13s} {backend:9s} {seconds * 1000:8.1f} ms  -> {output.strip()}")
@@ -0,0 +1,64 @@
+"""Times every binary and unary operator on its
+own: a loop applies the operator eight times per
+iteration, and the same loop with plain copies is
+subtracted, leaving the cost of one operation.
+Scanning, parsing and resolving are not timed.
+Usage: python Benchmarks/OperatorBenchmark.py [iterations] [backend]
+"""
+import sys
+from BenchmarkUtils import best_time, prepare, run
+
+TEMPLATE = """
+fun run(n) {
+    var a = {a}; var b = {b}; var r = nil; var i = 0;
+    while (i < n) {
+        r = {expression}; r = {expression}; r = {expression}; r = {expression};
+        r = {expression}; r = {expression}; r = {expression}; r = {expression};
+        i = i + 1;
+    }
+    return r;
+}
+print run({n});
+"""
+OPERATIONS_PER_ITERATION = 8
+
+# Name, operands and expression of every case; 'copy' is the baseline.
+CASES = (
+    ('copy', '3', '2', 'a'),
+    ('+ numbers', '3', '2', 'a + b'),
+    ('+ strings', '"ab"', '"cd"', 'a + b'),
+    ('-', '3', '2', 'a - b'),
+    ('*', '3', '2', 'a * b'),
+    ('/', '3', '2', 'a / b'),
+    ('<', '3', '2', 'a < b'),
+    ('<=', '3', '2', 'a <= b'),
+    ('>', '3', '2', 'a > b'),
+    ('>=', '3', '2', 'a >= b'),
+    ('==', '3', '2', 'a == b'),
+    ('!=', '3', '2', 'a != b'),
+    ('unary -', '3', '2', '-a'),
+    ('!', '3', '2', '!a')
+)
+
+def source(a, b, expression, iterations):
+    """Returns the program of a case.
+    >>> print(source('1', '2', 'a + b', 5).splitlines()[-1])
+    print run(5);
+    """
+    text = TEMPLATE
+    for name, value in (('{a}', a), ('{b}', b), ('{expression}', expression), ('{n}', str(iterations))):
+        text = text.replace(name, value)
+    return text
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    backend = sys.argv[2] if len(sys.argv) > 2 else 'tree'
+    baseline = None
+    for name, a, b, expression in CASES:
+        program = source(a, b, expression, iterations)
+        interpreters = iter([prepare(program) for __ in range(3)])
+        seconds, output = best_time(lambda: run(next(interpreters), backend))
+        if baseline == None:
+            baseline = seconds
+        operation = (seconds - baseline) * 1e9 / (iterations * OPERATIONS_PER_ITERATION)
+        print(f"{name:10s} {seconds * 1000:8.1f} ms  {operation:7.0f} ns/operation  -> {output.strip()}")
@@ -0,0 +1,22 @@
+"""Compares serial scanning with ParallelScanner
+at several job counts on a generated script.
+Usage: python Benchmarks/ParallelScannerBenchmark.py [size] [jobs ...]
+The size accepts KB/MB/GB suffixes (default 16MB,
+jobs 2 4 8). Speedups need as many free cores.
+"""
+import os
+import sys
+from BenchmarkUtils import generate_source, best_time, parse_sizes
+from Scanner import Scanner
+from ParallelScanner import ParallelScanner
+
+if __name__ == '__main__':
+    size = parse_sizes(sys.argv[1:2], [16 * 1000 ** 2])[0]
+    job_counts = [int(argument) for argument in sys.argv[2:]] or [2, 4, 8]
+    source = generate_source(size).encode()
+    print(f"{os.cpu_count()} cores, {len(source) / 1000 ** 2:.1f} MB")
+    serial, tokens = best_time(lambda: Scanner(source).get_tokens(), 1)
+    print(f"serial   {serial:7.2f} s  {len(tokens)} tokens")
+    for jobs in job_counts:
+        elapsed, __ = best_time(lambda: ParallelScanner(source, jobs).get_tokens(), 1)
+        print(f"jobs {jobs:<3d} {elapsed:7.2f} s  speedup {serial / elapsed:5.2f}x")
@@ -0,0 +1,31 @@
+"""Measures Parser throughput on the token list
+of a generated script, so scanning is not timed,
+and on an expression-heavy script.
+Usage: python Benchmarks/ParserBenchmark.py [size ...]
+Sizes accept KB/MB/GB suffixes (default 1MB 4MB).
+"""
+import sys
+from BenchmarkUtils import generate_source, best_time, parse_sizes
+from Scanner import Scanner
+from Parser import Parser
+
+def generate_expressions(size):
+    """Returns a script of at least size characters
+    made of long arithmetic and logical expressions.
+    """
+    line = "print -a * (b + 2) / c - d < e.f(g, h) or !i and j == k + 1;\n"
+    return line * (size // len(line) + 1)
+
+def benchmark_parser(source):
+    """Parses the tokens of source and returns
+    the tokens per second and statement count.
+    """
+    tokens = Scanner(source).get_tokens()
+    elapsed, statements = best_time(lambda: Parser(tokens).parse())
+    return len(tokens) / elapsed, len(statements)
+
+if __name__ == '__main__':
+    for size in parse_sizes(sys.argv[1:], [1000 ** 2, 4 * 1000 ** 2]):
+        for name, generate in (("program", generate_source), ("expressions", generate_expressions)):
+            tokens_per_second, statement_count = benchmark_parser(generate(size))
+            print(f"{size / 1000 ** 2:8.1f} MB  {name:11s}  {statement_count:8d} statements  {tokens_per_second:10.0f} tokens/s")
@@ -0,0 +1,68 @@
+"""Times property access sites that see one
+class (monomorphic), three classes (polymorphic)
+and eight classes (megamorphic), for method reads,
+method calls and field reads, and prints the hits
+and misses of their inline caches. Scanning,
+parsing and resolving are not timed.
+Usage: python Benchmarks/PropertyBenchmark.py [backend ...]
+"""
+import sys
+from BenchmarkUtils import best_time, prepare, run
+from InlineCache import cache_sites
+
+ITERATIONS = 24000
+
+def classes(count):
+    """Returns the source of count classes
+    with the same methods and field, and of
+    a list of one instance of each, kept in
+    variables o0, o1 and so on.
+    >>> print(classes(2))
+    class C0 { init() { this.f = 0; } m() { return 0; } }
+    var o0 = C0();
+    class C1 { init() { this.f = 1; } m() { return 1; } }
+    var o1 = C1();
+    """
+    lines = []
+    for index in range(count):
+        lines.append(f"class C{index} {{ init() {{ this.f = {index}; }} m() {{ return {index}; }} }}")
+        lines.append(f"var o{index} = C{index}();")
+    return "\n".join(lines)
+
+def program(count, access):
+    """Returns a program whose loop runs access
+    on o, which cycles through instances of count
+    classes, so the access site sees all of them.
+    """
+    choices = " ".join(f"if (k == {index}) o = o{index};" for index in range(count))
+    return classes(count) + f"""
+fun run(n) {{
+    var total = 0; var o = nil; var k = 0;
+    for (var i = 0; i < n; i = i + 1) {{
+        {choices}
+        total = total + {access};
+        k = k + 1; if (k == {count}) k = 0;
+    }}
+    return total;
+}}
+print run({ITERATIONS});
+"""
+
+PROGRAMS = {f"{site} {name}":program(count, access)
+    for site, access in (('read', 'o.m'), ('call', 'o.m()'), ('field', 'o.f'))
+    for name, count in (('mono', 1), ('poly', 3), ('mega', 8))}
+# Reading a method makes a bound method, which cannot be added.
+for name in ('mono', 'poly', 'mega'):
+    PROGRAMS[f"read {name}"] = PROGRAMS[f"read {name}"].replace("total = total + o.m;", "total = total + 1; o.m;")
+
+if __name__ == '__main__':
+    backends = sys.argv[1:] or ('tree', 'closures', 'vm', 'python')
+    for name, source in PROGRAMS.items():
+        for backend in backends:
+            interpreters = [prepare(source) for __ in range(3)]
+            remaining = iter(interpreters)
+            seconds, output = best_time(lambda: run(next(remaining), backend))
+            sites = cache_sites(interpreters[-1].tree)
+            hits = sum(node.cache.hits for node in sites)
+            misses = sum(node.cache.misses for node in sites)
+            print(f"{name:10s} {backend:9s} {seconds * 1000:8.1f} ms  {hits:6d} hits {misses:6d} misses  -> {output.strip()}")
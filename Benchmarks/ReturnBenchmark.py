@@ -0,0 +1,51 @@
+"""Times function returns on recursion-heavy Lox
+programs: doubly recursive fib, a deep linear
+recursion, a return from inside nested loops and
+blocks, and chained method returns. Scanning,
+parsing and resolving are not timed.
+Usage: python Benchmarks/ReturnBenchmark.py [backend ...]
+"""
+import sys
+from BenchmarkUtils import best_time, prepare, run
+
+PROGRAMS = {
+    'fib': """
+fun fib(n) { if (n < 2) return n; return fib(n - 2) + fib(n - 1); }
+print fib(20);
+""",
+    'countdown': """
+fun count(n) { if (n == 0) return 0; return 1 + count(n - 1); }
+var total = 0;
+for (var i = 0; i < 400; i = i + 1) total = total + count(50);
+print total;
+""",
+    'nested': """
+fun find(n) {
+    var i = 0;
+    while (true) {
+        { var j = i * 2; if (j >= n) { { return j; } } }
+        i = i + 1;
+    }
+}
+var total = 0;
+for (var i = 0; i < 5000; i = i + 1) total = total + find(4);
+print total;
+""",
+    'methods': """
+class Chain {
+    init() { this.n = 0; }
+    next() { this.n = this.n + 1; return this; }
+    value() { return this.n; }
+}
+fun run(n) { var chain = Chain(); for (var i = 0; i < n; i = i + 1) chain.next().next(); return chain.value(); }
+print run(15000);
+"""
+}
+
+if __name__ == '__main__':
+    backends = sys.argv[1:] or ('tree', 'closures')
+    for name, source in PROGRAMS.items():
+        for backend in backends:
+            interpreters = iter([prepare(source) for __ in range(3)])
+            seconds, output = best_time(lambda: run(next(interpreters), backend))
+            print(f"{name:10s} {backend:9s} {seconds * 1000:8.1f} ms  -> {output.strip()}")
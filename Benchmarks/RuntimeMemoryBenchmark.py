@@ -0,0 +1,42 @@
+"""Measures the runtime objects: the bytes each
+Environment, LoxFunction, LoxClass, LoxInstance and
+Token takes, by tracemalloc, and the time of calls,
+which make an Environment each on the tree backend.
+Usage: python Benchmarks/RuntimeMemoryBenchmark.py [count]
+"""
+import sys
+import tracemalloc
+from BenchmarkUtils import best_time, prepare, run
+from Environment import Environment
+from LoxClass import LoxClass
+from LoxFunction import LoxFunction
+from LoxInstance import LoxInstance
+from Token import Token
+
+CALLS = """
+fun add(a, b) { return a + b; }
+fun run(n) { var total = 0; for (var i = 0; i < n; i = i + 1) total = add(total, i); return total; }
+print run(30000);
+"""
+
+KLASS = LoxClass('A', None, {})
+
+MAKERS = {
+    'Environment': lambda index: Environment([index]),
+    'LoxFunction': lambda index: LoxFunction(None),
+    'LoxClass': lambda index: LoxClass('A', None, {}),
+    'LoxInstance': lambda index: LoxInstance(KLASS),
+    'Token': lambda index: Token('IDENTIFIER', index, 'a')
+}
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    for name, make in MAKERS.items():
+        tracemalloc.start()
+        kept = [make(index) for index in range(count)]
+        retained, __ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:12s} {retained / count:6.0f} bytes/object")
+    interpreters = iter([prepare(CALLS) for __ in range(3)])
+    seconds, output = best_time(lambda: run(next(interpreters), 'tree'))
+    print(f"calls        {seconds * 1000:8.1f} ms  -> {output.strip()}")
@@ -0,0 +1,22 @@
+"""Measures Scanner throughput on generated
+lox scripts of several megabytes.
+Usage: python Benchmarks/ScannerBenchmark.py [size ...]
+Sizes accept KB/MB/GB suffixes (default 1MB 4MB 16MB).
+"""
+import sys
+from BenchmarkUtils import generate_source, best_time, parse_sizes
+from Scanner import Scanner
+
+def benchmark_scanner(size):
+    """Scans a generated script of size
+    characters and returns a tuple with the
+    megabytes per second and tokens per second.
+    """
+    source = generate_source(size)
+    elapsed, tokens = best_time(lambda: Scanner(source).get_tokens())
+    return len(source) / elapsed / 1000 ** 2, len(tokens) / elapsed, len(tokens)
+
+if __name__ == '__main__':
+    for size in parse_sizes(sys.argv[1:], [1000 ** 2, 4 * 1000 ** 2, 16 * 1000 ** 2]):
+        megabytes, tokens_per_second, token_count = benchmark_scanner(size)
+        print(f"{size / 1000 ** 2:8.1f} MB  {token_count:10d} tokens  {megabytes:6.2f} MB/s  {tokens_per_second:12.0f} tokens/s")
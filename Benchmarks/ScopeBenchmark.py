@@ -0,0 +1,73 @@
+"""Times loop-heavy Lox programs whose blocks open
+scopes on every iteration, and counts the Environment
+frames each run allocates. Scanning, parsing and
+resolving are not timed.
+Usage: python Benchmarks/ScopeBenchmark.py [iterations]
+"""
+import sys
+from BenchmarkUtils import best_time, prepare, run
+import Environment
+
+PROGRAMS = {
+    'for loop': """
+fun run(n) {
+    var total = 0;
+    for (var i = 0; i < n; i = i + 1) { var square = i * i; total = total + square; }
+    return total;
+}
+print run({n});
+""",
+    'nested blocks': """
+fun run(n) {
+    var total = 0; var i = 0;
+    while (i < n) {
+        var a = i;
+        { var b = a + 1; { var c = b + 1; total = total + c; } }
+        i = i + 1;
+    }
+    return total;
+}
+print run({n});
+""",
+    'top-level for': """
+var total = 0;
+for (var i = 0; i < {n}; i = i + 1) { var half = i / 2; total = total + half; }
+print total;
+""",
+    'calls in loop': """
+fun add(a, b) { var sum = a + b; return sum; }
+fun run(n) { var total = 0; for (var i = 0; i < n; i = i + 1) { total = add(total, i); } return total; }
+print run({n});
+""",
+    'closure in loop': """
+fun run(n) {
+    var total = 0;
+    for (var i = 0; i < n; i = i + 1) { fun get() { return i; } total = total + get(); }
+    return total;
+}
+print run({n});
+"""
+}
+
+def count_frames():
+    """Wraps the Environment initializer to
+    count frames, and returns the counter.
+    """
+    counter = [0]
+    initialize = Environment.Environment.__init__
+    def counting(self, *arguments, **keywords):
+        counter[0] += 1
+        initialize(self, *arguments, **keywords)
+    Environment.Environment.__init__ = counting
+    return counter, initialize
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    for name, program in PROGRAMS.items():
+        source = program.replace('{n}', str(iterations))
+        interpreters = iter([prepare(source) for __ in range(4)])
+        seconds, output = best_time(lambda: run(next(interpreters)))
+        counter, initialize = count_frames()
+        run(next(interpreters))
+        Environment.Environment.__init__ = initialize
+        print(f"{name:15s} {seconds * 1000:8.1f} ms  {seconds * 1e9 / iterations:8.0f} ns/iteration  {counter[0]:8d} frames  -> {output.strip()}")
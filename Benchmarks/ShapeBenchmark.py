@@ -0,0 +1,44 @@
+"""Measures instances: the memory a list of
+instances with three fields keeps alive, and the
+time of the binary-trees program, which makes and
+walks many small instances with two fields.
+Scanning, parsing and resolving are not timed.
+Usage: python Benchmarks/ShapeBenchmark.py [backend ...]
+"""
+import sys
+import tracemalloc
+from BenchmarkUtils import best_time, prepare, run
+
+INSTANCES = 20000
+
+MAKE = f"""
+class Node {{ init(x, y, next) {{ this.x = x; this.y = y; this.next = next; }} }}
+var nodes = nil;
+for (var i = 0; i < {INSTANCES}; i = i + 1) nodes = Node(i, i, nodes);
+"""
+
+BINARY_TREES = """
+class Tree {
+    init(left, right) { this.left = left; this.right = right; }
+    check() { if (this.left == nil) return 1; return 1 + this.left.check() + this.right.check(); }
+}
+fun make(depth) { if (depth == 0) return Tree(nil, nil); return Tree(make(depth - 1), make(depth - 1)); }
+fun run(depth) {
+    var total = 0;
+    for (var i = 0; i < 8; i = i + 1) total = total + make(depth).check();
+    return total;
+}
+print run(10);
+"""
+
+if __name__ == '__main__':
+    backends = sys.argv[1:] or ('tree', 'closures', 'vm', 'python')
+    for backend in backends:
+        interpreter = prepare(MAKE)
+        tracemalloc.start()
+        run(interpreter, backend)
+        retained, __ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        interpreters = iter([prepare(BINARY_TREES) for __ in range(3)])
+        seconds, output = best_time(lambda: run(next(interpreters), backend))
+        print(f"{backend:9s} {retained / INSTANCES:6.0f} bytes/instance  binary-trees {seconds * 1000:8.1f} ms  -> {output.strip()}")
@@ -0,0 +1,60 @@
+"""Measures startup latency of run_file style
+loading: the time and memory needed until the
+first statement is parsed, reading the script
+into a string versus memory-mapping it.
+Usage: python Benchmarks/StartupBenchmark.py [size ...]
+Sizes accept KB/MB/GB suffixes (default 10MB 100MB 1GB).
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from BenchmarkUtils import write_source, parse_sizes
+from Scanner import Scanner, mapped_source
+from Parser import Parser
+from TokenBuffer import TokenBuffer
+
+def first_statement(source):
+    """Parses the first declaration in source.
+    """
+    scnr = Scanner(source)
+    parser = Parser(TokenBuffer(scnr.iter_tokens()), scnr)
+    return parser.declaration()
+
+def start_from_read(file_path):
+    """Reads the whole script into a string
+    before scanning it.
+    """
+    with open(file_path, 'r') as file:
+        return first_statement(file.read())
+
+def start_from_map(file_path):
+    """Scans the script straight from a
+    memory map of the file.
+    """
+    with open(file_path, 'rb') as file, mapped_source(file) as source:
+        return first_statement(source)
+
+def measure(function, file_path):
+    """Returns the seconds taken by function
+    and the megabytes it allocated.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    function(file_path)
+    elapsed = time.perf_counter() - start
+    __, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1000 ** 2
+
+if __name__ == '__main__':
+    directory = tempfile.mkdtemp()
+    for size in parse_sizes(sys.argv[1:], [10 * 1000 ** 2, 100 * 1000 ** 2, 1000 ** 3]):
+        file_path = os.path.join(directory, "startup.lox")
+        write_source(file_path, size)
+        for name, function in (("read", start_from_read), ("mmap", start_from_map)):
+            elapsed, peak = measure(function, file_path)
+            print(f"{size / 1000 ** 2:8.1f} MB  {name:4s}  first statement after {elapsed * 1000:9.2f} ms  peak {peak:8.1f} MB")
+        os.remove(file_path)
+    os.rmdir(directory)
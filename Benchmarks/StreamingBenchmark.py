@@ -0,0 +1,44 @@
+"""Compares peak memory and time of parsing
+from a full token list against parsing from
+the streaming TokenBuffer.
+Usage: python Benchmarks/StreamingBenchmark.py [size ...]
+Sizes accept KB/MB/GB suffixes (default 1MB 4MB).
+"""
+import sys
+import time
+import tracemalloc
+from BenchmarkUtils import generate_source, parse_sizes
+from Scanner import Scanner
+from Parser import Parser
+from TokenBuffer import TokenBuffer
+
+def parse_from_list(source):
+    """Scans source into a token list, then parses it.
+    """
+    return Parser(Scanner(source).get_tokens()).parse()
+
+def parse_from_stream(source):
+    """Parses source while it is being scanned.
+    """
+    scnr = Scanner(source)
+    return Parser(TokenBuffer(scnr.iter_tokens()), scnr).parse()
+
+def measure(function, source):
+    """Returns the seconds and the peak traced
+    megabytes taken by function(source).
+    """
+    start = time.perf_counter()
+    function(source)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    function(source)
+    __, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1000 ** 2
+
+if __name__ == '__main__':
+    for size in parse_sizes(sys.argv[1:], [1000 ** 2, 4 * 1000 ** 2]):
+        source = generate_source(size)
+        for name, function in (("list", parse_from_list), ("stream", parse_from_stream)):
+            elapsed, peak = measure(function, source)
+            print(f"{size / 1000 ** 2:8.1f} MB  {name:6s}  {elapsed:7.2f} s  peak {peak:8.1f} MB")
@@ -0,0 +1,49 @@
+"""Compares the bytes used per token by the
+slotted, interned Token against the previous
+layout (a per-instance __dict__ and a fresh
+lexeme string for every token).
+Usage: python Benchmarks/TokenMemoryBenchmark.py [size]
+Sizes accept KB/MB/GB suffixes (default 2MB).
+"""
+import sys
+import tracemalloc
+from BenchmarkUtils import generate_source, parse_sizes
+from Scanner import Scanner
+
+class DictToken:
+    def __init__(self, token_type, line, lexeme = None, literal = None):
+        """Token layout before __slots__ and interning.
+        """
+        self.TOKEN_TYPE = token_type
+        self.LINE = line
+        self.LITERAL = literal
+        self.LEXEME = lexeme
+
+def copy_lexeme(lexeme):
+    """Returns a fresh copy of lexeme, as the
+    scanner used to slice one out per token.
+    """
+    if lexeme == None or len(lexeme) < 2:
+        return lexeme
+    return lexeme[:1] + lexeme[1:]
+
+def traced_bytes(build):
+    """Returns the bytes still allocated after
+    build() runs, with its result kept alive.
+    """
+    tracemalloc.start()
+    result = build()
+    current, __ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, len(result)
+
+if __name__ == '__main__':
+    size = parse_sizes(sys.argv[1:], [2 * 1000 ** 2])[0]
+    source = generate_source(size)
+    tokens = Scanner(source).get_tokens()
+    before, count = traced_bytes(lambda: [DictToken(token.TOKEN_TYPE, token.LINE, copy_lexeme(token.LEXEME), token.LITERAL) for token in tokens])
+    del tokens
+    after, count = traced_bytes(lambda: Scanner(source).get_tokens())
+    print(f"{count} tokens")
+    print(f"before: {before / count:6.1f} bytes/token")
+    print(f"after:  {after / count:6.1f} bytes/token")
@@ -0,0 +1,56 @@
+"""Times variable-heavy Lox programs: locals read
+and written in a loop, variables reached through
+enclosing block and function scopes, closures,
+top-level globals and methods using this.
+Scanning, parsing and resolving are not timed.
+Usage: python Benchmarks/VariableBenchmark.py [iterations]
+"""
+import sys
+from BenchmarkUtils import best_time, prepare, run
+
+PROGRAMS = {
+    'locals': """
+fun run(n) {
+    var a = 0; var b = 1; var c = 2; var i = 0;
+    while (i < n) { a = a + b; b = c - a; c = a + i; i = i + 1; }
+    return a;
+}
+print run({n});
+""",
+    'nested scopes': """
+fun run(n) {
+    var total = 0; var i = 0;
+    { var x = 1; { var y = 2; { var z = 3;
+        while (i < n) { total = total + x + y + z; i = i + 1; }
+    } } }
+    return total;
+}
+print run({n});
+""",
+    'closures': """
+fun counter() { var count = 0; fun next() { count = count + 1; return count; } return next; }
+var next = counter();
+fun run(n) { var i = 0; while (i < n) { next(); i = i + 1; } return next(); }
+print run({n});
+""",
+    'globals': """
+var count = 0; var i = 0;
+fun bump(d) { count = count + d; }
+while (i < {n}) { bump(i); count = count - 1; i = i + 1; }
+print count;
+""",
+    'methods': """
+class Box { init(v) { this.v = v; } add(d) { this.v = this.v + d; return this; } }
+class Bigger < Box { add(d) { return super.add(d * 2); } }
+fun run(n) { var box = Bigger(0); var i = 0; while (i < n) { box.add(i); i = i + 1; } return box.v; }
+print run({n});
+"""
+}
+
+if __name__ == '__main__':
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    for name, program in PROGRAMS.items():
+        source = program.replace('{n}', str(iterations))
+        interpreters = iter([prepare(source) for __ in range(3)])
+        seconds, output = best_time(lambda: run(next(interpreters)))
+        print(f"{name:14s} {seconds * 1000:8.1f} ms  {seconds * 1e9 / iterations:8.0f} ns/iteration  -> {output.strip()}")
@@ -0,0 +1,121 @@
+from array import array
+
+# Every instruction is an opcode followed by its operands, each one 32-bit
+# code unit, so no chunk the tree backend runs has more constants or
+# longer jumps than an operand holds. OPERAND_COUNTS gives the number of
+# operands of each opcode. The operand of GET_PROPERTY, GET_METHOD and
+# SET_PROPERTY is the constant holding the inline cache of their site.
+OPCODES = (
+    'CONSTANT', 'NIL', 'TRUE', 'FALSE', 'POP', 'POPN',
+    'GET_LOCAL', 'SET_LOCAL', 'GET_CELL', 'SET_CELL', 'GET_UPVALUE', 'SET_UPVALUE',
+    'GET_GLOBAL', 'SET_GLOBAL', 'DEFINE_GLOBAL', 'BOX', 'MAKE_CELL',
+    'GET_PROPERTY', 'GET_METHOD', 'SET_PROPERTY', 'CHECK_INSTANCE', 'GET_SUPER',
+    'EQUAL', 'NOT_EQUAL', 'GREATER', 'GREATER_EQUAL', 'LESS', 'LESS_EQUAL',
+    'ADD', 'SUBTRACT', 'MULTIPLY', 'DIVIDE', 'NOT', 'NEGATE',
+    'PRINT', 'JUMP', 'JUMP_IF_FALSE', 'JUMP_IF_TRUE', 'POP_JUMP_IF_FALSE', 'LOOP',
+    'CALL', 'INVOKE', 'CLOSURE', 'RETURN', 'CLASS', 'SUPERCLASS', 'METHOD'
+)
+OPERAND_COUNTS = {
+    'CONSTANT':1, 'POPN':1,
+    'GET_LOCAL':1, 'SET_LOCAL':1, 'GET_CELL':1, 'SET_CELL':1, 'GET_UPVALUE':1, 'SET_UPVALUE':1,
+    'GET_GLOBAL':1, 'SET_GLOBAL':1, 'DEFINE_GLOBAL':1,
+    'GET_PROPERTY':1, 'GET_METHOD':1, 'SET_PROPERTY':1, 'GET_SUPER':1,
+    'JUMP':1, 'JUMP_IF_FALSE':1, 'JUMP_IF_TRUE':1, 'POP_JUMP_IF_FALSE':1, 'LOOP':1,
+    'CALL':1, 'INVOKE':1, 'CLOSURE':1, 'CLASS':2, 'METHOD':1
+}
+(CONSTANT, NIL, TRUE, FALSE, POP, POPN,
+    GET_LOCAL, SET_LOCAL, GET_CELL, SET_CELL, GET_UPVALUE, SET_UPVALUE,
+    GET_GLOBAL, SET_GLOBAL, DEFINE_GLOBAL, BOX, MAKE_CELL,
+    GET_PROPERTY, GET_METHOD, SET_PROPERTY, CHECK_INSTANCE, GET_SUPER,
+    EQUAL, NOT_EQUAL, GREATER, GREATER_EQUAL, LESS, LESS_EQUAL,
+    ADD, SUBTRACT, MULTIPLY, DIVIDE, NOT, NEGATE,
+    PRINT, JUMP, JUMP_IF_FALSE, JUMP_IF_TRUE, POP_JUMP_IF_FALSE, LOOP,
+    CALL, INVOKE, CLOSURE, RETURN, CLASS, SUPERCLASS, METHOD) = range(len(OPCODES))
+
+# Largest operand a code unit holds.
+MAX_OPERAND = 0xFFFFFFFF
+
+class Chunk:
+    def __init__(self, name, arity = 0):
+        """Initializes a Chunk object, the
+        compiled code of a function or of the
+        top-level script: its instructions in an
+        array of 32-bit code units with the source
+        line of every unit, and its constants. The
+        tokens dictionary gives, for instructions
+        that can fail at run time, the token an
+        error is reported at.
+        >>> OPCODES[RETURN], OPCODES[METHOD]
+        ('RETURN', 'METHOD')
+        >>> chunk = Chunk('f', 2)
+        >>> chunk.name, chunk.arity, list(chunk.code), chunk.constants
+        ('f', 2, [], [])
+        """
+        self.name = name
+        self.arity = arity
+        self.upvalues = ()
+        self.cells = ()
+        self.is_initializer = False
+        self.code = array('I')
+        self.lines = array('I')
+        self.constants = []
+        self.tokens = {}
+
+    def __str__(self):
+        """Returns how the function is
+        printed in Lox.
+        >>> str(Chunk('f'))
+        '<fn f>'
+        """
+        return f"<fn {self.name}>"
+
+def disassemble(chunk):
+    """Returns a listing of the instructions
+    of chunk and of the functions among its
+    constants: offset, source line, opcode and
+    operands, with the value or target they
+    refer to.
+    >>> chunk = Chunk('demo')
+    >>> chunk.constants.append(1.5)
+    >>> for unit in (CONSTANT, 0, NEGATE, PRINT, NIL, RETURN):
+    ...     chunk.code.append(unit)
+    ...     chunk.lines.append(1)
+    >>> print(disassemble(chunk))
+    == demo ==
+    0000    1 CONSTANT        0 '1.5'
+    0002    | NEGATE
+    0003    | PRINT
+    0004    | NIL
+    0005    | RETURN
+    """
+    lines = [f"== {chunk.name} =="]
+    functions = []
+    offset = 0
+    while offset < len(chunk.code):
+        name = OPCODES[chunk.code[offset]]
+        operands = list(chunk.code[offset + 1:offset + 1 + OPERAND_COUNTS.get(name, 0)])
+        if offset > 0 and chunk.lines[offset] == chunk.lines[offset - 1]:
+            line = '   |'
+        else:
+            line = f"{chunk.lines[offset]:4d}"
+        text = f"{offset:04d} {line} {name}"
+        if len(operands) > 0:
+            text = f"{text:25s} {' '.join(str(operand) for operand in operands)}"
+        if name in ('CONSTANT', 'CLOSURE', 'GET_PROPERTY', 'GET_METHOD', 'SET_PROPERTY', 'GET_SUPER', 'CLASS', 'METHOD'):
+            constant = chunk.constants[operands[0]]
+            text = f"{text} '{constant}'"
+            if name == 'CLOSURE':
+                functions.append(constant)
+        elif name in ('JUMP', 'JUMP_IF_FALSE', 'JUMP_IF_TRUE', 'POP_JUMP_IF_FALSE'):
+            text = f"{text} -> {offset + 2 + operands[0]}"
+        elif name == 'LOOP':
+            text = f"{text} -> {offset + 2 - operands[0]}"
+        lines.append(text)
+        offset += 1 + len(operands)
+    for function in functions:
+        lines.append(disassemble(function))
+    return '\n'.join(lines)
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,474 @@
+from Bytecode import *
+from Environment import LOCAL, CELL, UPVALUE
+from ExprSubClasses import Get, Literal, Variable, This
+from ExprVisitor import ExprVisitor
+from StmtSubClasses import Class, Function, Var
+from StmtVisitor import StmtVisitor
+from Trampoline import accept_iteratively
+import LoxError
+
+# The instruction of every binary operator.
+BINARY_OPCODES = {
+    'MINUS':SUBTRACT,
+    'SLASH':DIVIDE,
+    'STAR':MULTIPLY,
+    'PLUS':ADD,
+    'GREATER_THAN':GREATER,
+    'GREATER_EQUAL':GREATER_EQUAL,
+    'LESS_THAN':LESS,
+    'LESS_EQUAL':LESS_EQUAL,
+    'NOT_EQUAL':NOT_EQUAL,
+    'EQUAL_EQUAL':EQUAL
+}
+
+class BytecodeCompiler(StmtVisitor, ExprVisitor):
+    def __init__(self):
+        """Initializes a BytecodeCompiler object,
+        which compiles a resolved syntax tree into
+        a Chunk for the VirtualMachine. Its visit
+        methods are generators yielding child nodes,
+        so trees of any depth compile on an explicit
+        stack.
+        >>> from Interpreter import Interpreter
+        >>> from Parser import Parser
+        >>> from Resolver import Resolver
+        >>> from Scanner import Scanner
+        >>> tree = Parser(Scanner("var a = 1; print a + 2;").get_tokens()).parse()
+        >>> Resolver(Interpreter(tree)).resolve(tree)
+        >>> print(disassemble(BytecodeCompiler().compile(tree)))
+        == script ==
+        0000    1 CONSTANT        0 '1.0'
+        0002    | DEFINE_GLOBAL   1
+        0004    | GET_GLOBAL      1
+        0006    | CONSTANT        1 '2.0'
+        0008    | ADD
+        0009    | PRINT
+        0010    | NIL
+        0011    | RETURN
+        """
+        self.chunk = None
+        self.constant_indices = None
+        self.token = None
+        self.lox_error = False
+
+    def compile(self, statements):
+        """Returns the Chunk of the top-level
+        statements, or None when the program is
+        too large for its operands.
+        >>> from Interpreter import Interpreter
+        >>> from Parser import Parser
+        >>> from Resolver import Resolver
+        >>> from Scanner import Scanner
+        >>> source = "var a = 0; if (a == 0) {" + " ".join(f"a = a + {i};" for i in range(70000)) + "} print a;"
+        >>> tree = Parser(Scanner(source).get_tokens()).parse()
+        >>> Resolver(Interpreter(tree)).resolve(tree)
+        >>> chunk = BytecodeCompiler().compile(tree)
+        >>> len(chunk.constants) > 0xFFFF, len(chunk.code) > 0xFFFF
+        (True, True)
+        """
+        self.chunk = Chunk('script')
+        self.constant_indices = {}
+        for statement in statements:
+            accept_iteratively(statement, self)
+        self.emit(NIL)
+        self.emit(RETURN)
+        if self.lox_error:
+            return None
+        return self.chunk
+
+    def compile_function(self, declaration, is_initializer = False):
+        """Compiles the body of a function
+        declaration into a Chunk of its own,
+        and returns it.
+        """
+        enclosing = (self.chunk, self.constant_indices)
+        chunk = Chunk(declaration.name.get_lexeme(), len(declaration.params))
+        chunk.upvalues = declaration.upvalues
+        chunk.cells = declaration.cells
+        chunk.is_initializer = is_initializer
+        self.chunk = chunk
+        self.constant_indices = {}
+        for statement in declaration.body:
+            yield statement
+        self.emit_return()
+        self.chunk, self.constant_indices = enclosing
+        return chunk
+
+    def emit(self, *units):
+        """Appends an instruction, made of an
+        opcode and its operands, to the current
+        chunk.
+        """
+        code = self.chunk.code
+        line = 1 if self.token == None else self.token.get_line()
+        for unit in units:
+            if unit > MAX_OPERAND:
+                self.error("Too many variables")
+                unit = 0
+            code.append(unit)
+            self.chunk.lines.append(line)
+
+    def emit_at(self, token, *units):
+        """Appends an instruction that can fail
+        at run time, reporting errors at token.
+        """
+        self.token = token
+        self.chunk.tokens[len(self.chunk.code)] = token
+        self.emit(*units)
+
+    def error(self, message):
+        """Reports a program the bytecode
+        can not hold.
+        """
+        self.lox_error = True
+        LoxError.error(self.token, message, False)
+
+    def make_constant(self, value):
+        """Returns the index of value in the
+        constants of the current chunk, adding
+        it the first time.
+        """
+        key = (type(value), value) if not isinstance(value, Chunk) else id(value)
+        index = self.constant_indices.get(key)
+        if index == None:
+            index = len(self.chunk.constants)
+            if index > MAX_OPERAND:
+                self.error("Too many constants in one chunk")
+                return 0
+            self.constant_indices[key] = index
+            self.chunk.constants.append(value)
+        return index
+
+    def emit_jump(self, opcode):
+        """Appends a forward jump and returns
+        the position of its operand, patched once
+        the target is known.
+        """
+        self.emit(opcode, 0)
+        return len(self.chunk.code) - 1
+
+    def patch_jump(self, position):
+        """Points the jump whose operand is at
+        position to the next instruction.
+        """
+        offset = len(self.chunk.code) - position - 1
+        if offset > MAX_OPERAND:
+            self.error("Too much code to jump over")
+        self.chunk.code[position] = offset & MAX_OPERAND
+
+    def emit_loop(self, start):
+        """Appends a jump back to start.
+        """
+        offset = len(self.chunk.code) + 2 - start
+        if offset > MAX_OPERAND:
+            self.error("Loop body too large")
+        self.emit(LOOP, offset & MAX_OPERAND)
+
+    def emit_return(self):
+        """Appends the return at the end of a
+        function: an initializer returns this,
+        from the first slot, and others nil.
+        """
+        if self.chunk.is_initializer:
+            self.emit(GET_CELL if 0 in self.chunk.cells else GET_LOCAL, 0)
+        else:
+            self.emit(NIL)
+        self.emit(RETURN)
+
+    def emit_get(self, token, access, slot):
+        """Appends the read of a variable,
+        the way the Resolver's access tells.
+        """
+        if access == LOCAL:
+            self.emit(GET_LOCAL, slot)
+        elif access == CELL:
+            self.emit(GET_CELL, slot)
+        elif access == UPVALUE:
+            self.emit(GET_UPVALUE, slot)
+        else:
+            self.emit_at(token, GET_GLOBAL, slot)
+
+    def emit_set(self, token, access, slot):
+        """Appends the write of a variable,
+        leaving the value on the stack.
+        """
+        if access == LOCAL:
+            self.emit(SET_LOCAL, slot)
+        elif access == CELL:
+            self.emit(SET_CELL, slot)
+        elif access == UPVALUE:
+            self.emit(SET_UPVALUE, slot)
+        else:
+            self.emit_at(token, SET_GLOBAL, slot)
+
+    def visit_var_stmt(self, statement):
+        """Compiles a variable declaration. A
+        local's value stays on the stack in its
+        slot, boxed if a closure captures it.
+        """
+        self.token = statement.name
+        if statement.initializer != None:
+            yield statement.initializer
+        else:
+            self.emit(NIL)
+        if statement.access == CELL:
+            self.emit(BOX)
+        elif statement.access == None:
+            self.emit(DEFINE_GLOBAL, statement.slot)
+
+        return None
+
+    def visit_if_stmt(self, statement):
+        """Compiles an if statement.
+        """
+        yield statement.condition
+        else_jump = self.emit_jump(POP_JUMP_IF_FALSE)
+        yield statement.then_branch
+        if statement.else_branch != None:
+            end_jump = self.emit_jump(JUMP)
+            self.patch_jump(else_jump)
+            yield statement.else_branch
+            self.patch_jump(end_jump)
+        else:
+            self.patch_jump(else_jump)
+
+        return None
+
+    def visit_expression_stmt(self, statement):
+        """Compiles an expression statement.
+        """
+        yield statement.expression
+        self.emit(POP)
+
+        return None
+
+    def visit_print_stmt(self, statement):
+        """Compiles a print statement.
+        """
+        yield statement.expression
+        self.emit(PRINT)
+
+        return None
+
+    def visit_while_stmt(self, statement):
+        """Compiles a while statement.
+        """
+        start = len(self.chunk.code)
+        yield statement.condition
+        exit_jump = self.emit_jump(POP_JUMP_IF_FALSE)
+        yield statement.body
+        self.emit_loop(start)
+        self.patch_jump(exit_jump)
+
+        return None
+
+    def visit_block_stmt(self, statement):
+        """Compiles a block, popping the
+        locals it declares when it ends.
+        """
+        count = 0
+        for inner_statement in statement.statements:
+            yield inner_statement
+            if isinstance(inner_statement, (Var, Function, Class)) and inner_statement.access != None:
+                count += 1
+        if count > 0:
+            self.emit(POPN, count)
+
+        return None
+
+    def visit_class_stmt(self, statement):
+        """Compiles a class statement. A local
+        class gets its slot first, so methods can
+        capture it, and the superclass sits in a
+        cell in the next slot while they do.
+        """
+        self.token = statement.name
+        if statement.access == LOCAL:
+            self.emit(NIL)
+        elif statement.access == CELL:
+            self.emit(MAKE_CELL)
+        if statement.superclass != None:
+            yield statement.superclass
+            self.emit_at(statement.superclass.name, SUPERCLASS)
+        self.emit(CLASS, self.make_constant(statement.name.get_lexeme()), int(statement.superclass != None))
+
+        for method in statement.methods:
+            chunk = yield self.compile_function(method, method.name.get_lexeme() == 'init')
+            self.emit(CLOSURE, self.make_constant(chunk))
+            self.emit(METHOD, self.make_constant(method.name.get_lexeme()))
+
+        if statement.access == None:
+            self.emit(DEFINE_GLOBAL, statement.slot)
+        else:
+            self.emit_set(statement.name, statement.access, statement.slot)
+            self.emit(POP)
+        if statement.superclass != None:
+            self.emit(POP)
+
+        return None
+
+    def visit_function_stmt(self, statement):
+        """Compiles a function declaration. A
+        function capturing itself gets its cell
+        before the closure is made.
+        """
+        self.token = statement.name
+        chunk = yield self.compile_function(statement)
+        if statement.access == CELL:
+            self.emit(MAKE_CELL)
+            self.emit(CLOSURE, self.make_constant(chunk))
+            self.emit(SET_CELL, statement.slot)
+            self.emit(POP)
+        else:
+            self.emit(CLOSURE, self.make_constant(chunk))
+            if statement.access == None:
+                self.emit(DEFINE_GLOBAL, statement.slot)
+
+        return None
+
+    def visit_return_stmt(self, statement):
+        """Compiles a return statement.
+        """
+        self.token = statement.keyword
+        if statement.value != None:
+            yield statement.value
+            self.emit(RETURN)
+        else:
+            self.emit_return()
+
+        return None
+
+    def visit_variable_expr(self, expr):
+        """Compiles a variable read.
+        """
+        self.token = expr.name
+        self.emit_get(expr.name, expr.access, expr.slot)
+
+    def visit_assign_expr(self, expr):
+        """Compiles an assignment.
+        """
+        yield expr.value
+        self.token = expr.name
+        self.emit_set(expr.name, expr.access, expr.slot)
+
+        return None
+
+    def visit_this_expr(self, expr):
+        """Compiles a this expression.
+        """
+        self.token = expr.keyword
+        self.emit_get(expr.keyword, expr.access, expr.slot)
+
+    def visit_super_expr(self, expr):
+        """Compiles a super expression, which
+        binds the superclass method to this.
+        """
+        self.token = expr.keyword
+        self.emit_get(expr.keyword, expr.this_access, expr.this_slot)
+        self.emit_get(expr.keyword, expr.access, expr.slot)
+        self.emit_at(expr.method, GET_SUPER, self.make_constant(expr.method.get_lexeme()))
+
+    def visit_literal_expr(self, expr):
+        """Compiles a literal.
+        """
+        if expr.value == None:
+            self.emit(NIL)
+        elif expr.value is True:
+            self.emit(TRUE)
+        elif expr.value is False:
+            self.emit(FALSE)
+        else:
+            self.emit(CONSTANT, self.make_constant(expr.value))
+
+    def visit_grouping_expr(self, expr):
+        """Compiles a grouping.
+        """
+        yield expr.expression
+
+        return None
+
+    def visit_logical_expr(self, expr):
+        """Compiles a logical expression,
+        which skips its right operand when the
+        left one decides the result.
+        """
+        yield expr.left
+        self.token = expr.operator
+        if expr.operator.get_token_type() == 'OR':
+            end_jump = self.emit_jump(JUMP_IF_TRUE)
+        else:
+            end_jump = self.emit_jump(JUMP_IF_FALSE)
+        self.emit(POP)
+        yield expr.right
+        self.patch_jump(end_jump)
+
+        return None
+
+    def visit_unary_expr(self, expr):
+        """Compiles a unary expression.
+        """
+        yield expr.right
+        if expr.operator.get_token_type() == 'MINUS':
+            self.emit_at(expr.operator, NEGATE)
+        else:
+            self.emit_at(expr.operator, NOT)
+
+        return None
+
+    def visit_binary_expr(self, expr):
+        """Compiles a binary expression.
+        """
+        yield expr.left
+        yield expr.right
+        self.emit_at(expr.operator, BINARY_OPCODES[expr.operator.get_token_type()])
+
+        return None
+
+    def visit_call_expr(self, expr):
+        """Compiles a call. A call of a property
+        reads it with GET_METHOD and calls it with
+        INVOKE, so a method is called without a
+        bound method.
+        """
+        if type(expr.callee) is Get:
+            yield expr.callee.lox_object
+            self.emit_at(expr.callee.name, GET_METHOD, self.make_constant(expr.callee.cache))
+            for argument in expr.arguments:
+                yield argument
+            self.emit_at(expr.paren, INVOKE, len(expr.arguments))
+            return None
+
+        yield expr.callee
+        for argument in expr.arguments:
+            yield argument
+        self.emit_at(expr.paren, CALL, len(expr.arguments))
+
+        return None
+
+    def visit_get_expr(self, expr):
+        """Compiles a property read, whose
+        operand is the inline cache of expr.
+        """
+        yield expr.lox_object
+        self.emit_at(expr.name, GET_PROPERTY, self.make_constant(expr.cache))
+
+        return None
+
+    def visit_set_expr(self, expr):
+        """Compiles a property write. Unless
+        the value is a plain read, the object is
+        checked before the value is evaluated, as
+        the interpreter does. The operand is the
+        inline cache of expr.
+        """
+        yield expr.lox_object
+        if not isinstance(expr.value, (Literal, Variable, This)):
+            self.emit_at(expr.name, CHECK_INSTANCE)
+        yield expr.value
+        self.emit_at(expr.name, SET_PROPERTY, self.make_constant(expr.cache))
+
+        return None
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -2,6 +2,8 @@ from LoxCallable import LoxCallable
 import time
 
 class ClockFunction(LoxCallable):
+    __slots__ = ()
+
     def arity(self):
         """Returns the arity of a
         ClockFunction class
@@ -0,0 +1,596 @@
+from LoxCallable import LoxCallable
+from LoxClass import LoxClass
+from LoxError import runtime_error, LoxException as RuntimeException
+from LoxFunction import LoxFunction, RETURN
+from LoxInstance import LoxInstance
+from ExprVisitor import ExprVisitor
+from ExprSubClasses import Get
+from Environment import Environment, Cell, UNDEFINED, LOCAL, CELL, UPVALUE
+from StmtVisitor import StmtVisitor
+from Trampoline import accept_iteratively
+
+class CompiledFunction(LoxFunction):
+    __slots__ = ('body',)
+
+    def __init__(self, declaration, body, upvalues = (), is_initializer = False, receiver = None):
+        """Initializes a CompiledFunction
+        object, a LoxFunction whose body was
+        compiled by a ClosureCompiler into the
+        Python function body.
+        """
+        super().__init__(declaration, upvalues, is_initializer, receiver)
+        self.body = body
+
+    def call(self, interpreter, arguments, receiver = None):
+        """Runs the compiled body in a new
+        frame whose first slots hold receiver,
+        or else the instance it is bound to,
+        unless it is None, and the arguments.
+        """
+        if receiver == None:
+            receiver = self.receiver
+        if receiver != None:
+            environment = Environment([receiver] + arguments, self.upvalues)
+        else:
+            environment = Environment(arguments, self.upvalues)
+        values = environment.values
+        for slot in self.declaration.cells:
+            values[slot] = Cell(values[slot])
+        completion = self.body(environment)
+
+        if self.is_initializer:
+            return receiver
+        elif completion is RETURN:
+            return interpreter.return_value
+        return None
+
+    def bind(self, instance):
+        """Returns this method bound
+        to instance.
+        """
+        return CompiledFunction(self.declaration, self.body, self.upvalues, self.is_initializer, instance)
+
+def run_sequence(codes):
+    """Returns a Python function running
+    the compiled statements codes in order,
+    which stops at the first returning RETURN.
+    >>> steps = []
+    >>> run_sequence([lambda environment: steps.append(1), lambda environment: steps.append(2)])(None)
+    >>> steps
+    [1, 2]
+    """
+    codes = tuple(codes)
+    if len(codes) == 1:
+        return codes[0]
+    def run(environment):
+        for code in codes:
+            if code(environment) is RETURN:
+                return RETURN
+    return run
+
+class ClosureCompiler(StmtVisitor, ExprVisitor):
+    def __init__(self, interpreter):
+        """Initializes a ClosureCompiler object,
+        an execution backend that compiles the
+        resolved tree of interpreter once into nested
+        Python functions, each made for its node type
+        and operator and taking the running frame. Code
+        the Resolver marked deep is left to interpreter,
+        which also holds the globals.
+        >>> from Interpreter import Interpreter
+        >>> from Parser import Parser
+        >>> from Resolver import Resolver
+        >>> from Scanner import Scanner
+        >>> source = '''
+        ... fun fib(n) { if (n < 2) return n; return fib(n - 2) + fib(n - 1); }
+        ... class Pair { init(a, b) { this.a = a; this.b = b; } sum() { return this.a + this.b; } }
+        ... print Pair(fib(10), 3).sum();'''
+        >>> tree = Parser(Scanner(source).get_tokens()).parse()
+        >>> interpreter = Interpreter(tree)
+        >>> Resolver(interpreter).resolve(tree)
+        >>> ClosureCompiler(interpreter).interpret(tree)
+        58
+        """
+        self.interpreter = interpreter
+        self.globals = interpreter.globals.values
+
+    def interpret(self, statements):
+        """Compiles statements and runs them
+        in the interpreter's top-level frame,
+        reporting runtime errors like the
+        interpreter does.
+        """
+        program = self.compile(statements)
+        try:
+            program(self.interpreter.environment)
+        except RuntimeException as error:
+            runtime_error(error)
+
+    def compile(self, statements):
+        """Returns a Python function running
+        the top-level statements in the frame it
+        is given.
+        """
+        return run_sequence([self.compile_top_level(statement) for statement in statements] or [lambda environment: None])
+
+    def compile_top_level(self, statement):
+        """Compiles a top-level statement, or
+        hands one marked deep to the interpreter.
+        """
+        if statement not in self.interpreter.deep_nodes:
+            return self.compile_node(statement)
+        interpreter = self.interpreter
+        def run_deep(environment):
+            accept_iteratively(statement, interpreter.deep_interpreter)
+        return run_deep
+
+    def compile_node(self, node):
+        """Returns the compiled form of a
+        statement or an expression.
+        """
+        return node.accept(self)
+
+    def compile_function(self, declaration, is_initializer = False):
+        """Returns a Python function that
+        makes the LoxFunction for declaration
+        from the frame it is given, with the
+        cells the declaration captures. A body
+        marked deep stays interpreted.
+        """
+        sources = declaration.upvalues
+        if declaration in self.interpreter.deep_nodes:
+            def make(upvalues):
+                return LoxFunction(declaration, upvalues, is_initializer, None, True)
+        else:
+            body = run_sequence([self.compile_node(statement) for statement in declaration.body] or [lambda environment: None])
+            def make(upvalues):
+                return CompiledFunction(declaration, body, upvalues, is_initializer)
+
+        if len(sources) == 0:
+            def function(environment):
+                return make(())
+        else:
+            def function(environment):
+                values = environment.values
+                upvalues = environment.upvalues
+                return make(tuple(values[source] if source >= 0 else upvalues[-1 - source] for source in sources))
+        return function
+
+    def variable_getter(self, name, access, slot):
+        """Returns a Python function reading
+        a variable the way access tells.
+        """
+        if access == LOCAL:
+            def get(environment):
+                return environment.values[slot]
+        elif access == CELL:
+            def get(environment):
+                return environment.values[slot].value
+        elif access == UPVALUE:
+            def get(environment):
+                return environment.upvalues[slot].value
+        else:
+            global_values = self.globals
+            def get(environment):
+                value = global_values[slot]
+                if value is UNDEFINED:
+                    raise RuntimeException(name, f"Undefined variable \'{name.get_lexeme()}\'")
+                return value
+        return get
+
+    def variable_definer(self, declaration):
+        """Returns a Python function taking a
+        frame and a value, which defines the
+        variable declaration introduces.
+        """
+        slot = declaration.slot
+        if declaration.access == LOCAL:
+            def define(environment, value):
+                environment.values.append(value)
+        elif declaration.access == CELL:
+            def define(environment, value):
+                environment.values.append(Cell(value))
+        else:
+            global_values = self.globals
+            def define(environment, value):
+                global_values[slot] = value
+        return define
+
+    def visit_var_stmt(self, statement):
+        """Compiles a variable declaration.
+        """
+        define = self.variable_definer(statement)
+        if statement.initializer == None:
+            def var(environment):
+                define(environment, None)
+        else:
+            initializer = self.compile_node(statement.initializer)
+            def var(environment):
+                define(environment, initializer(environment))
+        return var
+
+    def visit_if_stmt(self, statement):
+        """Compiles an if statement.
+        """
+        condition = self.compile_node(statement.condition)
+        then_branch = self.compile_node(statement.then_branch)
+        if statement.else_branch == None:
+            def if_then(environment):
+                value = condition(environment)
+                if value is not None and value is not False:
+                    return then_branch(environment)
+            return if_then
+        else_branch = self.compile_node(statement.else_branch)
+        def if_then_else(environment):
+            value = condition(environment)
+            if value is not None and value is not False:
+                return then_branch(environment)
+            else:
+                return else_branch(environment)
+        return if_then_else
+
+    def visit_expression_stmt(self, statement):
+        """Compiles an expression statement,
+        which runs as its expression.
+        """
+        return self.compile_node(statement.expression)
+
+    def visit_print_stmt(self, statement):
+        """Compiles a print statement.
+        """
+        expression = self.compile_node(statement.expression)
+        stringify = self.interpreter.stringify
+        def print_value(environment):
+            print(stringify(expression(environment)))
+        return print_value
+
+    def visit_while_stmt(self, statement):
+        """Compiles a while statement.
+        """
+        condition = self.compile_node(statement.condition)
+        body = self.compile_node(statement.body)
+        def loop(environment):
+            value = condition(environment)
+            while value is not None and value is not False:
+                if body(environment) is RETURN:
+                    return RETURN
+                value = condition(environment)
+        return loop
+
+    def visit_block_stmt(self, statement):
+        """Compiles a block, which runs in the
+        current frame and drops its variables
+        when it ends.
+        """
+        statements = tuple(self.compile_node(inner_statement) for inner_statement in statement.statements)
+        def block(environment):
+            values = environment.values
+            base = len(values)
+            for code in statements:
+                if code(environment) is RETURN:
+                    del values[base:]
+                    return RETURN
+            del values[base:]
+        return block
+
+    def visit_class_stmt(self, statement):
+        """Compiles a class statement, defining
+        the class name before the methods capture
+        it and keeping the superclass in a cell
+        of the next slot meanwhile.
+        """
+        superclass_code = None
+        if statement.superclass != None:
+            superclass_code = self.compile_node(statement.superclass)
+        define = self.variable_definer(statement)
+        methods = tuple((method.name.get_lexeme(), self.compile_function(method, method.name.get_lexeme() == 'init')) for method in statement.methods)
+        name = statement.name.get_lexeme()
+        access = statement.access
+        slot = statement.slot
+        global_values = self.globals
+
+        def klass(environment):
+            superclass = None
+            if superclass_code != None:
+                superclass = superclass_code(environment)
+                if not isinstance(superclass, LoxClass):
+                    raise RuntimeException(statement.superclass.name, "Superclass must be a class")
+
+            define(environment, None)
+            values = environment.values
+            if superclass_code != None:
+                values.append(Cell(superclass))
+            lox_class = LoxClass(name, superclass, {method_name:make(environment) for method_name, make in methods})
+            if superclass_code != None:
+                values.pop()
+
+            if access == LOCAL:
+                values[slot] = lox_class
+            elif access == CELL:
+                values[slot].value = lox_class
+            else:
+                global_values[slot] = lox_class
+        return klass
+
+    def visit_function_stmt(self, statement):
+        """Compiles a function declaration. A
+        function capturing itself gets its cell
+        before it is made.
+        """
+        make = self.compile_function(statement)
+        slot = statement.slot
+        if statement.access == LOCAL:
+            def function(environment):
+                environment.values.append(make(environment))
+        elif statement.access == CELL:
+            def function(environment):
+                cell = Cell()
+                environment.values.append(cell)
+                cell.value = make(environment)
+        else:
+            global_values = self.globals
+            def function(environment):
+                global_values[slot] = make(environment)
+        return function
+
+    def visit_return_stmt(self, statement):
+        """Compiles a return statement, which
+        leaves its value in the interpreter and
+        returns RETURN like the interpreter.
+        """
+        interpreter = self.interpreter
+        if statement.value == None:
+            def return_nil(environment):
+                interpreter.return_value = None
+                return RETURN
+            return return_nil
+        value = self.compile_node(statement.value)
+        def return_value(environment):
+            interpreter.return_value = value(environment)
+            return RETURN
+        return return_value
+
+    def visit_variable_expr(self, expr):
+        """Compiles a variable read.
+        """
+        return self.variable_getter(expr.name, expr.access, expr.slot)
+
+    def visit_assign_expr(self, expr):
+        """Compiles an assignment.
+        """
+        value = self.compile_node(expr.value)
+        slot = expr.slot
+        if expr.access == LOCAL:
+            def assign(environment):
+                result = environment.values[slot] = value(environment)
+                return result
+        elif expr.access == CELL:
+            def assign(environment):
+                result = environment.values[slot].value = value(environment)
+                return result
+        elif expr.access == UPVALUE:
+            def assign(environment):
+                result = environment.upvalues[slot].value = value(environment)
+                return result
+        else:
+            assign_slot = self.interpreter.globals.assign_slot
+            name = expr.name
+            def assign(environment):
+                result = value(environment)
+                assign_slot(slot, name, result)
+                return result
+        return assign
+
+    def visit_this_expr(self, expr):
+        """Compiles a this expression.
+        """
+        return self.variable_getter(expr.keyword, expr.access, expr.slot)
+
+    def visit_super_expr(self, expr):
+        """Compiles a super expression, which
+        returns the superclass method bound to
+        this.
+        """
+        superclass = self.variable_getter(expr.keyword, expr.access, expr.slot)
+        this = self.variable_getter(expr.keyword, expr.this_access, expr.this_slot)
+        method_name = expr.method.get_lexeme()
+        def super_method(environment):
+            method = superclass(environment).find_method(method_name)
+            if method == None:
+                raise RuntimeException(expr.method, f"Undefined property \'{method_name}\'")
+            return method.bind(this(environment))
+        return super_method
+
+    def visit_literal_expr(self, expr):
+        """Compiles a literal.
+        """
+        value = expr.value
+        def literal(environment):
+            return value
+        return literal
+
+    def visit_grouping_expr(self, expr):
+        """Compiles a grouping, which runs
+        as its inner expression.
+        """
+        return self.compile_node(expr.expression)
+
+    def visit_logical_expr(self, expr):
+        """Compiles a logical expression.
+        """
+        left = self.compile_node(expr.left)
+        right = self.compile_node(expr.right)
+        if expr.operator.get_token_type() == 'OR':
+            def logical_or(environment):
+                value = left(environment)
+                if value is not None and value is not False:
+                    return value
+                return right(environment)
+            return logical_or
+        def logical_and(environment):
+            value = left(environment)
+            if value is None or value is False:
+                return value
+            return right(environment)
+        return logical_and
+
+    def visit_unary_expr(self, expr):
+        """Compiles a unary expression into a
+        call of the handler the Resolver bound
+        it to.
+        """
+        right = self.compile_node(expr.right)
+        operator = expr.operator
+        operation = expr.operation
+        def unary(environment):
+            return operation(operator, right(environment))
+        return unary
+
+    def visit_binary_expr(self, expr):
+        """Compiles a binary expression into a
+        call of the handler the Resolver bound
+        it to.
+        >>> from Interpreter import Interpreter
+        >>> from Parser import Parser
+        >>> from Resolver import Resolver
+        >>> from Scanner import Scanner
+        >>> tree = Parser(Scanner('print 1 + 2 * 3 >= 7; print "a" + "b"; print nil == false;').get_tokens()).parse()
+        >>> interpreter = Interpreter(tree)
+        >>> Resolver(interpreter).resolve(tree)
+        >>> ClosureCompiler(interpreter).interpret(tree)
+        true
+        ab
+        false
+        """
+        left = self.compile_node(expr.left)
+        right = self.compile_node(expr.right)
+        operator = expr.operator
+        operation = expr.operation
+        def binary(environment):
+            return operation(operator, left(environment), right(environment))
+        return binary
+
+    def visit_get_expr(self, expr):
+        """Compiles a property read.
+        """
+        lox_object = self.compile_node(expr.lox_object)
+        name = expr.name
+        cache = expr.cache
+        find_property = self.interpreter.find_property
+        def get(environment):
+            instance = lox_object(environment)
+            if not isinstance(instance, LoxInstance):
+                raise RuntimeException(name, "Only instances have properties.")
+            shape = instance.shape
+            if shape is cache.key:
+                cache.hits += 1
+                found = cache.value
+            else:
+                found = find_property(expr, shape)
+            if type(found) is int:
+                return instance.values[found]
+            return found.bind(instance)
+        return get
+
+    def visit_set_expr(self, expr):
+        """Compiles a property write.
+        """
+        lox_object = self.compile_node(expr.lox_object)
+        value = self.compile_node(expr.value)
+        store = self.interpreter.set_property
+        name = expr.name
+        cache = expr.cache
+        def set_property(environment):
+            instance = lox_object(environment)
+            if not isinstance(instance, LoxInstance):
+                raise RuntimeException(name, "Only instances have fields.")
+            result = value(environment)
+            shape = instance.shape
+            if shape is cache.key and type(cache.value) is int:
+                cache.hits += 1
+                instance.values[cache.value] = result
+            else:
+                store(expr, instance, result)
+            return result
+        return set_property
+
+    def visit_call_expr(self, expr):
+        """Compiles a call, with the
+        arguments evaluated without a loop
+        for up to two of them. A call of a
+        property is compiled by invoker.
+        """
+        arguments = tuple(self.compile_node(argument) for argument in expr.arguments)
+        interpreter = self.interpreter
+        paren = expr.paren
+        count = len(arguments)
+
+        if count == 0:
+            def evaluate_arguments(environment):
+                return []
+        elif count == 1:
+            first = arguments[0]
+            def evaluate_arguments(environment):
+                return [first(environment)]
+        elif count == 2:
+            first, second = arguments
+            def evaluate_arguments(environment):
+                return [first(environment), second(environment)]
+        else:
+            def evaluate_arguments(environment):
+                return [argument(environment) for argument in arguments]
+
+        if type(expr.callee) is Get:
+            return self.invoker(expr, evaluate_arguments)
+        callee = self.compile_node(expr.callee)
+
+        def call(environment):
+            function = callee(environment)
+            values = evaluate_arguments(environment)
+            if not isinstance(function, LoxCallable):
+                raise RuntimeException(paren, "Can only call functions and classes")
+            if count != function.arity():
+                raise RuntimeException(paren, f"Expected {function.arity()} arguments but got {count}")
+            return function.call(interpreter, values)
+        return call
+
+    def invoker(self, expr, evaluate_arguments):
+        """Returns a Python function calling a
+        property, which calls a method of the class
+        with the instance as its receiver, without a
+        bound method, like the Interpreter does.
+        """
+        lox_object = self.compile_node(expr.callee.lox_object)
+        name = expr.callee.name
+        cache = expr.callee.cache
+        interpreter = self.interpreter
+        find_property = interpreter.find_property
+        paren = expr.paren
+        count = len(expr.arguments)
+        def invoke(environment):
+            instance = lox_object(environment)
+            if not isinstance(instance, LoxInstance):
+                raise RuntimeException(name, "Only instances have properties.")
+            shape = instance.shape
+            if shape is cache.key:
+                cache.hits += 1
+                method = cache.value
+            else:
+                method = find_property(expr.callee, shape)
+            if type(method) is not int:
+                values = evaluate_arguments(environment)
+                if count != method.arity():
+                    raise RuntimeException(paren, f"Expected {method.arity()} arguments but got {count}")
+                return method.call(interpreter, values, instance)
+            function = instance.values[method]
+            values = evaluate_arguments(environment)
+            if not isinstance(function, LoxCallable):
+                raise RuntimeException(paren, "Can only call functions and classes")
+            if count != function.arity():
+                raise RuntimeException(paren, f"Expected {function.arity()} arguments but got {count}")
+            return function.call(interpreter, values)
+        return invoke
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -1,40 +1,175 @@
 import sys
-from Scanner import Scanner
+from ASTCache import ASTCache
+from Bytecode import disassemble
+from BytecodeCompiler import BytecodeCompiler
+from ClosureCompiler import ClosureCompiler
+from InlineCache import report
+from MemoryCensus import census, report as census_report
+from Scanner import Scanner, mapped_source
+from ParallelScanner import ParallelScanner
 from Interpreter import Interpreter
 from Parser import Parser
 from Resolver import Resolver
+from VirtualMachine import VirtualMachine
+from TokenBuffer import TokenBuffer
+from Transpiler import Transpiler
 
-def run_file(file_path):
-    """This function is executed when two
-    arguments are passed in the command-line.
-    The second argument is a file path to open and
-    read all its lines. An exception is raised if the
-    file path is not found.
+# Execution backends, selected with --backend: the tree-walking
+# Interpreter, the ClosureCompiler built on top of it, the
+# VirtualMachine running bytecode, or the Transpiler to Python.
+BACKENDS = ('tree', 'closures', 'vm', 'python')
+
+def execute(interpreter, backend = 'tree', listing = False):
+    """Runs the resolved tree of interpreter
+    with the given backend. With listing, the
+    bytecode of the tree is printed instead, or
+    its Python source for the python backend.
+    >>> from Parser import Parser
+    >>> from Resolver import Resolver
+    >>> interpreter = Interpreter(Parser(Scanner("print 1 + 2;").get_tokens()).parse())
+    >>> Resolver(interpreter).resolve(interpreter.tree)
+    >>> execute(interpreter, 'closures')
+    3
+    >>> execute(interpreter, 'vm')
+    3
+    >>> execute(interpreter, 'python')
+    3
+    >>> execute(interpreter, listing = True)
+    == script ==
+    0000    1 CONSTANT        0 '1.0'
+    0002    | CONSTANT        1 '2.0'
+    0004    | ADD
+    0005    | PRINT
+    0006    | NIL
+    0007    | RETURN
+    >>> execute(interpreter, 'python', True)
+    def script():
+        print(stringify((1.0 + 2.0)))
+    """
+    if listing and backend == 'python':
+        print(Transpiler(interpreter).translate(interpreter.tree))
+    elif listing:
+        chunk = BytecodeCompiler().compile(interpreter.tree)
+        if chunk != None:
+            print(disassemble(chunk))
+    elif backend == 'closures':
+        ClosureCompiler(interpreter).interpret(interpreter.tree)
+    elif backend == 'vm':
+        VirtualMachine(interpreter).interpret(interpreter.tree)
+    elif backend == 'python':
+        Transpiler(interpreter).interpret(interpreter.tree)
+    else:
+        interpreter.interpret(interpreter.tree)
+
+def run_file(file_path, jobs = 1, cache = None, backend = 'tree', listing = False, caches = False, memory = False):
+    """This function is executed when a script
+    is passed in the command-line. The script is
+    opened and memory-mapped, so it is scanned
+    straight from the mapped file, across jobs
+    worker processes when jobs is more than one.
+    When an ASTCache is given, a script seen before
+    skips scanning, parsing and resolving, and a
+    new one is stored once it resolves without
+    errors. Its entries are pickles, so the cache
+    directory must be trusted. The script runs with
+    the named backend, or its listing is printed
+    when listing is set. With caches, the hits and
+    misses of every inline cache are reported on
+    stderr once the script has run, and with memory,
+    the count and bytes of its live objects of every
+    runtime type. An exception is raised if the file
+    path is not found.
+    >>> import contextlib, io
+    >>> try:
+    ...     with contextlib.redirect_stderr(sys.stdout):
+    ...         run_file("Tests/test29.lox", caches = True)
+    ... except SystemExit as exit:
+    ...     print(exit.code)
+    1
+    Undefined property y.
+    [line 5]
+    line 3 'x': 0 hits, 1 misses, monomorphic
+    line 4 'x': 0 hits, 1 misses, monomorphic
+    line 5 'y': 0 hits, 1 misses, empty
+    3 sites: 0 hits, 3 misses
+    70
+    >>> text = io.StringIO()
+    >>> try:
+    ...     with contextlib.redirect_stderr(text):
+    ...         run_file("Tests/test29.lox", memory = True)
+    ... except SystemExit as exit:
+    ...     print(exit.code)
+    1
+    Undefined property y.
+    [line 5]
+    70
+    >>> [line.split()[-1] for line in text.getvalue().splitlines() if line.endswith('LoxInstance')]
+    ['LoxInstance']
     """
     try:
-        with open(file_path, 'r') as file:
-            lines = file.readlines()
-            if len(lines) > 0 and lines[0][-1] == '\n':
-                lines.append("")
-            scnr = Scanner(lines)
-            token_list = scnr.get_tokens()
-            if scnr.lox_error == False:
-                parser = Parser(token_list)
-                abstract_syntax_tree = parser.parse()
-                if parser.lox_error == False:
-                    interpreter = Interpreter(abstract_syntax_tree)
-                    resolver = Resolver(interpreter)
-                    resolver.resolve(abstract_syntax_tree)
-                    if resolver.lox_error == False:
-                        interpreter.interpret(interpreter.tree)
+        with open(file_path, 'rb') as file, mapped_source(file) as source:
+            interpreter = front_end(source, jobs, cache)
     except FileNotFoundError:
         print("File Not Found")
+        return None
+    if interpreter != None:
+        try:
+            execute(interpreter, backend, listing)
+        finally:
+            report_run(interpreter, caches, memory)
+
+def front_end(source, jobs = 1, cache = None):
+    """Returns an Interpreter holding the
+    resolved syntax tree of the script in source,
+    from cache when it has an entry, or None when
+    the script has errors. The script is scanned
+    across jobs worker processes when jobs is more
+    than one. Nothing refers to source afterwards,
+    so run_file closes its memory map before the
+    script runs.
+    >>> front_end(b'var a = 1;').tree[0].name.get_lexeme()
+    'a'
+    >>> front_end(b'var a = ;')
+    [line 1] Error at ';': Expect expression.
+    """
+    if cache != None:
+        interpreter = cache.load(source)
+        if interpreter != None:
+            return interpreter
+    if jobs > 1:
+        scnr = ParallelScanner(source, jobs)
+    else:
+        scnr = Scanner(source)
+    parser = Parser(TokenBuffer(scnr.iter_tokens()), scnr)
+    abstract_syntax_tree = parser.parse()
+    if scnr.lox_error == False and parser.lox_error == False:
+        interpreter = Interpreter(abstract_syntax_tree)
+        resolver = Resolver(interpreter)
+        resolver.resolve(abstract_syntax_tree)
+        if resolver.lox_error == False:
+            if cache != None:
+                cache.store(source, interpreter)
+            return interpreter
+    return None
 
-def run_prompt():
+def report_run(interpreter, caches, memory):
+    """Prints on stderr the inline caches of
+    the tree of interpreter, with caches, and a
+    census of the live runtime objects, with
+    memory, once its script has run, even when
+    it ended in a runtime error.
+    """
+    if caches:
+        print(report(interpreter.tree), file=sys.stderr)
+    if memory:
+        print(census_report(census()), file=sys.stderr)
+
+def run_prompt(backend = 'tree'):
     """This function gets called if only one
     argument gets passed in the command-line.
     It continuously prompts the user to enter a
-    line of lox code. Control-Z terminates the program.
+    line of lox code, run with the named backend.
+    Control-Z terminates the program.
     """
     scnr = Scanner([])
     while(True):
@@ -50,17 +185,70 @@ def run_prompt():
                     resolver = Resolver(interpreter)
                     resolver.resolve(abstract_syntax_tree)
                     if resolver.lox_error == False:
-                        interpreter.interpret(abstract_syntax_tree)
+                        execute(interpreter, backend)
             scnr.lox_error = False
         except EOFError:
             break
         except SystemExit:
             break
 
-if len(sys.argv) > 2:
-    print("Usage: plox [script]")
-    exit(64)
-elif len(sys.argv) == 2:
-    run_file(sys.argv[1])
-else:
-    run_prompt()
\ No newline at end of file
+def parse_options(arguments):
+    """Separates the command-line options from
+    the other arguments. Returns a dictionary with
+    the options and the list of remaining arguments,
+    or None when an option is malformed.
+    >>> parse_options(['--jobs', '4', 'script.lox'])
+    ({'jobs': 4, 'cache': None, 'backend': 'tree', 'disassemble': False, 'inline_caches': False, 'memory_census': False}, ['script.lox'])
+    >>> parse_options(['--cache', '.plox', 'script.lox'])
+    ({'jobs': 1, 'cache': '.plox', 'backend': 'tree', 'disassemble': False, 'inline_caches': False, 'memory_census': False}, ['script.lox'])
+    >>> parse_options(['--backend', 'vm', '--disassemble', '--inline-caches', '--memory-census', 'script.lox'])
+    ({'jobs': 1, 'cache': None, 'backend': 'vm', 'disassemble': True, 'inline_caches': True, 'memory_census': True}, ['script.lox'])
+    >>> parse_options(['--jobs', 'many'])
+    >>> parse_options(['--cache'])
+    >>> parse_options(['--backend', 'jit'])
+    """
+    options = {'jobs':1, 'cache':None, 'backend':'tree', 'disassemble':False, 'inline_caches':False, 'memory_census':False}
+    remaining = []
+    i = 0
+    while i < len(arguments):
+        if arguments[i] == '--jobs':
+            if i + 1 >= len(arguments) or not arguments[i + 1].isdigit() or int(arguments[i + 1]) < 1:
+                return None
+            options['jobs'] = int(arguments[i + 1])
+            i += 1
+        elif arguments[i] == '--cache':
+            if i + 1 >= len(arguments):
+                return None
+            options['cache'] = arguments[i + 1]
+            i += 1
+        elif arguments[i] == '--backend':
+            if i + 1 >= len(arguments) or arguments[i + 1] not in BACKENDS:
+                return None
+            options['backend'] = arguments[i + 1]
+            i += 1
+        elif arguments[i] == '--disassemble':
+            options['disassemble'] = True
+        elif arguments[i] == '--inline-caches':
+            options['inline_caches'] = True
+        elif arguments[i] == '--memory-census':
+            options['memory_census'] = True
+        elif arguments[i].startswith('--'):
+            return None
+        else:
+            remaining.append(arguments[i])
+        i += 1
+    return options, remaining
+
+if __name__ == '__main__':
+    parsed = parse_options(sys.argv[1:])
+    if parsed == None or len(parsed[1]) > 1:
+        print("Usage: plox [--jobs N] [--cache DIR] [--backend tree|closures|vm|python] [--disassemble] [--inline-caches] [--memory-census] [script]")
+        exit(64)
+    options, arguments = parsed
+    if len(arguments) == 1:
+        cache = None
+        if options['cache'] != None:
+            cache = ASTCache(options['cache'])
+        run_file(arguments[0], options['jobs'], cache, options['backend'], options['disassemble'], options['inline_caches'], options['memory_census'])
+    else:
+        run_prompt(options['backend'])
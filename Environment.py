@@ -1,113 +1,184 @@
 from LoxError import LoxException as RuntimeException
 
+# How the Resolver tells the interpreter to reach a local variable: a
+# slot of the current frame, a Cell in a slot of the current frame, or
+# a Cell among the upvalues of the running function. Globals have an
+# access of None and are read from their GlobalEnvironment cell.
+LOCAL = 0
+CELL = 1
+UPVALUE = 2
+
+class Cell:
+    __slots__ = ('value',)
+
+    def __init__(self, value = None):
+        """Initializes a Cell object, the box
+        holding a local variable that a closure
+        captures, shared by the frame that declared
+        it and every closure using it.
+        >>> cell = Cell(10)
+        >>> cell.value
+        10
+        >>> Cell().value
+        """
+        self.value = value
+
+    def __repr__(self):
+        """Returns a string showing the
+        value of the cell.
+        >>> Cell(10)
+        Cell(10)
+        """
+        return f"Cell({self.value!r})"
+
 class Environment:
-    def __init__(self, values = dict(), enclosing = None):
-        """Initializes an Environment
-        object with values as a field.
+    __slots__ = ('values', 'upvalues')
+
+    def __init__(self, values = None, upvalues = ()):
+        """Initializes an Environment object,
+        the frame of one function call or of the
+        top-level script. Its locals live in the
+        values list, in the slots the Resolver gave
+        them, and blocks share the frame of their
+        function. The upvalues are the cells the
+        running function captured. The values list
+        is kept, not copied, so a call hands over
+        the list of its arguments.
         >>> env = Environment()
+        >>> env.values, env.upvalues
+        ([], ())
+        >>> env = Environment([10, 20], (Cell(5),))
+        >>> env.values, env.upvalues
+        ([10, 20], (Cell(5),))
+        """
+        self.values = [] if values == None else values
+        self.upvalues = upvalues
+
+    def define(self, name, value):
+        """Adds a new variable in the next
+        slot. Variables are defined in the order
+        they are declared, so name is not needed.
+        >>> env = Environment()
+        >>> env.define('a', 10)
         >>> env.values
-        {}
-        >>> env.enclosing
-        >>> env = Environment({'a':10, 'b':20})
-        >>> env.values
-        {'a': 10, 'b': 20}
-        >>> previous_env = env
-        >>> env = Environment({'c':15}, previous_env)
+        [10]
+        >>> env.define('b', 20)
         >>> env.values
-        {'c': 15}
-        >>> env.enclosing is previous_env
+        [10, 20]
+        """
+        self.values.append(value)
+
+# Marks a global cell whose variable has not been defined yet.
+UNDEFINED = object()
+
+class GlobalEnvironment:
+    __slots__ = ('names', 'values')
+
+    def __init__(self, values = None):
+        """Initializes a GlobalEnvironment
+        object. Every global name gets a cell in
+        the values list, and the Resolver binds each
+        reference to its cell index, so globals are
+        read without looking up their name. A cell
+        holds UNDEFINED until its variable is defined.
+        >>> env = GlobalEnvironment()
+        >>> env.names, env.values
+        ({}, [])
+        >>> env = GlobalEnvironment({'a':10, 'b':20})
+        >>> env.names, env.values
+        ({'a': 0, 'b': 1}, [10, 20])
+        """
+        self.names = {}
+        self.values = []
+        if values != None:
+            for name in values:
+                self.define(name, values[name])
+
+    def slot(self, name):
+        """Returns the index of the cell of
+        the global called name, adding an
+        undefined cell the first time.
+        >>> env = GlobalEnvironment({'a':10})
+        >>> env.slot('b'), env.slot('a'), env.slot('b')
+        (1, 0, 1)
+        >>> env.values[1] is UNDEFINED
         True
         """
-        self.values = dict(values)
-        self.enclosing = enclosing
-    
+        index = self.names.get(name)
+        if index == None:
+            index = self.names[name] = len(self.values)
+            self.values.append(UNDEFINED)
+        return index
+
     def define(self, name, value):
-        """Adds a new variable
-        to the values dictionary
-        >>> env = Environment()
+        """Adds a new variable, or redefines
+        an existing one, in the cell of name.
+        >>> env = GlobalEnvironment()
         >>> env.define('a', 10)
         >>> env.values
-        {'a': 10}
-        >>> env = Environment({'a':10})
-        >>> env.define('b', 20)
+        [10]
+        >>> env.define('a', 20)
         >>> env.values
-        {'a': 10, 'b': 20}
+        [20]
         """
-        self.values[name] = value
-    
-    def get(self, name):
-        """Returns the value of self.values
-        given name.
-        >>> env = Environment()
+        self.values[self.slot(name)] = value
+
+    def get_slot(self, slot, name):
+        """Returns the value in cell slot.
+        The token name is only used to report a
+        variable that was never defined.
         >>> from Token import Token
-        >>> env.define('a', 10)
-        >>> env.get(Token('IDENTIFIER', 1, 'a', None))
+        >>> env = GlobalEnvironment({'a':10})
+        >>> env.get_slot(0, Token('IDENTIFIER', 1, 'a', None))
         10
-        >>> env = Environment(enclosing = env)
-        >>> env.define('o', 20)
-        >>> env.get(Token('IDENTIFIER', 1, 'a', None))
-        10
-        >>> env.get(Token('IDENTIFIER', 1, 'o', None))
-        20
+        >>> env.get_slot(env.slot('o'), Token('IDENTIFIER', 1, 'o', None))
+        Traceback (most recent call last):
+        ...
+        LoxError.LoxException: (Token('IDENTIFIER', 1, 'o', None), "Undefined variable 'o'")
         """
-        if name.get_lexeme() in self.values:
-            return self.values[name.get_lexeme()]
-        elif self.enclosing != None:
-            return self.enclosing.get(name)
-        else:
+        value = self.values[slot]
+        if value is UNDEFINED:
             raise RuntimeException(name, f"Undefined variable \'{name.get_lexeme()}\'")
-    
-    def assign(self, name, value):
-        """Reassigns existing variables
-        in dictionary values with
-        new value.
+        return value
+
+    def assign_slot(self, slot, name, value):
+        """Reassigns the variable in cell
+        slot, which must have been defined.
         >>> from Token import Token
-        >>> env = Environment({'a':10})
+        >>> env = GlobalEnvironment({'a':10})
+        >>> env.assign_slot(0, Token('IDENTIFIER', 1, 'a', None), 20)
+        >>> env.values
+        [20]
+        >>> env.assign_slot(env.slot('o'), Token('IDENTIFIER', 1, 'o', None), 20)
+        Traceback (most recent call last):
+        ...
+        LoxError.LoxException: (Token('IDENTIFIER', 1, 'o', None), "Undefined variable 'o'")
+        """
+        if self.values[slot] is UNDEFINED:
+            raise RuntimeException(name, f"Undefined variable \'{name.get_lexeme()}\'")
+        self.values[slot] = value
+
+    def get(self, name):
+        """Returns the value of the
+        global named by the token name.
+        >>> from Token import Token
+        >>> env = GlobalEnvironment({'a':10})
         >>> env.get(Token('IDENTIFIER', 1, 'a', None))
         10
+        """
+        return self.get_slot(self.slot(name.get_lexeme()), name)
+
+    def assign(self, name, value):
+        """Reassigns the global named by
+        the token name with new value.
+        >>> from Token import Token
+        >>> env = GlobalEnvironment({'a':10})
         >>> env.assign(Token('IDENTIFIER', 1, 'a', None), 20)
         >>> env.get(Token('IDENTIFIER', 1, 'a', None))
         20
-        >>> env = Environment(enclosing = env)
-        >>> env.define('b', 5)
-        >>> env.assign(Token('IDENTIFIER', 1, 'b', None), 10)
-        >>> env.get(Token('IDENTIFIER', 1, 'b', None))
-        10
-        >>> env.get(Token('IDENTIFIER', 1, 'a', None))
-        20
-        """
-        if name.get_lexeme() in self.values:
-            self.values[name.get_lexeme()] = value
-            return None
-        elif self.enclosing != None:
-            self.enclosing.assign(name, value)
-            return None
-        else:
-            raise RuntimeException(name, f"Undefined variable \'{name.get_lexeme()}\'")
-        
-    def get_at(self, distance, name):
-        """Calls the ancestor method and
-        returns the value of a variable inside the
-        values dictionary.
-        """
-        return self.ancestor(distance).values.get(name)
-    
-    def ancestor(self, distance):
-        """Returns the local environment
-        given the distance.
-        """
-        environment = self
-        for __ in range(distance):
-            environment = environment.enclosing
-        
-        return environment
-    
-    def assign_at(self, distance, name, value):
-        """Assigns given variable with new
-        value using distance.
         """
-        self.ancestor(distance).values[name.get_lexeme()] = value
+        self.assign_slot(self.slot(name.get_lexeme()), name, value)
 
 if __name__=='__main__':
     import doctest
-    doctest.testmod()
\ No newline at end of file
+    doctest.testmod()
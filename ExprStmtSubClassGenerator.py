@@ -16,6 +16,17 @@ EXPRESSION_SUBCLASS_NAMES_FIELDS = {
     "Set":["lox_object", "name", "value"]
 }
 
+EXPRESSION_SUBCLASS_RESOLUTION_FIELDS = {
+    "Assign":["access", "slot"],
+    "Binary":["operation"],
+    "Get":["cache"],
+    "Set":["cache"],
+    "Super":["access", "slot", "this_access", "this_slot"],
+    "This":["access", "slot"],
+    "Unary":["operation"],
+    "Variable":["access", "slot"]
+}
+
 EXPRESSION_VISITOR_METHODS = (
     "visit_binary_expr",
     "visit_grouping_expr",
@@ -52,12 +63,25 @@ STATEMENT_SUBCLASS_NAMES_FIELDS = {
     "Var":["name", "initializer"]
 }
 
-def generate_expression_classes(base_class, file_name, class_names):
+STATEMENT_SUBCLASS_RESOLUTION_FIELDS = {
+    "Class":["access", "slot"],
+    "Function":["access", "slot", "upvalues", "cells"],
+    "Var":["access", "slot"]
+}
+
+def generate_expression_classes(base_class, file_name, class_names, resolution_fields = dict()):
     """Opens a file with the name
     ExprSubClasses and will write
     a bunch of classes, each representing
     the data inside the global
-    dictionary SUBCLASS_NAMES_FIELDS
+    dictionary SUBCLASS_NAMES_FIELDS.
+    Every class declares its fields as
+    __slots__, so nodes carry no __dict__,
+    and lists them in a fields tuple that
+    passes can use to walk any node.
+    Classes in resolution_fields get extra
+    slots, outside fields, that the Resolver
+    fills in and that start as None.
     """
     with open(file_name, 'w') as file:
         if base_class == 'Expr':
@@ -67,14 +91,19 @@ def generate_expression_classes(base_class, file_name, class_names):
         for expr_class in class_names:
             class_name = expr_class
             class_fields = class_names[expr_class]
+            extra_fields = resolution_fields.get(expr_class, [])
             
             file.write(f"class {class_name}({base_class}):\n")
+            file.write(f"    __slots__ = {tuple(class_fields + extra_fields)!r}\n")
+            file.write(f"    fields = {tuple(class_fields)!r}\n\n")
             file.write(f"    def __init__(self")
             for class_field in class_fields:
                 file.write(f", {class_field}")
             file.write(f"):\n")
             for class_field in class_fields:
                 file.write(f"       self.{class_field} = {class_field}\n")
+            for extra_field in extra_fields:
+                file.write(f"       self.{extra_field} = None\n")
             file.write("    def accept(self, visitor):\n")
             file.write(f"        return visitor.visit_{class_name[0].lower() + class_name[1:]}_{base_class.lower()}(self)\n")
             file.write("\n")
@@ -95,7 +124,7 @@ def generate_visitor_class(visitor_type, methods):
             file.write(f"    def {method}(expr):\n")
             file.write(f"        pass\n\n")
 
-generate_expression_classes("Expr", "ExprSubClasses.py", EXPRESSION_SUBCLASS_NAMES_FIELDS)
-generate_expression_classes("Stmt", "StmtSubClasses.py", STATEMENT_SUBCLASS_NAMES_FIELDS)
+generate_expression_classes("Expr", "ExprSubClasses.py", EXPRESSION_SUBCLASS_NAMES_FIELDS, EXPRESSION_SUBCLASS_RESOLUTION_FIELDS)
+generate_expression_classes("Stmt", "StmtSubClasses.py", STATEMENT_SUBCLASS_NAMES_FIELDS, STATEMENT_SUBCLASS_RESOLUTION_FIELDS)
 generate_visitor_class("ExprVisitor", EXPRESSION_VISITOR_METHODS)
 generate_visitor_class("StmtVisitor", STATEMENT_VISITOR_METHODS)
\ No newline at end of file
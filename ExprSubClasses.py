@@ -1,21 +1,33 @@
 from Expression import Expr
 
 class Assign(Expr):
+    __slots__ = ('name', 'value', 'access', 'slot')
+    fields = ('name', 'value')
+
     def __init__(self, name, value):
        self.name = name
        self.value = value
+       self.access = None
+       self.slot = None
     def accept(self, visitor):
         return visitor.visit_assign_expr(self)
 
 class Binary(Expr):
+    __slots__ = ('left', 'operator', 'right', 'operation')
+    fields = ('left', 'operator', 'right')
+
     def __init__(self, left, operator, right):
        self.left = left
        self.operator = operator
        self.right = right
+       self.operation = None
     def accept(self, visitor):
         return visitor.visit_binary_expr(self)
 
 class Call(Expr):
+    __slots__ = ('callee', 'paren', 'arguments')
+    fields = ('callee', 'paren', 'arguments')
+
     def __init__(self, callee, paren, arguments):
        self.callee = callee
        self.paren = paren
@@ -24,25 +36,38 @@ class Call(Expr):
         return visitor.visit_call_expr(self)
 
 class Get(Expr):
+    __slots__ = ('lox_object', 'name', 'cache')
+    fields = ('lox_object', 'name')
+
     def __init__(self, lox_object, name):
        self.lox_object = lox_object
        self.name = name
+       self.cache = None
     def accept(self, visitor):
         return visitor.visit_get_expr(self)
 
 class Grouping(Expr):
+    __slots__ = ('expression',)
+    fields = ('expression',)
+
     def __init__(self, expression):
        self.expression = expression
     def accept(self, visitor):
         return visitor.visit_grouping_expr(self)
 
 class Literal(Expr):
+    __slots__ = ('value',)
+    fields = ('value',)
+
     def __init__(self, value):
        self.value = value
     def accept(self, visitor):
         return visitor.visit_literal_expr(self)
 
 class Logical(Expr):
+    __slots__ = ('left', 'operator', 'right')
+    fields = ('left', 'operator', 'right')
+
     def __init__(self, left, operator, right):
        self.left = left
        self.operator = operator
@@ -51,36 +76,61 @@ class Logical(Expr):
         return visitor.visit_logical_expr(self)
 
 class Set(Expr):
+    __slots__ = ('lox_object', 'name', 'value', 'cache')
+    fields = ('lox_object', 'name', 'value')
+
     def __init__(self, lox_object, name, value):
        self.lox_object = lox_object
        self.name = name
        self.value = value
+       self.cache = None
     def accept(self, visitor):
         return visitor.visit_set_expr(self)
 
 class Super(Expr):
+    __slots__ = ('keyword', 'method', 'access', 'slot', 'this_access', 'this_slot')
+    fields = ('keyword', 'method')
+
     def __init__(self, keyword, method):
        self.keyword = keyword
        self.method = method
+       self.access = None
+       self.slot = None
+       self.this_access = None
+       self.this_slot = None
     def accept(self, visitor):
         return visitor.visit_super_expr(self)
 
 class This(Expr):
+    __slots__ = ('keyword', 'access', 'slot')
+    fields = ('keyword',)
+
     def __init__(self, keyword):
        self.keyword = keyword
+       self.access = None
+       self.slot = None
     def accept(self, visitor):
         return visitor.visit_this_expr(self)
 
 class Unary(Expr):
+    __slots__ = ('operator', 'right', 'operation')
+    fields = ('operator', 'right')
+
     def __init__(self, operator, right):
        self.operator = operator
        self.right = right
+       self.operation = None
     def accept(self, visitor):
         return visitor.visit_unary_expr(self)
 
 class Variable(Expr):
+    __slots__ = ('name', 'access', 'slot')
+    fields = ('name',)
+
     def __init__(self, name):
        self.name = name
+       self.access = None
+       self.slot = None
     def accept(self, visitor):
         return visitor.visit_variable_expr(self)
 
@@ -0,0 +1,143 @@
+from Expression import Expr
+from Statement import Stmt
+
+# Entries an inline cache keeps. A site that sees more keys than this
+# is megamorphic: new keys take the generic path on every access.
+POLYMORPHIC_LIMIT = 4
+
+class InlineCache:
+    __slots__ = ('name', 'key', 'value', 'entries', 'megamorphic', 'hits', 'misses')
+
+    def __init__(self, name):
+        """Initializes an InlineCache object for
+        one property access site using name. It
+        remembers what the generic lookup found for
+        each key seen there, such as the slot or
+        method a shape has, up to POLYMORPHIC_LIMIT
+        keys. The last key and value are kept apart,
+        so callers can check a monomorphic site
+        inline. Every access counts as a hit or a
+        miss.
+        >>> cache = InlineCache('size')
+        >>> find = lambda key, name: f"{name} of {key}"
+        >>> cache.lookup('A', find), cache.lookup('A', find), cache.lookup('B', find)
+        ('size of A', 'size of A', 'size of B')
+        >>> cache.hits, cache.misses, cache.state()
+        (1, 2, 'polymorphic')
+        """
+        self.name = name
+        self.key = None
+        self.value = None
+        self.entries = {}
+        self.megamorphic = False
+        self.hits = 0
+        self.misses = 0
+
+    def __str__(self):
+        """Returns the name the site reads,
+        which is how bytecode listings show it.
+        """
+        return self.name
+
+    def lookup(self, key, find):
+        """Returns the value remembered for key,
+        or else find(key, name), remembered unless
+        it is None or the cache is full.
+        >>> cache = InlineCache('x')
+        >>> for key in range(6):
+        ...     value = cache.lookup(key, lambda key, name: key * 10)
+        >>> cache.lookup(5, lambda key, name: None), cache.lookup(1, None), cache.state()
+        (50, 10, 'megamorphic')
+        >>> cache.hits, cache.misses
+        (2, 6)
+        """
+        if key is self.key:
+            self.hits += 1
+            return self.value
+        value = self.entries.get(key)
+        if value == None:
+            self.misses += 1
+            value = find(key, self.name)
+            if value == None:
+                return None
+            if len(self.entries) < POLYMORPHIC_LIMIT:
+                self.entries[key] = value
+            else:
+                self.megamorphic = True
+        else:
+            self.hits += 1
+        self.key = key
+        self.value = value
+        return value
+
+    def state(self):
+        """Returns how many keys the site has
+        seen: 'empty', 'monomorphic', 'polymorphic'
+        or 'megamorphic'.
+        >>> InlineCache('x').state()
+        'empty'
+        """
+        if self.megamorphic:
+            return 'megamorphic'
+        elif len(self.entries) == 0:
+            return 'empty'
+        elif len(self.entries) == 1:
+            return 'monomorphic'
+        return 'polymorphic'
+
+def cache_sites(statements):
+    """Returns every node of the syntax tree
+    rooted at statements that has an inline
+    cache, in source order. The tree is walked
+    with an explicit stack, so any nesting depth
+    works.
+    >>> from Interpreter import Interpreter
+    >>> from Parser import Parser
+    >>> from Resolver import Resolver
+    >>> from Scanner import Scanner
+    >>> tree = Parser(Scanner("var a; print a.b; { a.c(a.d); }").get_tokens()).parse()
+    >>> Resolver(Interpreter(tree)).resolve(tree)
+    >>> [str(node.cache) for node in cache_sites(tree)]
+    ['b', 'c', 'd']
+    """
+    sites = []
+    pending = list(reversed(statements))
+    while len(pending) > 0:
+        node = pending.pop()
+        if isinstance(node, (list, tuple)):
+            pending.extend(reversed(node))
+        elif isinstance(node, (Expr, Stmt)):
+            if getattr(node, 'cache', None) != None:
+                sites.append(node)
+            pending.extend(reversed([getattr(node, field) for field in node.fields]))
+    return sites
+
+def report(statements):
+    """Returns a listing of the inline caches
+    of the syntax tree rooted at statements: the
+    line, name, hits, misses and state of every
+    site, and the totals.
+    >>> from Interpreter import Interpreter
+    >>> from Parser import Parser
+    >>> from Resolver import Resolver
+    >>> from Scanner import Scanner
+    >>> source = "class A { m() { return 1; } } var a = A(); for (var i = 0; i < 3; i = i + 1) a.m();"
+    >>> tree = Parser(Scanner(source).get_tokens()).parse()
+    >>> interpreter = Interpreter(tree)
+    >>> Resolver(interpreter).resolve(tree)
+    >>> interpreter.interpret(tree)
+    >>> print(report(tree))
+    line 1 'm': 2 hits, 1 misses, monomorphic
+    1 sites: 2 hits, 1 misses
+    """
+    lines = []
+    hits = 0
+    misses = 0
+    sites = cache_sites(statements)
+    for node in sites:
+        cache = node.cache
+        lines.append(f"line {node.name.get_line()} '{cache.name}': {cache.hits} hits, {cache.misses} misses, {cache.state()}")
+        hits += cache.hits
+        misses += cache.misses
+    lines.append(f"{len(sites)} sites: {hits} hits, {misses} misses")
+    return '\n'.join(lines)
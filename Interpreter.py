@@ -1,13 +1,15 @@
 from LoxCallable import LoxCallable
 from LoxClass import LoxClass
 from LoxError import runtime_error, LoxException as RuntimeException
-from LoxFunction import LoxFunction
+from LoxFunction import LoxFunction, RETURN
 from LoxInstance import LoxInstance
-from ReturnException import Return
+from Shape import find_property, find_field
 from ExprVisitor import ExprVisitor
-from Environment import Environment
+from ExprSubClasses import Get
+from Environment import Environment, GlobalEnvironment, Cell, LOCAL, CELL, UPVALUE
 from Clock import ClockFunction
 from StmtVisitor import StmtVisitor
+from Trampoline import accept_iteratively, trampoline
 
 class Interpreter(ExprVisitor, StmtVisitor):
     def __init__(self, tree):
@@ -17,9 +19,11 @@ class Interpreter(ExprVisitor, StmtVisitor):
         'None'
         """
         self.tree = tree
-        self.globals = Environment()
-        self.environment = self.globals
-        self.locals = {}
+        self.globals = GlobalEnvironment()
+        self.environment = Environment()
+        self.deep_nodes = set()
+        self.return_value = None
+        self.deep_interpreter = DeepInterpreter(self)
 
         self.globals.define("clock", ClockFunction())
         
@@ -28,14 +32,26 @@ class Interpreter(ExprVisitor, StmtVisitor):
         """
         try:
             for statement in statements:
-                self.execute(statement)
+                if statement in self.deep_nodes:
+                    accept_iteratively(statement, self.deep_interpreter)
+                else:
+                    self.execute(statement)
         except RuntimeException as error:
             runtime_error(error)
     
     def execute(self, statement):
-        """Executes given statement. (Tested manually)
+        """Executes given statement, returning
+        RETURN if it ran a return statement.
+        (Tested manually)
         """
-        statement.accept(self)
+        return statement.accept(self)
+
+    def mark_deep(self, node):
+        """Marks a top-level statement or a
+        function declaration whose nesting is too
+        deep to run on the Python call stack.
+        """
+        self.deep_nodes.add(node)
     
     def stringify(self, value):
         """Returns a human readable
@@ -70,56 +86,110 @@ class Interpreter(ExprVisitor, StmtVisitor):
         return str(value)
     
     def visit_class_stmt(self, statement):
-        """Evaluates a class statement.
+        """Evaluates a class statement. The
+        class name is defined first, so methods
+        can capture it, and set once the class is
+        built. The superclass sits in a cell of the
+        next slot while the methods capture it.
         """
         superclass = None
         if statement.superclass != None:
             superclass = self.evaluate(statement.superclass)
             if not isinstance(superclass, LoxClass):
                 raise RuntimeException(statement.superclass.name, "Superclass must be a class")
-        self.environment.define(statement.name.get_lexeme(), None)
 
+        self.define_variable(statement, None)
         if statement.superclass != None:
-            self.environment = Environment(enclosing = self.environment)
-            self.environment.define('super', superclass)
+            self.environment.values.append(Cell(superclass))
 
         methods = {}
         for method in statement.methods:
             method_is_initializer = method.name.get_lexeme() == 'init'
-            function = LoxFunction(method, self.environment, is_initializer = method_is_initializer)
+            function = LoxFunction(method, self.capture(method), method_is_initializer, deep = method in self.deep_nodes)
             methods[method.name.get_lexeme()] = function
         klass = LoxClass(statement.name.get_lexeme(), superclass, methods)
 
-        if superclass != None:
-            self.environment = self.environment.enclosing
+        if statement.superclass != None:
+            self.environment.values.pop()
 
-        self.environment.assign(statement.name, klass)
+        self.set_variable(statement, klass)
 
     def visit_variable_expr(self, expr):
         """Returns the evaluation of
         the variable expression.
         """
-        return self.look_up_variable(expr.name, expr)
+        return self.look_up_variable(expr.name, expr.access, expr.slot)
     
-    def resolve(self, expr, depth):
-        """Inserts an expression
-        into the locals dictionary
-        with a depth value.
-        """
-        self.locals[expr] = depth
-
-    def look_up_variable(self, name, expr):
+    def look_up_variable(self, name, access, slot):
         """Looks up variables given the current
-        environment.
-        """
-        if expr in self.locals:
-            distance = self.locals[expr]
+        environment, the way access tells and at
+        the slot the Resolver stored on the
+        expression. Globals are read from the cell
+        in slot, which may be defined after the code
+        reading it is resolved.
+        >>> from Parser import Parser
+        >>> from Resolver import Resolver
+        >>> from Scanner import Scanner
+        >>> tree = Parser(Scanner("fun f() { return later; }\\nvar later = 1;\\nprint f();").get_tokens()).parse()
+        >>> interpreter = Interpreter(tree)
+        >>> Resolver(interpreter).resolve(tree)
+        >>> interpreter.interpret(tree)
+        1
+        """
+        if access == LOCAL:
+            return self.environment.values[slot]
+        elif access == CELL:
+            return self.environment.values[slot].value
+        elif access == UPVALUE:
+            return self.environment.upvalues[slot].value
+        else:
+            return self.globals.get_slot(slot, name)
+
+    def define_variable(self, declaration, value):
+        """Defines the variable a declaration
+        introduces, in the next slot of the frame,
+        in a new cell there if a closure captures
+        it, or in its global cell.
+        """
+        if declaration.access == LOCAL:
+            self.environment.values.append(value)
+        elif declaration.access == CELL:
+            self.environment.values.append(Cell(value))
         else:
-            distance = None
-        if distance != None:
-            return self.environment.get_at(distance, name.get_lexeme())
+            self.globals.values[declaration.slot] = value
+
+    def set_variable(self, declaration, value):
+        """Sets the variable a declaration
+        defined earlier, without checking it
+        is defined.
+        """
+        if declaration.access == LOCAL:
+            self.environment.values[declaration.slot] = value
+        elif declaration.access == CELL:
+            self.environment.values[declaration.slot].value = value
         else:
-            return self.globals.get(name)
+            self.globals.values[declaration.slot] = value
+
+    def capture(self, function):
+        """Returns the cells a function
+        declaration closes over, taken from the
+        slots of the current frame or the upvalues
+        of the running function.
+        >>> from Parser import Parser
+        >>> from Resolver import Resolver
+        >>> from Scanner import Scanner
+        >>> source = "fun f() { var a = 1; var b = 2; fun g() { return b; } return g; } print f()();"
+        >>> tree = Parser(Scanner(source).get_tokens()).parse()
+        >>> interpreter = Interpreter(tree)
+        >>> Resolver(interpreter).resolve(tree)
+        >>> interpreter.interpret(tree)
+        2
+        >>> tree[0].body[2].upvalues
+        (1,)
+        """
+        values = self.environment.values
+        upvalues = self.environment.upvalues
+        return tuple(values[source] if source >= 0 else upvalues[-1 - source] for source in function.upvalues)
 
     def visit_var_stmt(self, statement):
         """Returns the evaluation of
@@ -129,7 +199,7 @@ class Interpreter(ExprVisitor, StmtVisitor):
         if statement.initializer != None:
             value = self.evaluate(statement.initializer)
         
-        self.environment.define(statement.name.get_lexeme(), value)
+        self.define_variable(statement, value)
 
         return None
     
@@ -138,9 +208,9 @@ class Interpreter(ExprVisitor, StmtVisitor):
         the if statement.
         """
         if self.is_truthy(self.evaluate(statement.condition)):
-            self.execute(statement.then_branch)
+            return self.execute(statement.then_branch)
         elif statement.else_branch != None:
-            self.execute(statement.else_branch)
+            return self.execute(statement.else_branch)
 
         return None
 
@@ -166,57 +236,99 @@ class Interpreter(ExprVisitor, StmtVisitor):
         of a while statement.
         """
         while self.is_truthy(self.evaluate(statement.condition)):
-            self.execute(statement.body)
+            if self.execute(statement.body) is RETURN:
+                return RETURN
         
         return None
     
     def visit_block_stmt(self, statement):
-        """Calls execute_block method to
-        execute all statements within
-        the block.
-        """
-        self.execute_block(statement.statements, Environment(enclosing = self.environment))
+        """Executes all statements within
+        the block in the current frame, and
+        drops the block's variables when it ends.
+        >>> from Parser import Parser
+        >>> from Resolver import Resolver
+        >>> from Scanner import Scanner
+        >>> source = "fun f() { var a = 1; for (var i = 0; i < 3; i = i + 1) { var b = a + i; print b; } var c = 9; print c; } f();"
+        >>> tree = Parser(Scanner(source).get_tokens()).parse()
+        >>> interpreter = Interpreter(tree)
+        >>> Resolver(interpreter).resolve(tree)
+        >>> interpreter.interpret(tree)
+        1
+        2
+        3
+        9
+        """
+        values = self.environment.values
+        base = len(values)
+        for inner_statement in statement.statements:
+            if self.execute(inner_statement) is RETURN:
+                del values[base:]
+                return RETURN
+        del values[base:]
 
         return None
     
     def visit_function_stmt(self, statement):
-        """Creates a LoxFunction object and
-        defines an environment.
+        """Creates a LoxFunction object with
+        the cells it captures and defines it. Its
+        variable is defined first, so a recursive
+        function captures its own cell. Whether its
+        body is deep is settled here, once.
         """
-        function = LoxFunction(statement, self.environment)
-        self.environment.define(statement.name.get_lexeme(), function)
+        self.define_variable(statement, None)
+        self.set_variable(statement, LoxFunction(statement, self.capture(statement), deep = statement in self.deep_nodes))
 
         return None
     
     def visit_return_stmt(self, statement):
-        """Executes the return statement
-        by raising an exception with
-        a Return object attached to it.
+        """Executes the return statement by
+        keeping its value in return_value and
+        returning RETURN, which every enclosing
+        statement passes on until the function
+        call picks the value up.
+        >>> from Parser import Parser
+        >>> from Resolver import Resolver
+        >>> from Scanner import Scanner
+        >>> source = "fun f(n) { while (true) { if (n > 2) { return n; } n = n + 1; } } print f(0); print f(7);"
+        >>> tree = Parser(Scanner(source).get_tokens()).parse()
+        >>> interpreter = Interpreter(tree)
+        >>> Resolver(interpreter).resolve(tree)
+        >>> interpreter.interpret(tree)
+        3
+        7
         """
         value = None
         if statement.value != None:
             value = self.evaluate(statement.value)
         
-        raise Return(value)
+        self.return_value = value
+        return RETURN
     
     def execute_block(self, statements, environment):
-        """Executes all statements
-        within the block.
+        """Executes all statements within
+        the block, returning RETURN if one of
+        them ran a return statement.
         """
         previous_environment = self.environment
         try:
             self.environment = environment
             for statement in statements:
-                self.execute(statement)
+                if self.execute(statement) is RETURN:
+                    return RETURN
         finally:
             self.environment = previous_environment
 
+    def execute_deep_block(self, statements, environment):
+        """Executes all statements within
+        the block on an explicit stack.
+        """
+        return trampoline(self.deep_interpreter.execute_block(statements, environment), self.deep_interpreter)
+
     def visit_super_expr(self, expr):
         """Executes a super expression.
         """
-        distance = self.locals[expr]
-        superclass = self.environment.get_at(distance, 'super')
-        lox_object = self.environment.get_at(distance - 1, 'this')
+        superclass = self.look_up_variable(expr.keyword, expr.access, expr.slot)
+        lox_object = self.look_up_variable(expr.keyword, expr.this_access, expr.this_slot)
         
         method = superclass.find_method(expr.method.get_lexeme())
 
@@ -233,18 +345,94 @@ class Interpreter(ExprVisitor, StmtVisitor):
             raise RuntimeException(expr.name, "Only instances have fields.")
         
         value = self.evaluate(expr.value)
-        lox_object.set(expr.name, value)
+        self.set_property(expr, lox_object, value)
 
         return value
 
+    def set_property(self, expr, instance, value):
+        """Sets the field the set expression expr
+        writes on instance to value, at the slot the
+        shape of instance has for it, or else at a new
+        slot, moving instance to the next shape. The
+        inline cache of expr remembers which it is for
+        each shape seen there.
+        >>> from Parser import Parser
+        >>> from Resolver import Resolver
+        >>> from Scanner import Scanner
+        >>> source = "class A {} fun f(a) { a.x = 1; a.x = 2; return a; } print f(A()).x + f(A()).x;"
+        >>> tree = Parser(Scanner(source).get_tokens()).parse()
+        >>> interpreter = Interpreter(tree)
+        >>> Resolver(interpreter).resolve(tree)
+        >>> interpreter.interpret(tree)
+        4
+        >>> cache = tree[1].body[0].expression.cache
+        >>> cache.hits, cache.misses, cache.state()
+        (1, 1, 'monomorphic')
+        """
+        cache = expr.cache
+        shape = instance.shape
+        if shape is cache.key:
+            cache.hits += 1
+            target = cache.value
+        else:
+            target = cache.lookup(shape, find_field)
+        if type(target) is int:
+            instance.values[target] = value
+        else:
+            instance.shape = target
+            instance.values.append(value)
+
     def visit_get_expr(self, expr):
         """Executes a get expression.
         """
-        lox_object = self.evaluate(expr.lox_object)
-        if isinstance(lox_object, LoxInstance):
-            return lox_object.get(expr.name)
+        return self.get_property(expr, self.evaluate(expr.lox_object))
+
+    def get_property(self, expr, lox_object):
+        """Returns the property the get expression
+        expr reads from lox_object: a field, or else a
+        method bound to the instance.
+        """
+        if not isinstance(lox_object, LoxInstance):
+            raise RuntimeException(expr.name, "Only instances have properties.")
+        cache = expr.cache
+        shape = lox_object.shape
+        if shape is cache.key:
+            cache.hits += 1
+            found = cache.value
         else:
-            raise RuntimeException("Only instances have properties.")
+            found = self.find_property(expr, shape)
+        if type(found) is int:
+            return lox_object.values[found]
+        return found.bind(lox_object)
+
+    def find_property(self, expr, shape):
+        """Returns what the get expression expr
+        finds on an instance of shape: the slot of
+        its field, or else the method of its class.
+        It comes from the inline cache of expr, which
+        is checked here first when it holds shape, or
+        an error is raised when there is neither.
+        >>> from Parser import Parser
+        >>> from Resolver import Resolver
+        >>> from Scanner import Scanner
+        >>> source = "class A { m() { return 1; } } class B < A {} fun f(x) { return x.m(); } print f(A()) + f(B()) + f(A());"
+        >>> tree = Parser(Scanner(source).get_tokens()).parse()
+        >>> interpreter = Interpreter(tree)
+        >>> Resolver(interpreter).resolve(tree)
+        >>> interpreter.interpret(tree)
+        3
+        >>> cache = tree[2].body[0].value.callee.cache
+        >>> cache.hits, cache.misses, cache.state()
+        (1, 2, 'polymorphic')
+        """
+        cache = expr.cache
+        if shape is cache.key:
+            cache.hits += 1
+            return cache.value
+        found = cache.lookup(shape, find_property)
+        if found == None:
+            raise RuntimeException(expr.name, f"Undefined property {cache.name}.")
+        return found
 
     def visit_logical_expr(self, expr):
         """Executes a logical expression
@@ -265,12 +453,20 @@ class Interpreter(ExprVisitor, StmtVisitor):
         assignment expression.
         """
         value = self.evaluate(expr.value)
-        
-        distance = self.locals.get(expr)
-        if distance != None:
-            self.environment.assign_at(distance, expr.name, value)
+        return self.assign_variable(expr, value)
+
+    def assign_variable(self, expr, value):
+        """Assigns value to the variable
+        named by an assignment expression.
+        """
+        if expr.access == LOCAL:
+            self.environment.values[expr.slot] = value
+        elif expr.access == CELL:
+            self.environment.values[expr.slot].value = value
+        elif expr.access == UPVALUE:
+            self.environment.upvalues[expr.slot].value = value
         else:
-            self.globals.assign(expr.name, value)
+            self.globals.assign_slot(expr.slot, expr.name, value)
 
         return value
     
@@ -278,7 +474,7 @@ class Interpreter(ExprVisitor, StmtVisitor):
         """Returns the evaluation of a
         this expression.
         """
-        return self.look_up_variable(expr.keyword, expr)
+        return self.look_up_variable(expr.keyword, expr.access, expr.slot)
 
     def visit_literal_expr(self, expr):
         """Returns the value of a
@@ -302,27 +498,84 @@ class Interpreter(ExprVisitor, StmtVisitor):
     
     def visit_unary_expr(self, expr):
         """Returns the representation
-        of a unary expression.
+        of a unary expression, applying the
+        handler the Resolver bound it to.
         """
-        right = self.evaluate(expr.right)
-
-        if expr.operator.get_token_type() == 'MINUS':
-            self.check_number_operand(expr.operator, right)
-            return -float(right)
-        elif expr.operator.get_token_type() == 'NOT':
-            return not self.is_truthy(right)
-        
-        return None
+        return expr.operation(expr.operator, self.evaluate(expr.right))
     
     def visit_call_expr(self, expr):
-        """Evaluates call expression.
-        """
-        callee = self.evaluate(expr.callee)
+        """Evaluates call expression. The checks
+        of call_function are made here, so a call
+        takes no Python frame of its own. A call of
+        a property invokes a method found in the
+        class of the instance with the instance as
+        its receiver, without making the bound
+        method a property read would give. A field
+        is read before the arguments are evaluated
+        and called as usual.
+        >>> from Parser import Parser
+        >>> from Resolver import Resolver
+        >>> from Scanner import Scanner
+        >>> source = "class A { init() { this.f = nil; } m(n) { return n + 1; } } var a = A(); print a.m(1); var m = a.m; a.f = m; print a.f(2); print m;"
+        >>> tree = Parser(Scanner(source).get_tokens()).parse()
+        >>> interpreter = Interpreter(tree)
+        >>> Resolver(interpreter).resolve(tree)
+        >>> interpreter.interpret(tree)
+        2
+        3
+        <fn m>
+        """
+        if type(expr.callee) is Get:
+            get = expr.callee
+            instance = self.evaluate(get.lox_object)
+            found = self.find_invoked(get, instance)
+            if type(found) is not int:
+                arguments = []
+                for argument in expr.arguments:
+                    arguments.append(self.evaluate(argument))
+                if isinstance(found, LoxFunction) and len(arguments) == found.arity():
+                    return found.call(self, arguments, instance)
+                return self.call_property(expr, instance, found, arguments)
+            callee = instance.values[found]
+        else:
+            callee = self.evaluate(expr.callee)
 
         arguments = []
         for argument in expr.arguments:
             arguments.append(self.evaluate(argument))
-        
+        if not isinstance(callee, LoxCallable):
+            raise RuntimeException(expr.paren, "Can only call functions and classes")
+        if len(arguments) != callee.arity():
+            raise RuntimeException(expr.paren, f"Expected {callee.arity()} arguments but got {len(arguments)}")
+        return callee.call(self, arguments)
+
+    def find_invoked(self, get, instance):
+        """Returns what the callee get of a
+        call finds on instance: the slot of a
+        field, or else a method.
+        """
+        if not isinstance(instance, LoxInstance):
+            raise RuntimeException(get.name, "Only instances have properties.")
+        return self.find_property(get, instance.shape)
+
+    def call_property(self, expr, instance, found, arguments):
+        """Calls the method find_invoked found
+        on instance for the call expr, with the
+        instance as its receiver. A field is not
+        passed here: its value is read before the
+        arguments are evaluated, and called as any
+        other callee.
+        """
+        if not isinstance(found, LoxFunction):
+            return self.call_function(expr, found.bind(instance), arguments)
+        if len(arguments) != found.arity():
+            raise RuntimeException(expr.paren, f"Expected {found.arity()} arguments but got {len(arguments)}")
+        return found.call(self, arguments, instance)
+
+    def call_function(self, expr, callee, arguments):
+        """Calls an evaluated callee with
+        evaluated arguments.
+        """
         if not isinstance(callee, LoxCallable):
             raise RuntimeException(expr.paren, "Can only call functions and classes")
         function = callee
@@ -354,82 +607,271 @@ class Interpreter(ExprVisitor, StmtVisitor):
     
     def visit_binary_expr(self, expr):
         """Returns the representation
-        of a binary expression.
-        """
-        left = self.evaluate(expr.left)
-        right = self.evaluate(expr.right)
-
-        if expr.operator.get_token_type() == 'MINUS':
-            self.check_number_operands(expr.operator, left, right)
-            return float(left) - float(right)
-        elif expr.operator.get_token_type() == 'SLASH':
-            self.check_number_operands(expr.operator, left, right)
-            return float(left) / float(right)
-        elif expr.operator.get_token_type() == 'STAR':
-            self.check_number_operands(expr.operator, left, right)
-            return float(left) * float(right)
-        elif expr.operator.get_token_type() == 'PLUS':
-            if isinstance(left, float) and isinstance(right, float):
-                return float(left) + float(right)
-            elif isinstance(left, str) and isinstance(right, str):
-                return str(left) + str(right)
-            raise RuntimeException(expr.operator, "Operands must be two numbers or two strings.")
-        elif expr.operator.get_token_type() == 'GREATER_THAN':
-            self.check_number_operands(expr.operator, left, right)
-            return float(left) > float(right)
-        elif expr.operator.get_token_type() == 'GREATER_EQUAL':
-            self.check_number_operands(expr.operator, left, right)
-            return float(left) >= float(right)
-        elif expr.operator.get_token_type() == 'LESS_THAN':
-            self.check_number_operands(expr.operator, left, right)
-            return float(left) < float(right)
-        elif expr.operator.get_token_type() == 'LESS_EQUAL':
-            self.check_number_operands(expr.operator, left, right)
-            return float(left) <= float(right)
-        elif expr.operator.get_token_type() == 'NOT_EQUAL':
-            return not self.is_equal(left, right)
-        elif expr.operator.get_token_type() == 'EQUAL_EQUAL':
-            return self.is_equal(left, right)
-        
-        return None
-    
-    def is_equal(self, left, right):
-        """Checks if left and right
-        are equal according to the
-        rules of the Lox language
+        of a binary expression, applying the
+        handler the Resolver bound it to, which
+        checks the operands and computes at once.
+        >>> from Parser import Parser
+        >>> from Resolver import Resolver
+        >>> from Scanner import Scanner
+        >>> tree = Parser(Scanner("print 6 * 7 - -1;").get_tokens()).parse()
+        >>> interpreter = Interpreter(tree)
+        >>> Resolver(interpreter).resolve(tree)
+        >>> tree[0].expression.operation.__name__, tree[0].expression.right.operation.__name__
+        ('subtract', 'negate')
+        >>> interpreter.interpret(tree)
+        43
+        """
+        return expr.operation(expr.operator, self.evaluate(expr.left), self.evaluate(expr.right))
+
+class DeepInterpreter(ExprVisitor, StmtVisitor):
+    def __init__(self, interpreter):
+        """Initializes a DeepInterpreter object,
+        whose visit methods are generators that
+        yield child nodes instead of evaluating
+        them, so trampoline can run trees of any
+        depth. It shares the environments of
+        interpreter, and nodes without children
+        are run by interpreter directly.
         >>> interpreter = Interpreter(None)
-        >>> interpreter.is_equal(None, None)
+        >>> interpreter.deep_interpreter.interpreter is interpreter
         True
-        >>> interpreter.is_equal(None, "Something")
-        False
-        >>> interpreter.is_equal(2, 2)
-        True
-        >>> interpreter.is_equal("Something", "SomethingElse")
-        False
         """
-        if left == None and right == None:
-            return True
-        elif left == None:
-            return False
-        
-        return left == right
-    
-    def check_number_operand(self, operator, operand):
-        """Checks if operand is a number. Otherwise
-        it throws an exception.
+        self.interpreter = interpreter
+
+    def visit_class_stmt(self, statement):
+        """Evaluates a class statement.
         """
-        if isinstance(operand, float):
-            return
-        raise RuntimeException(operator, "Operand must be a number.")
-    
-    def check_number_operands(self, operator, left, right):
-        """Checks if both left and right
-        are numbers, otherwise it throws an
-        exception.
-        """
-        if isinstance(left, float) and isinstance(right, float):
-            return
-        raise RuntimeException(operator, "Operands must be numbers.")
+        return self.interpreter.visit_class_stmt(statement)
+
+    def visit_variable_expr(self, expr):
+        """Returns the evaluation of
+        the variable expression.
+        """
+        return self.interpreter.visit_variable_expr(expr)
+
+    def visit_var_stmt(self, statement):
+        """Returns the evaluation of
+        the variable declaration statement.
+        """
+        value = None
+        if statement.initializer != None:
+            value = yield statement.initializer
+
+        self.interpreter.define_variable(statement, value)
+
+        return None
+
+    def visit_if_stmt(self, statement):
+        """Returns the evaluation of
+        the if statement.
+        """
+        if self.interpreter.is_truthy((yield statement.condition)):
+            return (yield statement.then_branch)
+        elif statement.else_branch != None:
+            return (yield statement.else_branch)
+
+        return None
+
+    def visit_expression_stmt(self, statement):
+        """Returns the evaluation of
+        the expression statement.
+        """
+        yield statement.expression
+
+        return None
+
+    def visit_print_stmt(self, statement):
+        """Returns the evaluation
+        of the print statement.
+        """
+        value = yield statement.expression
+        print(self.interpreter.stringify(value))
+
+        return None
+
+    def visit_while_stmt(self, statement):
+        """Returns the evaluation
+        of a while statement.
+        """
+        while self.interpreter.is_truthy((yield statement.condition)):
+            if (yield statement.body) is RETURN:
+                return RETURN
+
+        return None
+
+    def visit_block_stmt(self, statement):
+        """Executes all statements
+        within the block.
+        """
+        values = self.interpreter.environment.values
+        base = len(values)
+        for inner_statement in statement.statements:
+            if (yield inner_statement) is RETURN:
+                del values[base:]
+                return RETURN
+        del values[base:]
+
+        return None
+
+    def visit_function_stmt(self, statement):
+        """Creates a LoxFunction object and
+        defines an environment.
+        """
+        return self.interpreter.visit_function_stmt(statement)
+
+    def visit_return_stmt(self, statement):
+        """Executes the return statement
+        like Interpreter.visit_return_stmt.
+        """
+        value = None
+        if statement.value != None:
+            value = yield statement.value
+
+        self.interpreter.return_value = value
+        return RETURN
+
+    def execute_block(self, statements, environment):
+        """Executes all statements
+        within the block.
+        >>> from Parser import Parser
+        >>> from Resolver import Resolver
+        >>> from Scanner import Scanner
+        >>> source = "var a = 1;\\n" + "{ var b = a;\\na = b + 1;\\n" * 2000 + "print a;" + "}" * 2000
+        >>> tree = Parser(Scanner(source).get_tokens()).parse()
+        >>> interpreter = Interpreter(tree)
+        >>> Resolver(interpreter).resolve(tree)
+        >>> interpreter.interpret(tree)
+        2001
+        """
+        interpreter = self.interpreter
+        previous_environment = interpreter.environment
+        try:
+            interpreter.environment = environment
+            for statement in statements:
+                if (yield statement) is RETURN:
+                    return RETURN
+        finally:
+            interpreter.environment = previous_environment
+
+    def visit_super_expr(self, expr):
+        """Executes a super expression.
+        """
+        return self.interpreter.visit_super_expr(expr)
+
+    def visit_set_expr(self, expr):
+        """Executes a set expression.
+        """
+        lox_object = yield expr.lox_object
+
+        if not isinstance(lox_object, LoxInstance):
+            raise RuntimeException(expr.name, "Only instances have fields.")
+
+        value = yield expr.value
+        self.interpreter.set_property(expr, lox_object, value)
+
+        return value
+
+    def visit_get_expr(self, expr):
+        """Executes a get expression.
+        """
+        return self.interpreter.get_property(expr, (yield expr.lox_object))
+
+    def visit_logical_expr(self, expr):
+        """Executes a logical expression
+        """
+        left = yield expr.left
+
+        if expr.operator.get_token_type() == 'OR':
+            if self.interpreter.is_truthy(left):
+                return left
+        elif expr.operator.get_token_type() == 'AND':
+            if not self.interpreter.is_truthy(left):
+                return left
+
+        return (yield expr.right)
+
+    def visit_assign_expr(self, expr):
+        """Returns the evaluation of a
+        assignment expression.
+        """
+        value = yield expr.value
+        return self.interpreter.assign_variable(expr, value)
+
+    def visit_this_expr(self, expr):
+        """Returns the evaluation of a
+        this expression.
+        """
+        return self.interpreter.visit_this_expr(expr)
+
+    def visit_literal_expr(self, expr):
+        """Returns the value of a
+        literal expression.
+        """
+        return expr.value
+
+    def visit_grouping_expr(self, expr):
+        """Returns the evaluation
+        of the expression enclosed
+        in parenthesis.
+        """
+        return (yield expr.expression)
+
+    def visit_unary_expr(self, expr):
+        """Returns the representation
+        of a unary expression.
+        """
+        right = yield expr.right
+        return expr.operation(expr.operator, right)
+
+    def visit_call_expr(self, expr):
+        """Evaluates call expression. A call
+        of a property invokes the method with the
+        instance as its receiver, as the Interpreter
+        does.
+        >>> from Parser import Parser
+        >>> from Resolver import Resolver
+        >>> from Scanner import Scanner
+        >>> source = "class A { m(n) { return n + 1; } } var a = A(); print " + "(" * 100000 + "a.m(1)" + ")" * 100000 + ";"
+        >>> tree = Parser(Scanner(source).get_tokens()).parse()
+        >>> interpreter = Interpreter(tree)
+        >>> Resolver(interpreter).resolve(tree)
+        >>> interpreter.interpret(tree)
+        2
+        """
+        if type(expr.callee) is Get:
+            get = expr.callee
+            instance = yield get.lox_object
+            found = self.interpreter.find_invoked(get, instance)
+            if type(found) is not int:
+                arguments = []
+                for argument in expr.arguments:
+                    arguments.append((yield argument))
+                return self.interpreter.call_property(expr, instance, found, arguments)
+            callee = instance.values[found]
+        else:
+            callee = yield expr.callee
+
+        arguments = []
+        for argument in expr.arguments:
+            arguments.append((yield argument))
+        return self.interpreter.call_function(expr, callee, arguments)
+
+    def visit_binary_expr(self, expr):
+        """Returns the representation
+        of a binary expression.
+        >>> from Parser import Parser
+        >>> from Resolver import Resolver
+        >>> from Scanner import Scanner
+        >>> source = "print " + "(1 + " * 100000 + "1" + ")" * 100000 + " + 1" * 100000 + ";"
+        >>> tree = Parser(Scanner(source).get_tokens()).parse()
+        >>> interpreter = Interpreter(tree)
+        >>> Resolver(interpreter).resolve(tree)
+        >>> interpreter.interpret(tree)
+        200001
+        """
+        left = yield expr.left
+        right = yield expr.right
+        return expr.operation(expr.operator, left, right)
 
 if __name__ == '__main__':
     import doctest
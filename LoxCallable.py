@@ -1,6 +1,8 @@
 from abc import ABC, abstractclassmethod
 
 class LoxCallable(ABC):
+    __slots__ = ()
+
     @abstractclassmethod
     def call(self, interpreter, arguments):
         pass
@@ -1,14 +1,55 @@
 from LoxCallable import LoxCallable
 from LoxInstance import LoxInstance
+from Shape import Shape
 
 class LoxClass(LoxCallable):
+    __slots__ = ('name', 'superclass', 'methods', 'initializer', 'initializer_arity', 'shape')
+
     def __init__(self, name, superclass, methods):
-        """Initializes a
-        LoxClass object.
+        """Initializes a LoxClass object. Its
+        method table merges the flattened table of
+        the superclass with methods, so a lookup
+        never walks the superclass chain, and the
+        initializer and its arity are kept at hand.
+        Without a superclass, methods itself is the
+        table, so it must not be shared.
+        Its instances start from its empty shape.
+        >>> base = LoxClass('Base', None, {'a': 'base a', 'b': 'base b'})
+        >>> derived = LoxClass('Derived', base, {'b': 'derived b'})
+        >>> derived.find_method('a'), derived.find_method('b'), derived.find_method('c')
+        ('base a', 'derived b', None)
+        >>> derived.initializer, derived.arity()
+        (None, 0)
         """
         self.name = name
         self.superclass = superclass
-        self.methods = methods
+        if superclass != None:
+            self.methods = dict(superclass.methods)
+            self.methods.update(methods)
+        else:
+            self.methods = methods
+        self.initializer = None
+        self.initializer_arity = 0
+        self.cache_initializer()
+        self.shape = Shape(self)
+
+    def cache_initializer(self):
+        """Keeps the initializer found in the
+        method table and its arity.
+        """
+        self.initializer = self.methods.get('init')
+        if self.initializer != None:
+            self.initializer_arity = self.initializer.arity()
+        else:
+            self.initializer_arity = 0
+
+    def add_method(self, name, method):
+        """Adds method to the table of a class
+        built one method at a time.
+        """
+        self.methods[name] = method
+        if name == 'init':
+            self.cache_initializer()
     
     def __str__(self):
         """Returns a human readable
@@ -18,12 +59,13 @@ class LoxClass(LoxCallable):
         return self.name
     
     def call(self, interpreter, arguments):
-        """Creates a new instance of a LoxClass.
+        """Creates a new instance of a LoxClass,
+        passing it to the initializer as its
+        receiver, without binding it.
         """
         instance = LoxInstance(self)
-        initializer = self.find_method('init')
-        if initializer != None:
-            initializer.bind(instance).call(interpreter, arguments)
+        if self.initializer != None:
+            self.initializer.call(interpreter, arguments, instance)
 
         return instance
     
@@ -31,18 +73,10 @@ class LoxClass(LoxCallable):
         """Returns the arity of a
         LoxClass
         """
-        initializer = self.find_method('init')
-        if initializer == None:
-            return 0
-        else:
-            return initializer.arity()
+        return self.initializer_arity
     
     def find_method(self, name):
-        """Finds method given lexeme.
+        """Finds method given lexeme in
+        the flattened method table.
         """
-        if name in self.methods:
-            return self.methods[name]
-        elif self.superclass != None:
-            return self.superclass.find_method(name)
-        else:
-            return None
\ No newline at end of file
+        return self.methods.get(name)
\ No newline at end of file
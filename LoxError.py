@@ -25,11 +25,22 @@ def error(token, message, end):
     [line 1] Error at ',': some error message.
     LoxException(Token('COMMA', 1, ',', None), 'some error message')
     """
+    print(report(token, message, end))
+    return LoxException(token, message)
+
+def report(token, message, end):
+    """Returns the error line that error
+    displays, without printing it.
+    >>> from Token import Token
+    >>> report(Token('COMMA', 1, ',', None), "some error message", True)
+    '[line 1] Error at end: some error message.'
+    >>> report(Token('COMMA', 3, ',', None), "some error message", False)
+    "[line 3] Error at ',': some error message."
+    """
     if end == True:
-        print(f"[line {token.get_line()}] Error at end: {message}.")
+        return f"[line {token.get_line()}] Error at end: {message}."
     else:
-        print(f"[line {token.get_line()}] Error at \'{token.get_lexeme()}\': {message}.")
-    return LoxException(token, message)
+        return f"[line {token.get_line()}] Error at \'{token.get_lexeme()}\': {message}."
 
 def runtime_error(error):
     """Handles runtime errors
@@ -1,36 +1,62 @@
 from LoxCallable import LoxCallable
-from Environment import Environment
-from ReturnException import Return
+from Environment import Environment, Cell
+
+# Returned by a statement that ran a return statement, and passed on by
+# the statements around it up to the function call; the returned value
+# waits in the interpreter's return_value.
+RETURN = object()
 
 class LoxFunction(LoxCallable):
-    def __init__(self, declaration, closure = None, is_initializer = False):
+    __slots__ = ('declaration', 'upvalues', 'is_initializer', 'receiver', 'deep')
+
+    def __init__(self, declaration, upvalues = (), is_initializer = False, receiver = None, deep = False):
         """Initializes a LoxFunction
-        object.
+        object. It keeps only the cells its
+        declaration captures, and the instance
+        a method is bound to. A deep function,
+        one the resolver marked as too deeply
+        nested for the Python call stack, runs
+        its body on an explicit stack.
         """
         self.declaration = declaration
-        self.closure = closure
+        self.upvalues = upvalues
         self.is_initializer = is_initializer
+        self.receiver = receiver
+        self.deep = deep
     
-    def call(self, interpreter, arguments):
+    def call(self, interpreter, arguments, receiver = None):
         """Implements the method call
         from the abstract class LoxCallable.
-        Creates a new environment relative
-        to the function and executes the function.
+        Runs the function in a new environment,
+        whose first slots hold receiver, or else the
+        instance it is bound to, unless it is None,
+        and the arguments, boxing the ones a closure
+        captures. A method invoked with its receiver
+        this way needs no bound LoxFunction. The body
+        runs on an explicit stack if the function is
+        deep. A return statement ends the body with
+        RETURN, and leaves its value in the
+        interpreter. The arguments list becomes the
+        frame, so callers pass a list of their own.
         """
-        environment = Environment(enclosing = self.closure)
+        if receiver == None:
+            receiver = self.receiver
+        if receiver != None:
+            values = [receiver] + arguments
+        else:
+            values = arguments
+        for slot in self.declaration.cells:
+            values[slot] = Cell(values[slot])
+        environment = Environment(values, self.upvalues)
+        if self.deep:
+            completion = interpreter.execute_deep_block(self.declaration.body, environment)
+        else:
+            completion = interpreter.execute_block(self.declaration.body, environment)
 
-        for i in range(len(self.declaration.params)):
-            environment.define(self.declaration.params[i].get_lexeme(), arguments[i])    
-        try:
-            interpreter.execute_block(self.declaration.body, environment)
-        except Return as return_value:
-            if self.is_initializer:
-                return self.closure.get_at(0, 'this')
-            else:
-                return return_value.value
-        
         if self.is_initializer:
-            return self.closure.get_at(0, 'this')
+            return receiver
+        elif completion is RETURN:
+            return interpreter.return_value
         else:
             return None
     
@@ -46,10 +72,8 @@ class LoxFunction(LoxCallable):
         return f"<fn {self.declaration.name.get_lexeme()}>"
     
     def bind(self, instance):
-        """Binds a dedicated environment
-        to this instance.
+        """Returns this method bound
+        to instance, which takes the first
+        slot of every call.
         """
-        environment = Environment(enclosing = self.closure)
-        environment.define('this', instance)
-        
-        return LoxFunction(self.declaration, environment, is_initializer = self.is_initializer)
\ No newline at end of file
+        return LoxFunction(self.declaration, self.upvalues, self.is_initializer, instance, self.deep)
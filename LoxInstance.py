@@ -1,33 +1,62 @@
 from LoxError import LoxException as RuntimeException
+from Shape import find_property, find_field
 
 class LoxInstance:
+    __slots__ = ('klass', 'shape', 'values')
+
     def __init__(self, klass):
         """Initializes a LoxInstance
-        object.
+        object. Its fields are kept in the
+        values list, at the slots its shape
+        gives, starting from the empty shape
+        of its class.
         """
         self.klass = klass
-        self.fields = {}
-    
+        self.shape = klass.shape
+        self.values = []
+
     def __str__(self):
         """Returns a human readable
         string representing a LoxInstance
         object.
         """
         return f"{self.klass.name} instance"
-    
+
     def get(self, name):
         """Gets the field or method given name.
+        >>> from LoxClass import LoxClass
+        >>> from Token import Token
+        >>> instance = LoxInstance(LoxClass('A', None, {}))
+        >>> instance.set(Token('IDENTIFIER', 1, 'x'), 1.0)
+        >>> instance.set(Token('IDENTIFIER', 1, 'y'), 2.0)
+        >>> instance.set(Token('IDENTIFIER', 1, 'x'), 3.0)
+        >>> instance.get(Token('IDENTIFIER', 1, 'x')), instance.values, instance.shape.slots()
+        (3.0, [3.0, 2.0], {'x': 0, 'y': 1})
         """
-        if name.get_lexeme() in self.fields:
-            return self.fields[name.get_lexeme()]
-        else:
-            method = self.klass.find_method(name.get_lexeme())
-            if method != None:
-                return method.bind(self)
-            else:
-                raise RuntimeException(name, f"Undefined property {name.get_lexeme()}.")
-        
+        found = find_property(self.shape, name.get_lexeme())
+        if found == None:
+            raise RuntimeException(name, f"Undefined property {name.get_lexeme()}.")
+        elif type(found) is int:
+            return self.values[found]
+        return found.bind(self)
+
     def set(self, name, value):
         """Sets the field given name and value.
+        >>> from LoxClass import LoxClass
+        >>> from Token import Token
+        >>> instance = LoxInstance(LoxClass('A', None, {}))
+        >>> names = [Token('IDENTIFIER', 1, f'f{i}') for i in range(2000)]
+        >>> for i, name in enumerate(names):
+        ...     instance.set(name, float(i))
+        >>> instance.set(names[7], -1.0)
+        >>> [instance.get(name) for name in names] == [-1.0 if i == 7 else float(i) for i in range(2000)]
+        True
+        >>> len(instance.values), instance.shape.slot, instance.shape.name
+        (2000, 1999, 'f1999')
         """
-        self.fields[name.get_lexeme()] = value
\ No newline at end of file
+        found = find_field(self.shape, name.get_lexeme())
+        if type(found) is int:
+            self.values[found] = value
+        else:
+            self.shape = found
+            self.values.append(value)
@@ -0,0 +1,97 @@
+import gc
+import sys
+from Clock import ClockFunction
+from ClosureCompiler import CompiledFunction
+from Environment import Environment, GlobalEnvironment, Cell
+from InlineCache import InlineCache
+from LoxClass import LoxClass
+from LoxFunction import LoxFunction
+from LoxInstance import LoxInstance
+from Shape import Shape
+from Token import Token
+from Transpiler import TranspiledFunction
+from VirtualMachine import VMFunction, CallFrame
+
+# The objects a running Lox program is made of, which a census counts.
+RUNTIME_TYPES = (
+    Environment, GlobalEnvironment, Cell, CallFrame, LoxFunction, CompiledFunction,
+    VMFunction, TranspiledFunction, ClockFunction, LoxClass, LoxInstance, Shape,
+    InlineCache, Token
+)
+
+def attributes(lox_object):
+    """Returns the names and values of the
+    attributes of lox_object, from its slots
+    and from its __dict__, if it has one.
+    >>> attributes(Cell(10))
+    [('value', 10)]
+    """
+    found = []
+    for klass in type(lox_object).__mro__:
+        for name in klass.__dict__.get('__slots__', ()):
+            if hasattr(lox_object, name):
+                found.append((name, getattr(lox_object, name)))
+    if hasattr(lox_object, '__dict__'):
+        found.append(('__dict__', lox_object.__dict__))
+        found.extend(lox_object.__dict__.items())
+    return found
+
+def census(objects = None):
+    """Returns the number and size in bytes of
+    the live objects of every runtime type, by type
+    name, found among objects or else among every
+    object the garbage collector tracks. A list,
+    dict or tuple held by an attribute of one of
+    them, such as the values of an instance, is
+    counted once under the type and attribute
+    holding it, since it lives as long.
+    >>> from Token import Token
+    >>> token = Token('IDENTIFIER', 1, 'a')
+    >>> counts = census([Environment([1.0, token]), token])
+    >>> counts['Environment'][0], counts['Token'][0], counts['list in Environment.values'][0]
+    (1, 1, 1)
+    >>> 'tuple in Environment.upvalues' in counts
+    False
+    """
+    if objects == None:
+        gc.collect()
+        objects = gc.get_objects()
+    counts = {}
+    seen = set()
+    for lox_object in objects:
+        if not isinstance(lox_object, RUNTIME_TYPES) or id(lox_object) in seen:
+            continue
+        seen.add(id(lox_object))
+        add(counts, type(lox_object).__name__, lox_object)
+        for name, value in attributes(lox_object):
+            if type(value) in (list, dict, tuple) and len(value) > 0 and id(value) not in seen:
+                seen.add(id(value))
+                add(counts, f"{type(value).__name__} in {type(lox_object).__name__}.{name}", value)
+    return counts
+
+def add(counts, key, value):
+    """Counts value and its size under key.
+    """
+    count, size = counts.get(key, (0, 0))
+    counts[key] = (count + 1, size + sys.getsizeof(value))
+
+def report(counts):
+    """Returns a listing of counts, a census,
+    largest first: the number of objects and the
+    bytes of every type, and the totals.
+    >>> print(report({'Cell': (2, 80), 'LoxInstance': (1, 56)}))
+         2 objects        80 bytes  Cell
+         1 objects        56 bytes  LoxInstance
+         3 objects       136 bytes  total
+    """
+    lines = []
+    for key, (count, size) in sorted(counts.items(), key=lambda item: -item[1][1]):
+        lines.append(f"{count:6d} objects {size:9d} bytes  {key}")
+    count = sum(count for count, size in counts.values())
+    size = sum(size for count, size in counts.values())
+    lines.append(f"{count:6d} objects {size:9d} bytes  total")
+    return '\n'.join(lines)
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,158 @@
+from LoxError import LoxException as RuntimeException
+
+# The handlers below apply one operator to evaluated operands, checking
+# their types and computing the result in one step. The Resolver stores
+# the handler of every Binary and Unary node in its operation field, so
+# the interpreter never looks at the operator again.
+
+def is_equal(left, right):
+    """Checks if left and right are
+    equal according to the rules of Lox.
+    >>> is_equal(None, None), is_equal(None, False), is_equal(2.0, 2.0)
+    (True, False, True)
+    """
+    if left is None:
+        return right is None
+    return left == right
+
+def subtract(operator, left, right):
+    """Subtracts two numbers.
+    >>> subtract(None, 5.0, 3.0)
+    2.0
+    >>> subtract(None, 5.0, "3")
+    Traceback (most recent call last):
+    ...
+    LoxError.LoxException: (None, 'Operands must be numbers.')
+    """
+    if type(left) is float and type(right) is float:
+        return left - right
+    raise RuntimeException(operator, "Operands must be numbers.")
+
+def divide(operator, left, right):
+    """Divides two numbers.
+    >>> divide(None, 3.0, 2.0)
+    1.5
+    """
+    if type(left) is float and type(right) is float:
+        return left / right
+    raise RuntimeException(operator, "Operands must be numbers.")
+
+def multiply(operator, left, right):
+    """Multiplies two numbers.
+    >>> multiply(None, 6.0, 7.0)
+    42.0
+    """
+    if type(left) is float and type(right) is float:
+        return left * right
+    raise RuntimeException(operator, "Operands must be numbers.")
+
+def add(operator, left, right):
+    """Adds two numbers or concatenates
+    two strings.
+    >>> add(None, 1.0, 2.0), add(None, "a", "b")
+    (3.0, 'ab')
+    >>> add(None, "a", 1.0)
+    Traceback (most recent call last):
+    ...
+    LoxError.LoxException: (None, 'Operands must be two numbers or two strings.')
+    """
+    if type(left) is float and type(right) is float:
+        return left + right
+    elif type(left) is str and type(right) is str:
+        return left + right
+    raise RuntimeException(operator, "Operands must be two numbers or two strings.")
+
+def greater(operator, left, right):
+    """Compares two numbers with >.
+    >>> greater(None, 2.0, 1.0)
+    True
+    """
+    if type(left) is float and type(right) is float:
+        return left > right
+    raise RuntimeException(operator, "Operands must be numbers.")
+
+def greater_equal(operator, left, right):
+    """Compares two numbers with >=.
+    >>> greater_equal(None, 1.0, 1.0)
+    True
+    """
+    if type(left) is float and type(right) is float:
+        return left >= right
+    raise RuntimeException(operator, "Operands must be numbers.")
+
+def less(operator, left, right):
+    """Compares two numbers with <.
+    >>> less(None, 1.0, 1.0)
+    False
+    """
+    if type(left) is float and type(right) is float:
+        return left < right
+    raise RuntimeException(operator, "Operands must be numbers.")
+
+def less_equal(operator, left, right):
+    """Compares two numbers with <=.
+    >>> less_equal(None, 1.0, 2.0)
+    True
+    """
+    if type(left) is float and type(right) is float:
+        return left <= right
+    raise RuntimeException(operator, "Operands must be numbers.")
+
+def not_equal(operator, left, right):
+    """Checks two values for inequality.
+    >>> not_equal(None, None, False)
+    True
+    """
+    return not is_equal(left, right)
+
+def equal(operator, left, right):
+    """Checks two values for equality.
+    >>> equal(None, "a", "a")
+    True
+    """
+    return is_equal(left, right)
+
+def negate(operator, right):
+    """Negates a number.
+    >>> negate(None, 2.0)
+    -2.0
+    >>> negate(None, "2")
+    Traceback (most recent call last):
+    ...
+    LoxError.LoxException: (None, 'Operand must be a number.')
+    """
+    if type(right) is float:
+        return -right
+    raise RuntimeException(operator, "Operand must be a number.")
+
+def logical_not(operator, right):
+    """Negates the truthiness of a value.
+    >>> logical_not(None, None), logical_not(None, 0.0)
+    (True, False)
+    """
+    return right is None or right is False
+
+BINARY_OPERATIONS = {
+    'MINUS':subtract,
+    'SLASH':divide,
+    'STAR':multiply,
+    'PLUS':add,
+    'GREATER_THAN':greater,
+    'GREATER_EQUAL':greater_equal,
+    'LESS_THAN':less,
+    'LESS_EQUAL':less_equal,
+    'NOT_EQUAL':not_equal,
+    'EQUAL_EQUAL':equal
+}
+UNARY_OPERATIONS = {
+    'MINUS':negate,
+    'NOT':logical_not
+}
+
+# Every handler with the code ArenaAST stores for it.
+OPERATIONS = tuple(BINARY_OPERATIONS.values()) + tuple(UNARY_OPERATIONS.values())
+OPERATION_CODES = {operation:code for code, operation in enumerate(OPERATIONS)}
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,202 @@
+import sys
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from Scanner import Scanner, TOKEN_TYPES, TOKEN_CODES, eof_line
+from Token import Token
+
+class ChunkScanner(Scanner):
+    def __init__(self, source):
+        """Initializes a ChunkScanner object, a
+        Scanner that records errors instead of
+        printing them, so they can be replayed in
+        source order once all chunks are merged.
+        >>> scnr = ChunkScanner('a $')
+        >>> scnr.get_tokens_in_line('a $', 4)
+        [Token('IDENTIFIER', 4, 'a', None)]
+        >>> scnr.errors
+        [(4, 'Unexpected character. $')]
+        """
+        super().__init__(source)
+        self.errors = []
+
+    def error(self, line, message):
+        """Records a lexical error found
+        at the given line.
+        """
+        self.errors.append((line, message))
+        self.lox_error = True
+
+def scan_chunk(chunk):
+    """Scans one chunk of source in a worker
+    process. Returns the tokens in compact form:
+    an array of relative lines, an array of indices
+    into a table of distinct (type code, lexeme)
+    pairs, the table itself, the recorded errors,
+    the number of newlines and, when the chunk ends
+    inside a string, the offset of its opening quote
+    (otherwise -1).
+    >>> lines, indices, table, errors, newlines, quote = scan_chunk('var a = "x";\\nprint a;\\n')
+    >>> list(lines)
+    [1, 1, 1, 1, 1, 2, 2, 2]
+    >>> [(TOKEN_TYPES[table[index][0]], table[index][1]) for index in indices][:4]
+    [('VAR', 'var'), ('IDENTIFIER', 'a'), ('EQUAL', '='), ('STRING', 'x')]
+    >>> len(table), errors, newlines, quote
+    (6, [], 2, -1)
+    >>> scan_chunk('print "open\\n')[3:]
+    ([(1, 'Unterminated string.')], 1, 6)
+    """
+    scanner = ChunkScanner(chunk)
+    lines = array('L')
+    indices = array('L')
+    table = {}
+    tokens = scanner.iter_scan(chunk, 1)
+    while True:
+        try:
+            token = next(tokens)
+        except StopIteration as stop:
+            last_line = stop.value
+            break
+        lines.append(token.LINE)
+        pair = (TOKEN_CODES[token.TOKEN_TYPE], token.LEXEME)
+        index = table.get(pair)
+        if index == None:
+            index = table[pair] = len(table)
+        indices.append(index)
+
+    quote = -1
+    if len(scanner.errors) > 0 and scanner.errors[-1][1] == "Unterminated string.":
+        quote = chunk.rfind('"' if isinstance(chunk, str) else b'"')
+    return lines, indices, list(table), scanner.errors, last_line - 1, quote
+
+class ParallelScanner(Scanner):
+    def __init__(self, source, jobs, chunk_size = 1 << 20):
+        """Initializes a ParallelScanner object.
+        Sources are split into chunks of about
+        chunk_size characters at line boundaries,
+        and the chunks are scanned by jobs worker
+        processes.
+        >>> scnr = ParallelScanner('print 1;', 4)
+        >>> scnr.jobs, scnr.chunk_size
+        (4, 1048576)
+        """
+        super().__init__(source)
+        self.jobs = jobs
+        self.chunk_size = chunk_size
+
+    def split(self, buffer):
+        """Returns (start, end) offsets of chunks
+        of buffer, each ending right after a newline
+        or at the end of the buffer.
+        >>> scnr = ParallelScanner('', 2, chunk_size = 2)
+        >>> scnr.split('ab\\ncdefg\\nh\\n')
+        [(0, 3), (3, 9), (9, 11)]
+        >>> scnr.split('')
+        []
+        """
+        chunks = []
+        newline = '\n' if isinstance(buffer, str) else b'\n'
+        start = 0
+        while start < len(buffer):
+            end = buffer.find(newline, start + self.chunk_size - 1)
+            if end == -1:
+                end = len(buffer)
+            else:
+                end += 1
+            chunks.append((start, end))
+            start = end
+        return chunks
+
+    def iter_tokens(self):
+        """Scans the source across a pool of
+        worker processes and yields the merged token
+        stream, with the same tokens, line numbers and
+        errors as Scanner.iter_tokens.
+        >>> source = 'var s = "a\\nb";\\nprint s;\\nprint $;\\n'
+        >>> scnr = ParallelScanner(source, 2, chunk_size = 4)
+        >>> tokens = scnr.get_tokens()
+        [line 4] Unexpected character. $
+        >>> repr(tokens) == repr(Scanner(source).get_tokens())
+        [line 4] Unexpected character. $
+        True
+        """
+        if isinstance(self.source, list):
+            buffer = "\n".join([line[:-1] if line.endswith('\n') else line for line in self.source])
+        else:
+            buffer = self.source
+        if self.jobs <= 1:
+            newlines = yield from self.iter_scan(buffer, 1)
+            newlines -= 1
+        else:
+            newlines = yield from self.merge(buffer)
+
+        if isinstance(self.source, list):
+            yield Token("EOF", len(self.source))
+        else:
+            yield Token("EOF", eof_line(buffer, newlines))
+
+    def merge(self, buffer):
+        """Yields the tokens of every chunk in
+        order, keeping at most two chunks per worker
+        in flight. A chunk that ends inside a string
+        makes the scan resume serially at the quote,
+        since the chunk after it started mid-string.
+        Returns the number of newlines in buffer.
+        """
+        chunks = self.split(buffer)
+        pending = deque()
+        line = 1
+        resume = None
+        with ProcessPoolExecutor(self.jobs) as pool:
+            next_chunk = 0
+            while next_chunk < len(chunks) or len(pending) > 0:
+                while next_chunk < len(chunks) and len(pending) < 2 * self.jobs:
+                    start, end = chunks[next_chunk]
+                    pending.append((start, end, pool.submit(scan_chunk, buffer[start:end])))
+                    next_chunk += 1
+                start, end, future = pending.popleft()
+                if resume != None:
+                    future.cancel()
+                    start, line = resume
+                    result = scan_chunk(buffer[start:end])
+                else:
+                    result = future.result()
+                line, resume = yield from self.expand(result, start, line)
+        if resume != None:
+            self.error(resume[1], "Unterminated string.")
+        return line - 1
+
+    def expand(self, result, start, line):
+        """Yields the tokens of one scanned chunk
+        that begins at offset start on the given line,
+        and replays its errors. Returns the line after
+        the chunk and, if the chunk ended inside a
+        string, the (offset, line) of its quote.
+        """
+        lines, indices, table, errors, newlines, quote = result
+        entries = []
+        for code, lexeme in table:
+            token_type = TOKEN_TYPES[code]
+            lexeme = sys.intern(lexeme)
+            if token_type == "NUMBER":
+                entries.append((token_type, lexeme, float(lexeme)))
+            elif token_type == "STRING":
+                entries.append((token_type, lexeme, lexeme))
+            else:
+                entries.append((token_type, lexeme, None))
+        base = line - 1
+        for token_line, index in zip(lines, indices):
+            token_type, lexeme, literal = entries[index]
+            yield Token(token_type, base + token_line, lexeme, literal)
+
+        if quote != -1:
+            quote_line, __ = errors.pop()
+        for error_line, message in errors:
+            self.error(base + error_line, message)
+        if quote != -1:
+            return line + newlines, (start + quote, base + quote_line)
+        return line + newlines, None
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -1,34 +1,89 @@
 from ExprSubClasses import Binary, Get, This, Unary, Literal, Grouping, Variable, Assign, Logical, Call, Set, Super
 import LoxError
 from StmtSubClasses import Print, Expression, Return, Var, Block, If, While, Function, Class
+from Trampoline import DEEP_NESTING, trampoline
+
+PRECEDENCE_NONE = 0
+PRECEDENCE_OR = 1
+PRECEDENCE_AND = 2
+PRECEDENCE_EQUALITY = 3
+PRECEDENCE_COMPARISON = 4
+PRECEDENCE_TERM = 5
+PRECEDENCE_FACTOR = 6
+PRECEDENCE_UNARY = 7
+PRECEDENCE_CALL = 8
+
+# Binding power of every token that can follow an operand.
+INFIX_PRECEDENCE = {
+    'OR':PRECEDENCE_OR,
+    'AND':PRECEDENCE_AND,
+    'NOT_EQUAL':PRECEDENCE_EQUALITY,
+    'EQUAL_EQUAL':PRECEDENCE_EQUALITY,
+    'GREATER_THAN':PRECEDENCE_COMPARISON,
+    'GREATER_EQUAL':PRECEDENCE_COMPARISON,
+    'LESS_THAN':PRECEDENCE_COMPARISON,
+    'LESS_EQUAL':PRECEDENCE_COMPARISON,
+    'MINUS':PRECEDENCE_TERM,
+    'PLUS':PRECEDENCE_TERM,
+    'SLASH':PRECEDENCE_FACTOR,
+    'STAR':PRECEDENCE_FACTOR,
+    'LEFT_PAREN':PRECEDENCE_CALL,
+    'DOT':PRECEDENCE_CALL
+}
 
 class Parser:
-    def __init__(self, tokens):
-        """Initializes Parser object
+    def __init__(self, tokens, scanner = None):
+        """Initializes Parser object. tokens is
+        either a token list or a TokenBuffer streaming
+        from scanner, in which case syntax errors are
+        only reported once the scanner is done and
+        found no errors of its own.
         >>> parser = Parser(None)
         >>> str(parser.tokens)
         'None'
         >>> str(parser.index)
         '0'
+        >>> parser.scanner
+        >>> parser.depth
+        0
         """
         self.tokens = tokens
         self.index = 0
         self.lox_error = False
+        self.scanner = scanner
+        self.reports = []
+        self.depth = 0
 
     def parse(self):
         """Parses the tokens
         in the field self.tokens
+        >>> from Scanner import Scanner
+        >>> from TokenBuffer import TokenBuffer
+        >>> scnr = Scanner("print 1 +;")
+        >>> parser = Parser(TokenBuffer(scnr.iter_tokens()), scnr)
+        >>> len(parser.parse())
+        [line 1] Error at ';': Expect expression.
+        1
+        >>> scnr = Scanner("print 1 +;\\nprint $;")
+        >>> parser = Parser(TokenBuffer(scnr.iter_tokens()), scnr)
+        >>> len(parser.parse())
+        [line 2] Unexpected character. $
+        2
         """
         statements = []
         while self.tokens[self.index].get_token_type() != 'EOF':
             statements.append(self.declaration())
 
+        if self.scanner != None and self.scanner.lox_error == False:
+            for report in self.reports:
+                print(report)
         return statements
     
     def declaration(self):
         """Representation of declaration
         as a grammar rule.
         """
+        depth = self.depth
         try:
             if self.is_equal('VAR'):
                 return self.var_declaration()
@@ -39,6 +94,7 @@ class Parser:
             else:
                 return self.statement()
         except LoxError.LoxException:
+            self.depth = depth
             self.synchronize()
             return None
 
@@ -57,7 +113,7 @@ class Parser:
         self.consume('LEFT_BRACE', "Expect \'{\' before class body")
 
         methods = []
-        while self.tokens[self.index].get_token_type() != 'RIGHT_BRACE' and self.tokens[self.index].get_token_type != 'EOF':
+        while self.tokens[self.index].get_token_type() != 'RIGHT_BRACE' and self.tokens[self.index].get_token_type() != 'EOF':
             methods.append(self.function("method"))
         
         self.consume('RIGHT_BRACE', "Expect \'}\' after class body")
@@ -83,6 +139,19 @@ class Parser:
         a function declaration as a
         grammar rule.
         """
+        name, parameters = self.signature(kind)
+        body = self.block()
+        return Function(name, parameters, body)
+
+    def signature(self, kind):
+        """Parses the name and parameters
+        of a function or method up to the
+        brace that opens its body.
+        >>> from Scanner import Scanner
+        >>> name, parameters = Parser(Scanner("area(w, h) {}").get_tokens()).signature("method")
+        >>> name.get_lexeme(), [parameter.get_lexeme() for parameter in parameters]
+        ('area', ['w', 'h'])
+        """
         name = self.consume('IDENTIFIER', f"Expect {kind} name")
         self.consume('LEFT_PAREN', f"Expect \'(\' after {kind} name")
         parameters = []
@@ -98,27 +167,40 @@ class Parser:
         self.consume('RIGHT_PAREN', "Expect \')\' after parameters")
 
         self.consume('LEFT_BRACE', "Expect \'{\' before " + kind + " body")
-        body = self.block()
-        return Function(name, parameters, body)
+        return name, parameters
 
     def statement(self):
         """Representation of statement
-        as a grammar rule.
+        as a grammar rule. Past DEEP_NESTING
+        levels the rest of the statement is parsed
+        by deep_statement on an explicit stack.
+        >>> from Scanner import Scanner
+        >>> source = "if (a) " * 10000 + "print 1;"
+        >>> statement = Parser(Scanner(source).get_tokens()).statement()
+        >>> for i in range(9999):
+        ...     statement = statement.then_branch
+        >>> type(statement.then_branch).__name__
+        'Print'
         """
+        if self.depth >= DEEP_NESTING:
+            return trampoline(self.deep_statement())
+        self.depth += 1
         if self.is_equal('PRINT'):
-            return self.print_statement()
+            statement = self.print_statement()
         elif self.is_equal('LEFT_BRACE'):
-            return Block(self.block())
+            statement = Block(self.block())
         elif self.is_equal('IF'):
-            return self.if_statement()
+            statement = self.if_statement()
         elif self.is_equal('WHILE'):
-            return self.while_statement()
+            statement = self.while_statement()
         elif self.is_equal('FOR'):
-            return self.for_statement()
+            statement = self.for_statement()
         elif self.is_equal('RETURN'):
-            return self.return_statement()
+            statement = self.return_statement()
         else:
-            return self.expression_statement()
+            statement = self.expression_statement()
+        self.depth -= 1
+        return statement
     
     def print_statement(self):
         """Representation of print
@@ -181,7 +263,12 @@ class Parser:
         self.consume('RIGHT_PAREN', "Expect \')\' after for clauses")
 
         body = self.statement()
+        return self.desugar_for(initializer, condition, increment, body)
 
+    def desugar_for(self, initializer, condition, increment, body):
+        """Rewrites the clauses of a for loop
+        into a while loop inside blocks.
+        """
         if increment != None:
             body = Block([body, Expression(increment)])
         
@@ -199,12 +286,16 @@ class Parser:
         block statement as a grammar
         rule.
         """
+        if self.depth >= DEEP_NESTING:
+            return trampoline(self.deep_block())
+        self.depth += 1
         statements = []
 
         while(self.tokens[self.index].get_token_type() != 'RIGHT_BRACE' and self.tokens[self.index].get_token_type() != 'EOF'):
             statements.append(self.declaration())
         
         self.consume('RIGHT_BRACE', "Expect \'}\' after block")
+        self.depth -= 1
         return statements
 
     def expression_statement(self):
@@ -223,7 +314,7 @@ class Parser:
         keyword = self.tokens[self.index - 1]
         value = None
 
-        if self.tokens[self.index] != 'SEMICOLON':
+        if self.tokens[self.index].get_token_type() != 'SEMICOLON':
             value = self.expression()
         
         self.consume('SEMICOLON', "Expect \';\' after return value")
@@ -234,133 +325,90 @@ class Parser:
         as a grammar rule.
         """
         return self.assignment()
-    
+
     def assignment(self):
         """Representation of assignment
         as a grammar rule.
         """
-        expr = self.or_expression()
+        if self.depth >= DEEP_NESTING:
+            return trampoline(self.deep_assignment())
+        self.depth += 1
+        expr = self.parse_precedence(PRECEDENCE_OR)
 
         if self.is_equal('EQUAL'):
             equals = self.tokens[self.index - 1]
             value = self.assignment()
-
-            if isinstance(expr, Variable):
-                name = expr.name
-                return Assign(name, value)
-            elif isinstance(expr, Get):
-                get = expr
-                return Set(get.lox_object, get.name, value)
-            else:
-                raise self.error(equals, "Invalid assignment target")
-        else:    
-            return expr
-
-    def or_expression(self):
-        """Representation of an
-        or expression as a grammar rule.
-        """
-        expr = self.and_expression()
-
-        while self.is_equal('OR'):
-            operator = self.tokens[self.index - 1]
-            right = self.and_expression()
-            expr = Logical(expr, operator, right)
-        
-        return expr
-    
-    def and_expression(self):
-        """Representation of an
-        and expression as a grammar rule.
-        """
-        expr = self.equality()
-
-        while self.is_equal('AND'):
-            operator = self.tokens[self.index - 1]
-            right = self.equality()
-            expr = Logical(expr, operator, right)
-        
-        return expr
-
-    def equality(self):
-        """Representation of equality
-        as a grammar rule.
-        """
-        expr = self.comparison()
-
-        while(self.is_equal('NOT_EQUAL', 'EQUAL_EQUAL')):
-            operator = self.tokens[self.index - 1]
-            right_side = self.comparison()
-            expr = Binary(expr, operator, right_side)
+            expr = self.assignment_target(expr, equals, value)
+        self.depth -= 1
         return expr
-    
-    def comparison(self):
-        """Representation of comparison
-        as a grammar rule.
-        """
-        expr = self.term()
-
-        while(self.is_equal('GREATER_THAN', 'GREATER_EQUAL', 'LESS_THAN', 'LESS_EQUAL')):
-            operator = self.tokens[self.index - 1]
-            right = self.term()
-            expr = Binary(expr, operator, right)
-        
-        return expr
-    
-    def term(self):
-        """Representation of term
-        as a grammar rule.
-        """
-        expr = self.factor()
 
-        while(self.is_equal('MINUS', 'PLUS')):
-            operator = self.tokens[self.index - 1]
-            right = self.factor()
-            expr = Binary(expr, operator, right)
-        
-        return expr
-    
-    def factor(self):
-        """Representation of factor
-        as a grammar rule.
+    def assignment_target(self, expr, equals, value):
+        """Turns the expression on the left of
+        equals into the node that assigns value
+        to it.
         """
-        expr = self.unary()
-
-        while(self.is_equal('SLASH', 'STAR')):
-            operator = self.tokens[self.index - 1]
-            right = self.unary()
-            expr = Binary(expr, operator, right)
-        
-        return expr
-    
-    def unary(self):
-        """Representation of unary
-        as a grammar rule
-        """
-        if self.is_equal('NOT', 'MINUS'):
-            operator = self.tokens[self.index - 1]
-            right = self.unary()
-            return Unary(operator, right)
-        
-        return self.call()
-    
-    def call(self):
-        """Representation of a function
-        call as a grammar rule.
+        if isinstance(expr, Variable):
+            name = expr.name
+            return Assign(name, value)
+        elif isinstance(expr, Get):
+            get = expr
+            return Set(get.lox_object, get.name, value)
+        else:
+            raise self.error(equals, "Invalid assignment target")
+
+    def parse_precedence(self, precedence):
+        """Parses an expression whose infix operators
+        bind at least as tightly as precedence, using
+        the PREFIX_RULES and INFIX_PRECEDENCE tables
+        instead of one method per grammar level.
+        >>> from Scanner import Scanner
+        >>> expr = Parser(Scanner("1 + 2 * -3 < 4 or a.b(c)").get_tokens()).parse_precedence(PRECEDENCE_OR)
+        >>> type(expr).__name__, expr.operator.get_lexeme()
+        ('Logical', 'or')
+        >>> comparison = expr.left
+        >>> comparison.operator.get_lexeme(), comparison.left.operator.get_lexeme()
+        ('<', '+')
+        >>> product = comparison.left.right
+        >>> product.operator.get_lexeme(), type(product.right).__name__
+        ('*', 'Unary')
+        >>> type(expr.right).__name__, type(expr.right.callee).__name__
+        ('Call', 'Get')
+        >>> expr = Parser(Scanner("(" * 100000 + "1" + ")" * 100000).get_tokens()).parse_precedence(PRECEDENCE_OR)
+        >>> for i in range(100000):
+        ...     expr = expr.expression
+        >>> expr.value
+        1.0
         """
-        expr = self.primary()
+        if self.depth >= DEEP_NESTING:
+            return trampoline(self.deep_parse_precedence(precedence))
+        self.depth += 1
+        token = self.tokens[self.index]
+        rule = self.PREFIX_RULES.get(token.get_token_type())
+        if rule == None or token.get_token_type() == 'EOF':
+            raise self.error(token, "Expect expression")
+        self.index += 1
+        expr = rule(self, token)
 
         while True:
-            if self.is_equal('LEFT_PAREN'):
+            operator = self.tokens[self.index]
+            operator_precedence = INFIX_PRECEDENCE.get(operator.get_token_type(), PRECEDENCE_NONE)
+            if operator_precedence < precedence:
+                self.depth -= 1
+                return expr
+            self.index += 1
+            token_type = operator.get_token_type()
+            if token_type == 'LEFT_PAREN':
                 expr = self.finish_call(expr)
-            elif self.is_equal('DOT'):
+            elif token_type == 'DOT':
                 name = self.consume('IDENTIFIER', "Expect property name after \'.\'")
                 expr = Get(expr, name)
+            elif token_type == 'OR' or token_type == 'AND':
+                right = self.parse_precedence(operator_precedence + 1)
+                expr = Logical(expr, operator, right)
             else:
-                break
-        
-        return expr
-    
+                right = self.parse_precedence(operator_precedence + 1)
+                expr = Binary(expr, operator, right)
+
     def finish_call(self, callee):
         """Parses the arguments inside
         the function call.
@@ -377,39 +425,63 @@ class Parser:
         closing_paren = self.consume('RIGHT_PAREN', "Expect \')\' after arguments")
 
         return Call(callee, closing_paren, arguments)
-    
-    def primary(self):
-        """Representation of primary
-        as a grammar rule.
+
+    def unary(self, operator):
+        """Prefix rule for unary operators.
         """
-        if self.is_equal('FALSE'):
-            return Literal(False)
-        if self.is_equal('TRUE'):
+        right = self.parse_precedence(PRECEDENCE_UNARY)
+        return Unary(operator, right)
+
+    def literal(self, token):
+        """Prefix rule for true, false,
+        nil, numbers and strings.
+        """
+        if token.get_token_type() == 'TRUE':
             return Literal(True)
-        if self.is_equal('NIL'):
+        elif token.get_token_type() == 'FALSE':
+            return Literal(False)
+        elif token.get_token_type() == 'NIL':
             return Literal(None)
-        
-        if self.is_equal('NUMBER', 'STRING'):
-            return Literal(self.tokens[self.index - 1].get_literal())
-        
-        if self.is_equal('LEFT_PAREN'):
-            expr = self.expression()
-            self.consume('RIGHT_PAREN', "Expect \')\' after expression")
-            return Grouping(expr)
-        
-        if self.is_equal('THIS'):
-            return This(self.tokens[self.index - 1])
-        
-        if self.is_equal('IDENTIFIER'):
-            return Variable(self.tokens[self.index - 1])
-        
-        if self.is_equal('SUPER'):
-            keyword = self.tokens[self.index - 1]
-            self.consume('DOT', "Expect \'.\' after \'super\'")
-            method = self.consume('IDENTIFIER', "Expect superclass method name")
-            return Super(keyword, method)
-        
-        raise self.error(self.tokens[self.index], "Expect expression")
+        return Literal(token.get_literal())
+
+    def grouping(self, token):
+        """Prefix rule for an expression
+        enclosed in parenthesis.
+        """
+        expr = self.expression()
+        self.consume('RIGHT_PAREN', "Expect \')\' after expression")
+        return Grouping(expr)
+
+    def this(self, token):
+        """Prefix rule for this.
+        """
+        return This(token)
+
+    def variable(self, token):
+        """Prefix rule for identifiers.
+        """
+        return Variable(token)
+
+    def super_expression(self, token):
+        """Prefix rule for super.
+        """
+        self.consume('DOT', "Expect \'.\' after \'super\'")
+        method = self.consume('IDENTIFIER', "Expect superclass method name")
+        return Super(token, method)
+
+    PREFIX_RULES = {
+        'NOT':unary,
+        'MINUS':unary,
+        'FALSE':literal,
+        'TRUE':literal,
+        'NIL':literal,
+        'NUMBER':literal,
+        'STRING':literal,
+        'LEFT_PAREN':grouping,
+        'THIS':this,
+        'IDENTIFIER':variable,
+        'SUPER':super_expression
+    }
 
     def is_equal(self, *types):
         """Determines whether a token
@@ -426,10 +498,10 @@ class Parser:
         >>> parser.is_equal("LESS_THAN", "GREATER_THAN")
         True
         """
-        for type in types:
-            if self.tokens[self.index].get_token_type() != 'EOF' and self.tokens[self.index].get_token_type() == type:
-                self.index += 1
-                return True
+        token_type = self.tokens[self.index].get_token_type()
+        if token_type != 'EOF' and token_type in types:
+            self.index += 1
+            return True
         return False
 
     def consume(self, type, message):
@@ -447,7 +519,10 @@ class Parser:
         handle.
         """
         self.lox_error = True
-        return LoxError.error(token, message, self.tokens[self.index].get_token_type() == 'EOF')
+        if self.scanner == None:
+            return LoxError.error(token, message, self.tokens[self.index].get_token_type() == 'EOF')
+        self.reports.append(LoxError.report(token, message, self.tokens[self.index].get_token_type() == 'EOF'))
+        return LoxError.LoxException(token, message)
     
     def synchronize(self):
         """Synchronizes the scanner
@@ -467,6 +542,277 @@ class Parser:
                 
             self.index += 1
 
+    # The deep_ methods below mirror the grammar rules above as
+    # generators. Each yields the generator of a nested rule instead of
+    # calling it, so trampoline can parse nesting of any depth with an
+    # explicit stack; they are only entered past DEEP_NESTING levels.
+
+    def deep_declaration(self):
+        """Generator version of declaration.
+        """
+        try:
+            if self.is_equal('VAR'):
+                return (yield self.deep_var_declaration())
+            elif self.is_equal('FUN'):
+                return (yield self.deep_function("function"))
+            elif self.is_equal('CLASS'):
+                return (yield self.deep_class_declaration())
+            else:
+                return (yield self.deep_statement())
+        except LoxError.LoxException:
+            self.synchronize()
+            return None
+
+    def deep_class_declaration(self):
+        """Generator version of class_declaration.
+        """
+        name = self.consume('IDENTIFIER', "Expect class name")
+
+        superclass = None
+        if self.is_equal('LESS_THAN'):
+            self.consume('IDENTIFIER', "Expect superclass name")
+            superclass = Variable(self.tokens[self.index - 1])
+
+        self.consume('LEFT_BRACE', "Expect \'{\' before class body")
+
+        methods = []
+        while self.tokens[self.index].get_token_type() != 'RIGHT_BRACE' and self.tokens[self.index].get_token_type() != 'EOF':
+            methods.append((yield self.deep_function("method")))
+
+        self.consume('RIGHT_BRACE', "Expect \'}\' after class body")
+
+        return Class(name, superclass, methods)
+
+    def deep_var_declaration(self):
+        """Generator version of var_declaration.
+        """
+        name = self.consume('IDENTIFIER', "Expect variable name")
+        initializer = None
+
+        if self.is_equal('EQUAL'):
+            initializer = yield self.deep_expression()
+
+        self.consume('SEMICOLON', "Expect \';\' after variable declaration")
+        return Var(name, initializer)
+
+    def deep_function(self, kind):
+        """Generator version of function.
+        """
+        name, parameters = self.signature(kind)
+        body = yield self.deep_block()
+        return Function(name, parameters, body)
+
+    def deep_statement(self):
+        """Generator version of statement.
+        """
+        if self.is_equal('PRINT'):
+            return (yield self.deep_print_statement())
+        elif self.is_equal('LEFT_BRACE'):
+            return Block((yield self.deep_block()))
+        elif self.is_equal('IF'):
+            return (yield self.deep_if_statement())
+        elif self.is_equal('WHILE'):
+            return (yield self.deep_while_statement())
+        elif self.is_equal('FOR'):
+            return (yield self.deep_for_statement())
+        elif self.is_equal('RETURN'):
+            return (yield self.deep_return_statement())
+        else:
+            return (yield self.deep_expression_statement())
+
+    def deep_print_statement(self):
+        """Generator version of print_statement.
+        """
+        value = yield self.deep_expression()
+        self.consume('SEMICOLON', "Expect \';\' after value")
+
+        return Print(value)
+
+    def deep_if_statement(self):
+        """Generator version of if_statement.
+        """
+        self.consume('LEFT_PAREN', "Expect \'(\' after \'if\'")
+        condition = yield self.deep_expression()
+        self.consume('RIGHT_PAREN', "Expect \')\' after if condition")
+
+        then_branch = yield self.deep_statement()
+        else_branch = None
+
+        if self.is_equal('ELSE'):
+            else_branch = yield self.deep_statement()
+
+        return If(condition, then_branch, else_branch)
+
+    def deep_while_statement(self):
+        """Generator version of while_statement.
+        """
+        self.consume('LEFT_PAREN', "Expect \'(\' after \'while\'")
+        condition = yield self.deep_expression()
+        self.consume('RIGHT_PAREN', "Expect \')\' after condition")
+        body = yield self.deep_statement()
+
+        return While(condition, body)
+
+    def deep_for_statement(self):
+        """Generator version of for_statement.
+        """
+        self.consume('LEFT_PAREN', "Expect \'(\' after \'for\'")
+
+        initializer = None
+        if self.is_equal('SEMICOLON'):
+            initializer = None
+        elif self.is_equal('VAR'):
+            initializer = yield self.deep_var_declaration()
+        else:
+            initializer = yield self.deep_expression_statement()
+
+        condition = None
+        if self.tokens[self.index].get_token_type() != 'EOF' and self.tokens[self.index].get_token_type() != 'SEMICOLON':
+            condition = yield self.deep_expression()
+        self.consume('SEMICOLON', "Expect \';\' after loop condition")
+
+        increment = None
+        if self.tokens[self.index].get_token_type() != 'EOF' and self.tokens[self.index].get_token_type() != 'RIGHT_PAREN':
+            increment = yield self.deep_expression()
+        self.consume('RIGHT_PAREN', "Expect \')\' after for clauses")
+
+        body = yield self.deep_statement()
+        return self.desugar_for(initializer, condition, increment, body)
+
+    def deep_block(self):
+        """Generator version of block.
+        >>> from Scanner import Scanner
+        >>> source = "{" * 10000 + "print 1;" + "}" * 10001
+        >>> statements = Parser(Scanner(source).get_tokens()).block()
+        >>> for i in range(10000):
+        ...     statements = statements[0].statements
+        >>> type(statements[0]).__name__
+        'Print'
+        """
+        statements = []
+
+        while(self.tokens[self.index].get_token_type() != 'RIGHT_BRACE' and self.tokens[self.index].get_token_type() != 'EOF'):
+            statements.append((yield self.deep_declaration()))
+
+        self.consume('RIGHT_BRACE', "Expect \'}\' after block")
+        return statements
+
+    def deep_expression_statement(self):
+        """Generator version of expression_statement.
+        """
+        expr = yield self.deep_expression()
+        self.consume('SEMICOLON', "Expect \';\' after expression")
+
+        return Expression(expr)
+
+    def deep_return_statement(self):
+        """Generator version of return_statement.
+        """
+        keyword = self.tokens[self.index - 1]
+        value = None
+
+        if self.tokens[self.index].get_token_type() != 'SEMICOLON':
+            value = yield self.deep_expression()
+
+        self.consume('SEMICOLON', "Expect \';\' after return value")
+        return Return(keyword, value)
+
+    def deep_expression(self):
+        """Generator version of expression.
+        """
+        return (yield self.deep_assignment())
+
+    def deep_assignment(self):
+        """Generator version of assignment.
+        >>> from Scanner import Scanner
+        >>> expr = Parser(Scanner("a = " * 10000 + "1").get_tokens()).assignment()
+        >>> for i in range(9999):
+        ...     expr = expr.value
+        >>> expr.value.value
+        1.0
+        """
+        expr = yield self.deep_parse_precedence(PRECEDENCE_OR)
+
+        if self.is_equal('EQUAL'):
+            equals = self.tokens[self.index - 1]
+            value = yield self.deep_assignment()
+            return self.assignment_target(expr, equals, value)
+        return expr
+
+    def deep_parse_precedence(self, precedence):
+        """Generator version of parse_precedence.
+        >>> from Scanner import Scanner
+        >>> expr = Parser(Scanner("-" * 10000 + "a(1 + 2)").get_tokens()).parse_precedence(PRECEDENCE_OR)
+        >>> for i in range(10000):
+        ...     expr = expr.right
+        >>> type(expr).__name__, type(expr.arguments[0]).__name__
+        ('Call', 'Binary')
+        """
+        token = self.tokens[self.index]
+        rule = self.PREFIX_RULES.get(token.get_token_type())
+        if rule == None or token.get_token_type() == 'EOF':
+            raise self.error(token, "Expect expression")
+        self.index += 1
+        deep_rule = self.DEEP_PREFIX_RULES.get(token.get_token_type())
+        if deep_rule != None:
+            expr = yield deep_rule(self, token)
+        else:
+            expr = rule(self, token)
+
+        while True:
+            operator = self.tokens[self.index]
+            operator_precedence = INFIX_PRECEDENCE.get(operator.get_token_type(), PRECEDENCE_NONE)
+            if operator_precedence < precedence:
+                return expr
+            self.index += 1
+            token_type = operator.get_token_type()
+            if token_type == 'LEFT_PAREN':
+                expr = yield self.deep_finish_call(expr)
+            elif token_type == 'DOT':
+                name = self.consume('IDENTIFIER', "Expect property name after \'.\'")
+                expr = Get(expr, name)
+            elif token_type == 'OR' or token_type == 'AND':
+                right = yield self.deep_parse_precedence(operator_precedence + 1)
+                expr = Logical(expr, operator, right)
+            else:
+                right = yield self.deep_parse_precedence(operator_precedence + 1)
+                expr = Binary(expr, operator, right)
+
+    def deep_finish_call(self, callee):
+        """Generator version of finish_call.
+        """
+        arguments = []
+
+        if self.tokens[self.index].get_token_type() != 'RIGHT_PAREN':
+            while True:
+                if len(arguments) >= 255:
+                    self.error(self.tokens[self.index], "Can\'t have more than 255 arguments")
+                arguments.append((yield self.deep_expression()))
+                if not self.is_equal('COMMA'):
+                    break
+        closing_paren = self.consume('RIGHT_PAREN', "Expect \')\' after arguments")
+
+        return Call(callee, closing_paren, arguments)
+
+    def deep_unary(self, operator):
+        """Generator version of unary.
+        """
+        right = yield self.deep_parse_precedence(PRECEDENCE_UNARY)
+        return Unary(operator, right)
+
+    def deep_grouping(self, token):
+        """Generator version of grouping.
+        """
+        expr = yield self.deep_expression()
+        self.consume('RIGHT_PAREN', "Expect \')\' after expression")
+        return Grouping(expr)
+
+    DEEP_PREFIX_RULES = {
+        'NOT':deep_unary,
+        'MINUS':deep_unary,
+        'LEFT_PAREN':deep_grouping
+    }
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod()
\ No newline at end of file
@@ -1,7 +1,47 @@
 from StmtVisitor import StmtVisitor
 from ExprVisitor import ExprVisitor
+from Environment import LOCAL, CELL, UPVALUE
+from InlineCache import InlineCache
+from Operators import BINARY_OPERATIONS, UNARY_OPERATIONS
+from Trampoline import DEEP_NESTING, accept_iteratively
 import LoxError
 
+class FunctionScope:
+    def __init__(self, declaration):
+        """Initializes a FunctionScope object,
+        what the Resolver knows of the function
+        being resolved, or of the top-level script
+        when declaration is None: how many slots its
+        frame uses, where its upvalues come from and
+        which of its parameters are captured.
+        >>> scope = FunctionScope(None)
+        >>> scope.slots, scope.upvalues, scope.cells
+        (0, [], [])
+        """
+        self.declaration = declaration
+        self.slots = 0
+        self.upvalues = []
+        self.upvalue_indices = {}
+        self.cells = []
+
+class LocalVariable:
+    def __init__(self, function, slot, declaration = None):
+        """Initializes a LocalVariable object
+        for a variable declared in the function
+        at index function of the Resolver's stack.
+        Until a closure captures it, the Resolver
+        keeps the references reading it as a plain
+        slot, to turn them into cell accesses.
+        >>> variable = LocalVariable(0, 2)
+        >>> variable.slot, variable.captured, variable.references
+        (2, False, [])
+        """
+        self.function = function
+        self.slot = slot
+        self.declaration = declaration
+        self.captured = False
+        self.references = []
+
 class Resolver(StmtVisitor, ExprVisitor):
     def __init__(self, interpreter):
         """Instantiates an object
@@ -17,22 +57,54 @@ class Resolver(StmtVisitor, ExprVisitor):
         """
         self.interpreter = interpreter
         self.scopes = []
+        self.variables = []
+        self.functions = [FunctionScope(None)]
         self.current_function = "NONE"
         self.lox_error = False
         self.current_class = 'NONE'
+        self.depth = 0
+        self.unit = None
+        self.deep_resolver = DeepResolver(self)
     
     def resolve(self, statements):
-        """Starts the resolver.
+        """Starts the resolver. A top-level
+        statement nested past DEEP_NESTING levels
+        is marked deep in the interpreter.
+        >>> from Interpreter import Interpreter
+        >>> from Parser import Parser
+        >>> from Scanner import Scanner
+        >>> tree = Parser(Scanner("print 1;\\nprint 1" + " + 1" * 10000 + ";").get_tokens()).parse()
+        >>> interpreter = Interpreter(tree)
+        >>> Resolver(interpreter).resolve(tree)
+        >>> tree[0] in interpreter.deep_nodes, tree[1] in interpreter.deep_nodes
+        (False, True)
         """
-        self.resolve_multiple_stmts(statements)
+        for statement in statements:
+            self.unit = statement
+            self.resolve_statement(statement)
 
     def visit_class_stmt(self, statement):
         """Resolves a class statement.
         """
+        enclosing_class = self.begin_class(statement)
+
+        for method in statement.methods:
+            self.resolve_function(method, self.method_type(method))
+
+        self.end_class(statement, enclosing_class)
+        return None
+
+    def begin_class(self, statement):
+        """Declares the class, resolves its
+        superclass and opens the scope of super,
+        which the methods always capture. Methods
+        find this in the first slot of their own
+        frame. Returns the enclosing class type.
+        """
         enclosing_class = self.current_class
         self.current_class = 'CLASS'
 
-        self.declare(statement.name)
+        self.declare(statement.name, statement)
         self.define(statement.name)
 
         if statement.superclass != None and statement.name.get_lexeme() == statement.superclass.name.get_lexeme():
@@ -41,29 +113,30 @@ class Resolver(StmtVisitor, ExprVisitor):
 
         if statement.superclass != None:
             self.current_class = 'SUBCLASS'
-            self.resolve_statement(statement.superclass)
+            self.visit_variable_expr(statement.superclass)
 
         if statement.superclass != None:
             self.begin_scope()
-            self.scopes[len(self.scopes) - 1]['super'] = True
+            self.add_local('super', True)
 
-        self.begin_scope()
-        self.scopes[len(self.scopes) - 1]['this'] = True
-
-        for method in statement.methods:
-            declaration = 'METHOD'
-            if method.name.get_lexeme() == 'init':
-                declaration = 'INITIALIZER'
-
-            self.resolve_function(method, declaration)
-
-        self.end_scope()
+        return enclosing_class
 
+    def end_class(self, statement, enclosing_class):
+        """Closes the scope opened by
+        begin_class.
+        """
         if statement.superclass != None:
             self.end_scope()
 
         self.current_class = enclosing_class
-        return None
+
+    def method_type(self, method):
+        """Returns the function type
+        a method is resolved with.
+        """
+        if method.name.get_lexeme() == 'init':
+            return 'INITIALIZER'
+        return 'METHOD'
 
     def visit_block_stmt(self, statement):
         """Resolves the statements
@@ -79,7 +152,7 @@ class Resolver(StmtVisitor, ExprVisitor):
         """Resolves the var
         statement.
         """
-        self.declare(statement.name)
+        self.declare(statement.name, statement)
         if statement.initializer != None:
             self.resolve_statement(statement.initializer)
         self.define(statement.name)
@@ -89,7 +162,7 @@ class Resolver(StmtVisitor, ExprVisitor):
     def visit_function_stmt(self, statement):
         """Resolves a function statement.
         """
-        self.declare(statement.name)
+        self.declare(statement.name, statement)
         self.define(statement.name)
 
         self.resolve_function(statement, "FUNCTION")
@@ -124,6 +197,16 @@ class Resolver(StmtVisitor, ExprVisitor):
     def visit_return_stmt(self, statement):
         """Resolves a return statement.
         """
+        if self.returns_value(statement):
+            self.resolve_statement(statement.value)
+        
+        return None
+
+    def returns_value(self, statement):
+        """Reports a return statement in the
+        wrong place. Returns whether its value
+        should be resolved.
+        """
         if self.current_function == "NONE":
             self.lox_error = True
             LoxError.error(statement.keyword, "Can\'t return from top-level code", False)
@@ -132,10 +215,9 @@ class Resolver(StmtVisitor, ExprVisitor):
             if self.current_function == 'INITIALIZER':
                 self.lox_error = True
                 LoxError.error(statement.keyword, "Can\'t return a value from an initializer", False)
-            else:    
-                self.resolve_statement(statement.value)
-        
-        return None
+            else:
+                return True
+        return False
     
     def visit_while_stmt(self, statement):
         """Resolves a while statement.
@@ -155,12 +237,15 @@ class Resolver(StmtVisitor, ExprVisitor):
             self.lox_error = True
             LoxError.error(expression.keyword, "Can\'t use \'super\' in a class with no superclass", False)
         else:
-            self.resolve_local(expression, expression.keyword)
+            self.resolve_local(expression, 'super')
+            self.resolve_local(expression, 'this', ('this_access', 'this_slot'))
         return None
     
     def visit_binary_expr(self, expression):
-        """Resolves a binary expression.
+        """Resolves a binary expression and
+        binds it to the handler of its operator.
         """
+        expression.operation = BINARY_OPERATIONS[expression.operator.get_token_type()]
         self.resolve_expression(expression.left)
         self.resolve_expression(expression.right)
 
@@ -177,17 +262,21 @@ class Resolver(StmtVisitor, ExprVisitor):
         return None
     
     def visit_get_expr(self, expression):
-        """Resolves a get expression.
+        """Resolves a get expression, which
+        gets its own inline cache.
         """
         self.resolve_expression(expression.lox_object)
+        expression.cache = InlineCache(expression.name.get_lexeme())
 
         return None
     
     def visit_set_expr(self, expression):
-        """Resolves a set expression.
+        """Resolves a set expression, which
+        gets its own inline cache.
         """
         self.resolve_expression(expression.value)
         self.resolve_expression(expression.lox_object)
+        expression.cache = InlineCache(expression.name.get_lexeme())
 
         return None
 
@@ -205,7 +294,7 @@ class Resolver(StmtVisitor, ExprVisitor):
             self.lox_error = True
             LoxError.error(expression.keyword, "Can\'t use \'this\' outside of a class", False)
         else:
-            self.resolve_local(expression, expression.keyword)
+            self.resolve_local(expression, 'this')
         
         return None
     
@@ -223,26 +312,55 @@ class Resolver(StmtVisitor, ExprVisitor):
         return None
     
     def visit_unary_expr(self, expression):
-        """Resolves an unary expression.
+        """Resolves an unary expression and
+        binds it to the handler of its operator.
         """
+        expression.operation = UNARY_OPERATIONS[expression.operator.get_token_type()]
         self.resolve_expression(expression.right)
 
         return None
     
     def resolve_function(self, function, function_type):
         """Resolves a function and define
-        its name.
+        its name. Deep nodes found in the body
+        mark the function rather than the code
+        around it, since the interpreter runs the
+        body from a fresh call.
         """
-        enclosing_function = self.current_function
+        enclosing = self.begin_function(function, function_type)
+        self.resolve_multiple_stmts(function.body)
+        self.end_function(function, enclosing)
+
+    def begin_function(self, function, function_type):
+        """Opens the frame of a function and
+        declares its parameters, after this for
+        a method. Returns the enclosing function
+        type and unit.
+        """
+        enclosing = (self.current_function, self.unit)
         self.current_function = function_type
+        self.unit = function
 
+        self.functions.append(FunctionScope(function))
         self.begin_scope()
+        if function_type != "FUNCTION":
+            self.add_local('this')
         for parameter in function.params:
             self.declare(parameter)
             self.define(parameter)
-        self.resolve_multiple_stmts(function.body)
+        return enclosing
+
+    def end_function(self, function, enclosing):
+        """Closes the frame opened by
+        begin_function and stores on the function
+        where its upvalues come from and which
+        parameters it boxes in cells.
+        """
         self.end_scope()
-        self.current_function = enclosing_function
+        scope = self.functions.pop()
+        function.upvalues = tuple(scope.upvalues)
+        function.cells = tuple(scope.cells)
+        self.current_function, self.unit = enclosing
 
     def visit_variable_expr(self, expression):
         """Resolves the variable
@@ -252,7 +370,7 @@ class Resolver(StmtVisitor, ExprVisitor):
             self.lox_error = True
             LoxError.error(expression.name, "Can\'t read local variable in its own initializer", False)
         else:
-            self.resolve_local(expression, expression.name)
+            self.resolve_local(expression, expression.name.get_lexeme())
 
         return None
     
@@ -260,34 +378,136 @@ class Resolver(StmtVisitor, ExprVisitor):
         """Resolves a assign expression.
         """
         self.resolve_expression(expression.value)
-        self.resolve_local(expression, expression.name)
+        self.resolve_local(expression, expression.name.get_lexeme())
 
         return None
     
-    def resolve_local(self, expression, name):
+    def resolve_local(self, expression, lexeme, fields = ('access', 'slot')):
         """Looks for a match in the scopes field
-        and resolves it after the match.
-        """
+        and stores on the expression, in the two
+        fields named by fields, how to reach the
+        variable and its slot: a slot of the current
+        frame, a cell in that slot once a closure
+        captures the variable, or an upvalue of the
+        running function. Globals get an access of
+        None and are bound to their cell in the
+        interpreter's globals, which need not be
+        defined yet.
+        >>> from Interpreter import Interpreter
+        >>> from Parser import Parser
+        >>> from Scanner import Scanner
+        >>> source = "var g; fun f(a) { var b; fun h() { return b; } print a + b + g; }"
+        >>> tree = Parser(Scanner(source).get_tokens()).parse()
+        >>> Resolver(Interpreter(tree)).resolve(tree)
+        >>> addition = tree[1].body[2].expression
+        >>> [(variable.access, variable.slot) for variable in (addition.left.left, addition.left.right, addition.right)]
+        [(0, 0), (1, 1), (None, 1)]
+        >>> variable = tree[1].body[1].body[0].value
+        >>> variable.access, variable.slot, tree[1].body[1].upvalues
+        (2, 0, (1,))
+        """
+        access, slot = fields
         for i in reversed(range(len(self.scopes))):
-            if name.get_lexeme() in self.scopes[i]:
-                self.interpreter.resolve(expression, len(self.scopes) - 1 - i)
+            variable = self.variables[i].get(lexeme)
+            if variable != None:
+                current = len(self.functions) - 1
+                if variable.function == current:
+                    if variable.captured:
+                        setattr(expression, access, CELL)
+                    else:
+                        setattr(expression, access, LOCAL)
+                        variable.references.append((expression, access))
+                    setattr(expression, slot, variable.slot)
+                else:
+                    if not variable.captured:
+                        self.capture(variable)
+                    setattr(expression, access, UPVALUE)
+                    setattr(expression, slot, self.resolve_upvalue(variable))
                 return None
+        setattr(expression, access, None)
+        setattr(expression, slot, self.interpreter.globals.slot(lexeme))
+
+    def resolve_upvalue(self, variable):
+        """Threads a captured variable through
+        every function between the one declaring
+        it and the current one, and returns its
+        upvalue index in the current function. The
+        first function copies the cell from a slot
+        of the declaring frame, and each inner one
+        from upvalue i of the function around it,
+        noted -1 - i.
+        """
+        source = variable.slot
+        for function in self.functions[variable.function + 1:]:
+            index = function.upvalue_indices.get(variable)
+            if index == None:
+                index = function.upvalue_indices[variable] = len(function.upvalues)
+                function.upvalues.append(source)
+            source = -1 - index
+        return index
+
+    def capture(self, variable):
+        """Boxes a local variable in a cell
+        because a closure uses it: its declaration,
+        or its function for parameters and this,
+        creates the cell, and the references already
+        resolved read through it.
+        """
+        variable.captured = True
+        for expression, access in variable.references:
+            setattr(expression, access, CELL)
+        variable.references = []
+        if variable.declaration != None:
+            variable.declaration.access = CELL
+        else:
+            self.functions[variable.function].cells.append(variable.slot)
     
-    def declare(self, name):
+    def declare(self, name, declaration = None):
         """Given a token called name,
         it stores the lexeme of the token
         in the field stacks as the outermost dictionary
-        and sets it to false.
+        and sets it to false. A local variable takes
+        the next slot of its function's frame. The
+        declaring statement, if any, is given where
+        the variable lives.
         """
         if len(self.scopes) == 0:
+            if declaration != None:
+                declaration.access = None
+                declaration.slot = self.interpreter.globals.slot(name.get_lexeme())
             return None
         else:
             scope = self.scopes[len(self.scopes) - 1]
             if name.get_lexeme() in scope:
                 self.lox_error = True
                 LoxError.error(name, "Already a variable with this name in this scope", False)
+            else:
+                variable = self.add_variable(name.get_lexeme(), declaration)
+                if declaration != None:
+                    declaration.access = LOCAL
+                    declaration.slot = variable.slot
 
             scope[name.get_lexeme()] = False
+
+    def add_local(self, lexeme, captured = False):
+        """Declares and defines a variable
+        the interpreter adds itself, like this
+        and super, in the innermost scope. A
+        captured one always lives in a cell.
+        """
+        self.scopes[len(self.scopes) - 1][lexeme] = True
+        self.add_variable(lexeme).captured = captured
+
+    def add_variable(self, lexeme, declaration = None):
+        """Gives lexeme the next free slot of
+        the current function's frame and returns
+        its LocalVariable.
+        """
+        function = self.functions[len(self.functions) - 1]
+        variable = LocalVariable(len(self.functions) - 1, function.slots, declaration)
+        function.slots += 1
+        self.variables[len(self.variables) - 1][lexeme] = variable
+        return variable
         
     def define(self, name):
         """Given token called name,
@@ -315,25 +535,249 @@ class Resolver(StmtVisitor, ExprVisitor):
         of statement to visit a
         node in the abstract syntax tree.
         """
+        if self.depth >= DEEP_NESTING:
+            self.resolve_deeply(statement)
+            return None
+        self.depth += 1
         statement.accept(self)
+        self.depth -= 1
 
     def resolve_expression(self, expr):
         """Calls the accept method
         of an expression to visit
         a node in the abstract syntax tree.
         """
+        if self.depth >= DEEP_NESTING:
+            self.resolve_deeply(expr)
+            return None
+        self.depth += 1
         expr.accept(self)
+        self.depth -= 1
+
+    def resolve_deeply(self, node):
+        """Resolves a node nested past
+        DEEP_NESTING levels on an explicit
+        stack, and marks the statement or
+        function it belongs to as deep so the
+        interpreter runs it the same way.
+        """
+        self.interpreter.mark_deep(self.unit)
+        accept_iteratively(node, self.deep_resolver)
     
     def begin_scope(self):
         """Tracks the stack of scopes within a scope.
+        Every scope of a function shares its frame.
         """
         self.scopes.append(dict())
+        self.variables.append(dict())
     
     def end_scope(self):
         """Removes the outermost scope in the scopes
-        field.
+        field. Its slots are freed for the statements
+        after it, as the interpreter drops a block's
+        variables when the block ends.
         """
         self.scopes.pop()
+        variables = self.variables.pop()
+        self.functions[len(self.functions) - 1].slots -= len(variables)
+
+class DeepResolver(StmtVisitor, ExprVisitor):
+    def __init__(self, resolver):
+        """Initializes a DeepResolver object,
+        whose visit methods are generators that
+        yield child nodes instead of resolving
+        them, so trampoline can walk trees of any
+        depth. It shares the scopes and state of
+        resolver.
+        >>> from Interpreter import Interpreter
+        >>> resolver = Resolver(Interpreter(None))
+        >>> resolver.deep_resolver.resolver is resolver
+        True
+        """
+        self.resolver = resolver
+
+    def visit_class_stmt(self, statement):
+        """Resolves a class statement.
+        """
+        enclosing_class = self.resolver.begin_class(statement)
+
+        for method in statement.methods:
+            yield self.resolve_function(method, self.resolver.method_type(method))
+
+        self.resolver.end_class(statement, enclosing_class)
+        return None
+
+    def visit_block_stmt(self, statement):
+        """Resolves the statements
+        in the block statement.
+        """
+        self.resolver.begin_scope()
+        for inner_statement in statement.statements:
+            yield inner_statement
+        self.resolver.end_scope()
+
+        return None
+
+    def visit_var_stmt(self, statement):
+        """Resolves the var
+        statement.
+        """
+        self.resolver.declare(statement.name, statement)
+        if statement.initializer != None:
+            yield statement.initializer
+        self.resolver.define(statement.name)
+
+        return None
+
+    def visit_function_stmt(self, statement):
+        """Resolves a function statement.
+        """
+        self.resolver.declare(statement.name, statement)
+        self.resolver.define(statement.name)
+
+        yield self.resolve_function(statement, "FUNCTION")
+
+        return None
+
+    def visit_expression_stmt(self, statement):
+        """Resolves a expression statement.
+        """
+        yield statement.expression
+
+        return None
+
+    def visit_if_stmt(self, statement):
+        """Resolves an if statement.
+        """
+        yield statement.condition
+        yield statement.then_branch
+
+        if statement.else_branch != None:
+            yield statement.else_branch
+
+        return None
+
+    def visit_print_stmt(self, statement):
+        """Resolves a print statement.
+        """
+        yield statement.expression
+
+        return None
+
+    def visit_return_stmt(self, statement):
+        """Resolves a return statement.
+        """
+        if self.resolver.returns_value(statement):
+            yield statement.value
+
+        return None
+
+    def visit_while_stmt(self, statement):
+        """Resolves a while statement.
+        """
+        yield statement.condition
+        yield statement.body
+
+        return None
+
+    def visit_super_expr(self, expression):
+        """Resolves a super expression.
+        """
+        return self.resolver.visit_super_expr(expression)
+
+    def visit_binary_expr(self, expression):
+        """Resolves a binary expression.
+        """
+        expression.operation = BINARY_OPERATIONS[expression.operator.get_token_type()]
+        yield expression.left
+        yield expression.right
+
+        return None
+
+    def visit_call_expr(self, expression):
+        """Resolves a call expression.
+        """
+        yield expression.callee
+
+        for argument in expression.arguments:
+            yield argument
+
+        return None
+
+    def visit_get_expr(self, expression):
+        """Resolves a get expression.
+        """
+        yield expression.lox_object
+        expression.cache = InlineCache(expression.name.get_lexeme())
+
+        return None
+
+    def visit_set_expr(self, expression):
+        """Resolves a set expression.
+        """
+        yield expression.value
+        yield expression.lox_object
+        expression.cache = InlineCache(expression.name.get_lexeme())
+
+        return None
+
+    def visit_grouping_expr(self, expression):
+        """Resolves a grouping expression.
+        """
+        yield expression.expression
+
+        return None
+
+    def visit_this_expr(self, expression):
+        """Resolves a this expression.
+        """
+        return self.resolver.visit_this_expr(expression)
+
+    def visit_literal_expr(self, expression):
+        """Resolves a literal expression.
+        """
+        return None
+
+    def visit_logical_expr(self, expression):
+        """Resolves a logical expression.
+        """
+        yield expression.left
+        yield expression.right
+
+        return None
+
+    def visit_unary_expr(self, expression):
+        """Resolves an unary expression.
+        """
+        expression.operation = UNARY_OPERATIONS[expression.operator.get_token_type()]
+        yield expression.right
+
+        return None
+
+    def visit_variable_expr(self, expression):
+        """Resolves the variable
+        expression.
+        """
+        return self.resolver.visit_variable_expr(expression)
+
+    def visit_assign_expr(self, expression):
+        """Resolves a assign expression.
+        """
+        yield expression.value
+        self.resolver.resolve_local(expression, expression.name.get_lexeme())
+
+        return None
+
+    def resolve_function(self, function, function_type):
+        """Resolves a function body. Functions
+        found this deep are marked deep as well.
+        """
+        resolver = self.resolver
+        resolver.interpreter.mark_deep(function)
+        enclosing = resolver.begin_function(function, function_type)
+        for statement in function.body:
+            yield statement
+        resolver.end_function(function, enclosing)
 
 if __name__ == '__main__':
     import doctest
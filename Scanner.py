@@ -1,5 +1,93 @@
+import contextlib
+import mmap
+import os
+import re
+import sys
+from LoxError import LoxException
 from Token import Token
 
+SYMBOL_LEXEMES = {
+    '(':"LEFT_PAREN",
+    ')':"RIGHT_PAREN",
+    '{':"LEFT_BRACE",
+    '}':"RIGHT_BRACE",
+    ',':"COMMA",
+    '.':"DOT",
+    '-':"MINUS",
+    '+':"PLUS",
+    ';':"SEMICOLON",
+    '*':"STAR",
+    '/':"SLASH",
+    '!=':"NOT_EQUAL",
+    '!':"NOT",
+    '==':"EQUAL_EQUAL",
+    '=':"EQUAL",
+    '<':"LESS_THAN",
+    '<=':"LESS_EQUAL",
+    '>':"GREATER_THAN",
+    '>=':"GREATER_EQUAL"
+}
+
+RESERVED_WORDS = {
+    "and":"AND",
+    "class":"CLASS",
+    "else":"ELSE",
+    "false":"FALSE",
+    "for":"FOR",
+    "fun":"FUN",
+    "if":"IF",
+    "nil":"NIL",
+    "or":"OR",
+    "print":"PRINT",
+    "return":"RETURN",
+    "super":"SUPER",
+    "this":"THIS",
+    "true":"TRUE",
+    "var":"VAR",
+    "while":"WHILE"
+}
+
+# Small-int codes for every token type a syntax tree can hold, used
+# where tokens are shipped or stored in compact form.
+TOKEN_TYPES = ("IDENTIFIER", "NUMBER", "STRING") + tuple(SYMBOL_LEXEMES.values()) + tuple(RESERVED_WORDS.values())
+TOKEN_CODES = {token_type:code for code, token_type in enumerate(TOKEN_TYPES)}
+
+# Lexemes shared by every token of the same kind, so symbol tokens
+# all point to the same interned string. Keyed by both str and bytes
+# lexemes so text and memory-mapped sources share one table.
+SYMBOL_TOKENS = {lexeme:(token_type, sys.intern(lexeme)) for lexeme, token_type in SYMBOL_LEXEMES.items()}
+SYMBOL_TOKENS.update({lexeme.encode():entry for lexeme, entry in SYMBOL_TOKENS.items()})
+
+# One alternative per lexeme class. Blanks other than newlines are
+# skipped in front of every match, newlines are matched on their own
+# so the line count stays exact. END matches the blanks that close a
+# buffer, which would otherwise be left to OTHER.
+TOKEN_SOURCE = r"""
+    [ \t\r]*
+    (?:
+        (?P<IDENTIFIER>[A-Za-z][A-Za-z0-9]*)
+      | (?P<SYMBOL>[!=<>]=?|[(){},.\-+;*])
+      | (?P<NEWLINE>\n)
+      | (?P<NUMBER>[0-9]+(?:\.[0-9]+)?)
+      | (?P<COMMENT>//[^\n]*)
+      | (?P<SLASH>/)
+      | (?P<STRING>"[^"]*")
+      | (?P<UNTERMINATED>"[^"]*)
+      | (?P<END>\Z)
+      | (?P<OTHER>%s)
+    )"""
+TOKEN_PATTERN = re.compile(TOKEN_SOURCE % ".", re.VERBOSE)
+
+# The same pattern over UTF-8 bytes, used for memory-mapped sources.
+# A non-ASCII character is matched whole so it can be decoded alone.
+BYTES_TOKEN_PATTERN = re.compile((TOKEN_SOURCE % r"[\xc0-\xff][\x80-\xbf]*|.").encode(), re.VERBOSE)
+BYTES_IDENTIFIER_PATTERN = re.compile(rb"(?:[A-Za-z0-9]|[\xc0-\xff][\x80-\xbf]*)+")
+
+# Distinct identifiers and numbers a scan remembers, so repeated ones
+# are decoded once. A table that fills up is cleared, which keeps the
+# memory of a scan bounded whatever the size of the script.
+INTERN_LIMIT = 4096
+
 class Scanner:
     def __init__(self, source):
         """Initializes Scanner object
@@ -12,7 +100,7 @@ class Scanner:
         """
         self.source = source
         self.lox_error = False
-    
+
     def set_source(self, source):
         """Sets field self.source
         >>> scnr = Scanner('')
@@ -26,26 +114,53 @@ class Scanner:
         self.source = source
 
     def get_tokens(self):
-        """Searches each line provided by source
-        for tokens. Returns a list with all
-        tokens in source. The source is a list of lists containing strings
-        representing lines of code.
+        """Scans the whole source buffer for
+        tokens in a single pass. Returns a list
+        with all tokens in source. The source is either
+        a list of strings representing lines of code,
+        a single string holding the whole script, or the
+        script's UTF-8 bytes (such as a memory map from
+        map_source), which are decoded one token at a time.
         >>> scnr = Scanner(["var something = 100;", "var anotherThing = 10;"])
         >>> scnr.get_tokens()
         [Token('VAR', 1, 'var', None), Token('IDENTIFIER', 1, 'something', None), Token('EQUAL', 1, '=', None), Token('NUMBER', 1, '100', 100.0), Token('SEMICOLON', 1, ';', None), Token('VAR', 2, 'var', None), Token('IDENTIFIER', 2, 'anotherThing', None), Token('EQUAL', 2, '=', None), Token('NUMBER', 2, '10', 10.0), Token('SEMICOLON', 2, ';', None), Token('EOF', 2, None, None)]
         >>> scnr.source = ["", ""]
         >>> scnr.get_tokens()
         [Token('EOF', 2, None, None)]
+        >>> scnr.source = 'print "two\\nlines";\\nprint 1;'
+        >>> scnr.get_tokens()
+        [Token('PRINT', 1, 'print', None), Token('STRING', 1, 'two\\nlines', 'two\\nlines'), Token('SEMICOLON', 2, ';', None), Token('PRINT', 3, 'print', None), Token('NUMBER', 3, '1', 1.0), Token('SEMICOLON', 3, ';', None), Token('EOF', 4, None, None)]
+        >>> scnr.source = 'print 1.2.3;'
+        >>> scnr.get_tokens()
+        [Token('PRINT', 1, 'print', None), Token('NUMBER', 1, '1.2', 1.2), Token('DOT', 1, '.', None), Token('NUMBER', 1, '3', 3.0), Token('SEMICOLON', 1, ';', None), Token('EOF', 1, None, None)]
+        >>> scnr.source = 'var café = "é";'.encode()
+        >>> scnr.get_tokens()
+        [Token('VAR', 1, 'var', None), Token('IDENTIFIER', 1, 'café', None), Token('EQUAL', 1, '=', None), Token('STRING', 1, 'é', 'é'), Token('SEMICOLON', 1, ';', None), Token('EOF', 1, None, None)]
         """
         try:
-            all_token_list = []
-            for i in range(len(self.source)):
-                all_token_list.extend(self.get_tokens_in_line(self.source[i], i + 1))
-            all_token_list.append(Token("EOF", len(self.source)))
-            return all_token_list
-        except Exception:
+            return list(self.iter_tokens())
+        except LoxException:
             return None
 
+    def iter_tokens(self):
+        """Generator version of get_tokens. Tokens
+        are produced on demand while the consumer
+        walks the stream, ending with the EOF token.
+        >>> scnr = Scanner(["var a;", "print a;"])
+        >>> tokens = scnr.iter_tokens()
+        >>> next(tokens)
+        Token('VAR', 1, 'var', None)
+        >>> list(tokens)[-2:]
+        [Token('SEMICOLON', 2, ';', None), Token('EOF', 2, None, None)]
+        """
+        if isinstance(self.source, list):
+            buffer = "\n".join([line[:-1] if line.endswith('\n') else line for line in self.source])
+            yield from self.iter_scan(buffer, 1)
+            yield Token("EOF", len(self.source))
+        else:
+            last_line = yield from self.iter_scan(self.source, 1)
+            yield Token("EOF", eof_line(self.source, last_line - 1))
+
     def get_tokens_in_line(self, line, line_num):
         """Looks for tokens in line provided.
         Returns a list with tokens found in line.
@@ -67,80 +182,161 @@ class Scanner:
         >>> scnr.get_tokens_in_line('and class else false for fun if nil or print return super this true var while', 1)
         [Token('AND', 1, 'and', None), Token('CLASS', 1, 'class', None), Token('ELSE', 1, 'else', None), Token('FALSE', 1, 'false', None), Token('FOR', 1, 'for', None), Token('FUN', 1, 'fun', None), Token('IF', 1, 'if', None), Token('NIL', 1, 'nil', None), Token('OR', 1, 'or', None), Token('PRINT', 1, 'print', None), Token('RETURN', 1, 'return', None), Token('SUPER', 1, 'super', None), Token('THIS', 1, 'this', None), Token('TRUE', 1, 'true', None), Token('VAR', 1, 'var', None), Token('WHILE', 1, 'while', None)]
         """
-        token_list = []
-        SINGLE_LEXEMES = {
-            '(':"LEFT_PAREN",
-            ')':"RIGHT_PAREN",
-            '{':"LEFT_BRACE",
-            '}':"RIGHT_BRACE",
-            ',':"COMMA",
-            '.':"DOT",
-            '-':"MINUS",
-            '+':"PLUS",
-            ';':"SEMICOLON",
-            '*':"STAR",
-        }
-        OPERATOR_LEXEMES = {
-            '!=':"NOT_EQUAL",
-            '!':"NOT",
-            '==':"EQUAL_EQUAL",
-            '=':"EQUAL",
-            '<':"LESS_THAN",
-            '<=':"LESS_EQUAL",
-            '>':"GREATER_THAN",
-            '>=':"GREATER_EQUAL"
-        }
-        IGNORE_CHARS = ' ', '\r', '\t', '\n', ''
-        i = 0
-        while i < len(line):
-            if line[i] in SINGLE_LEXEMES:
-                token_list.append(Token(SINGLE_LEXEMES[line[i]], line_num, lexeme = line[i]))
-            elif line[i] in OPERATOR_LEXEMES:
-                if (i < len(line) - 1) and line[i + 1] == '=':
-                    token_list.append(Token(OPERATOR_LEXEMES[line[i] + '='], line_num, lexeme = line[i] + '='))
-                    i += 1
+        return self.scan(line, line_num)
+
+    def scan(self, buffer, line):
+        """Scans buffer with the precompiled
+        TOKEN_PATTERN, starting at line number line.
+        Returns a list with the tokens found.
+        >>> scnr = Scanner('')
+        >>> scnr.scan('1.50 007 a1.b', 4)
+        [Token('NUMBER', 4, '1.5', 1.5), Token('NUMBER', 4, '7', 7.0), Token('IDENTIFIER', 4, 'a1', None), Token('DOT', 4, '.', None), Token('IDENTIFIER', 4, 'b', None)]
+        >>> scnr.scan('a $ b', 1)
+        [line 1] Unexpected character. $
+        [Token('IDENTIFIER', 1, 'a', None), Token('IDENTIFIER', 1, 'b', None)]
+        >>> scnr.lox_error
+        True
+        >>> scnr.scan('print "open\\n\\n', 2)
+        [line 2] Unterminated string.
+        [Token('PRINT', 2, 'print', None)]
+        >>> scnr.lox_error = False
+        >>> scnr.scan('print 1; \\t ', 1), scnr.scan(b'print 1;\\r\\n  ', 1), scnr.lox_error
+        ([Token('PRINT', 1, 'print', None), Token('NUMBER', 1, '1', 1.0), Token('SEMICOLON', 1, ';', None)], [Token('PRINT', 1, 'print', None), Token('NUMBER', 1, '1', 1.0), Token('SEMICOLON', 1, ';', None)], False)
+        >>> scnr.scan('café = 1', 1)
+        [Token('IDENTIFIER', 1, 'café', None), Token('EQUAL', 1, '=', None), Token('NUMBER', 1, '1', 1.0)]
+        """
+        return list(self.iter_scan(buffer, line))
+
+    def iter_scan(self, buffer, line):
+        """Generator version of scan. Yields
+        the tokens in buffer one at a time, so
+        callers never hold the whole token list.
+        Its tables of repeated identifiers and
+        numbers hold at most INTERN_LIMIT entries.
+        buffer is a string or UTF-8 bytes. The
+        generator returns the last line number.
+        >>> scnr = Scanner('')
+        >>> tokens = scnr.iter_scan('var a;', 1)
+        >>> next(tokens)
+        Token('VAR', 1, 'var', None)
+        >>> list(tokens)
+        [Token('IDENTIFIER', 1, 'a', None), Token('SEMICOLON', 1, ';', None)]
+        >>> first, second = scnr.iter_scan('counter counter', 1)
+        >>> first.get_lexeme() is second.get_lexeme()
+        True
+        >>> tokens = scnr.scan(' '.join(f"v{index} {index}" for index in range(INTERN_LIMIT + 10)) + ' v0 0', 1)
+        >>> tokens[-2], tokens[-1]
+        (Token('IDENTIFIER', 1, 'v0', None), Token('NUMBER', 1, '0', 0.0))
+        """
+        if isinstance(buffer, str):
+            match_token = TOKEN_PATTERN.match
+            decode = str
+            last_ascii = '\x7f'
+        else:
+            match_token = BYTES_TOKEN_PATTERN.match
+            decode = bytes.decode
+            last_ascii = 0x7f
+        intern = sys.intern
+        names = {}
+        numbers = {}
+        position = 0
+        while True:
+            match = match_token(buffer, position)
+            if match == None:
+                break
+            position = match.end()
+            kind = match.lastgroup
+            if kind == 'IDENTIFIER':
+                if position < len(buffer) and buffer[position] > last_ascii:
+                    token, position = self.scan_identifier(buffer, match.start(kind), line)
+                    yield token
                 else:
-                    token_list.append(Token(OPERATOR_LEXEMES[line[i]], line_num, lexeme = line[i]))
-            elif line[i] == '/':
-                if (i < len(line) - 1) and line[i + 1] == '/':
-                    break
+                    raw = match.group(kind)
+                    identifier = names.get(raw)
+                    if identifier == None:
+                        if len(names) == INTERN_LIMIT:
+                            names.clear()
+                        identifier = names[raw] = intern(decode(raw))
+                    yield Token(RESERVED_WORDS.get(identifier, "IDENTIFIER"), line, identifier)
+            elif kind == 'SYMBOL':
+                token_type, lexeme = SYMBOL_TOKENS[match.group(kind)]
+                yield Token(token_type, line, lexeme)
+            elif kind == 'NEWLINE':
+                line += 1
+            elif kind == 'NUMBER':
+                raw = match.group(kind)
+                if raw in numbers:
+                    lexeme, literal = numbers[raw]
                 else:
-                    token_list.append(Token("SLASH", line_num, lexeme = line[i]))
-            elif line[i] in IGNORE_CHARS:
+                    text = decode(raw)
+                    literal = float(text)
+                    if '.' in text:
+                        lexeme = str(literal)
+                    else:
+                        lexeme = text.lstrip('0') or '0'
+                    if len(numbers) == INTERN_LIMIT:
+                        numbers.clear()
+                    numbers[raw] = lexeme, literal
+                yield Token("NUMBER", line, lexeme, literal)
+            elif kind == 'STRING':
+                literal = decode(match.group(kind)[1:-1])
+                yield Token("STRING", line, literal, literal)
+                line += literal.count('\n')
+            elif kind == 'SLASH':
+                yield Token("SLASH", line, '/')
+            elif kind == 'COMMENT':
                 pass
-            elif line[i] == '\"':
-                end_index = self.get_end_index_for_strings(line, i)
-                if end_index == -1:
-                    print(f"[line {line_num}] Unterminated string.")
-                    self.lox_error = True
-                else:
-                    literal = line[i + 1:end_index]
-                    lexeme = str(literal)
-                    token_list.append(Token("STRING", line_num, lexeme, literal))
-                i = end_index
+            elif kind == 'END':
+                break
+            elif kind == 'UNTERMINATED':
+                self.error(line, "Unterminated string.")
+                line += decode(match.group(kind)).count('\n')
             else:
-                if self.is_digit(line[i]):
-                    end_index = self.get_end_index_for_numbers(line, i)
-                    lexeme = str(int(line[i:end_index + 1]) if '.' not in str(line[i:end_index + 1]) else float(line[i:end_index + 1]))
-                    literal = float(line[i:end_index + 1])
-                    token_list.append(Token("NUMBER", line_num, lexeme, literal))
-                    i = end_index
-                elif line[i].isalpha():
-                    token, end_index = self.get_token_for_identifiers(line, i, line_num)
-                    token_list.append(token)
-                    i = end_index
+                char = decode(match.group(kind))
+                if char.isalpha():
+                    token, position = self.scan_identifier(buffer, match.start(kind), line)
+                    yield token
                 else:
-                    print(f"[line {line_num}] Unexpected character. {line[i]}")
-                    self.lox_error = True
-            i += 1
-        
-        return token_list
+                    self.error(line, f"Unexpected character. {char}")
+
+        return line
+
+    def error(self, line, message):
+        """Reports a lexical error found
+        at the given line.
+        >>> scnr = Scanner('')
+        >>> scnr.error(3, "Unexpected character. $")
+        [line 3] Unexpected character. $
+        >>> scnr.lox_error
+        True
+        """
+        print(f"[line {line}] {message}")
+        self.lox_error = True
+
+    def scan_identifier(self, buffer, start_index, line):
+        """Scans an identifier holding non-ASCII
+        letters with get_token_for_identifiers. Returns
+        the token and the position right after it.
+        >>> scnr = Scanner('')
+        >>> scnr.scan_identifier('x = café;', 4, 1)
+        (Token('IDENTIFIER', 1, 'café', None), 8)
+        >>> scnr.scan_identifier('x = café;'.encode(), 4, 1)
+        (Token('IDENTIFIER', 1, 'café', None), 9)
+        """
+        if isinstance(buffer, str):
+            token, end_index = self.get_token_for_identifiers(buffer, start_index, line)
+            return token, end_index + 1
+        text = BYTES_IDENTIFIER_PATTERN.match(buffer, start_index).group().decode()
+        token, end_index = self.get_token_for_identifiers(text, 0, line)
+        return token, start_index + len(text[:end_index + 1].encode())
 
     def get_token_for_identifiers(self, line, start_index, line_number):
         """Determines whether the segment of the line scanned
         is an identifier or a reserved word, then it
         returns the token accordingly and the index
-        where it stopped scanning.
+        where it stopped scanning. Used for identifiers
+        holding non-ASCII letters, which TOKEN_PATTERN
+        does not cover.
         >>> scnr = Scanner("")
         >>> scnr.get_token_for_identifiers('var something more', 0, 3)
         (Token('VAR', 3, 'var', None), 2)
@@ -151,24 +347,6 @@ class Scanner:
         >>> scnr.get_token_for_identifiers('oregon2', 0, 1)
         (Token('IDENTIFIER', 1, 'oregon2', None), 6)
         """
-        RESERVED_WORDS = {
-            "and":"AND",
-            "class":"CLASS", 
-            "else":"ELSE",
-            "false":"FALSE", 
-            "for":"FOR",
-            "fun":"FUN", 
-            "if":"IF",
-            "nil":"NIL",
-            "or":"OR", 
-            "print":"PRINT",
-            "return":"RETURN", 
-            "super":"SUPER",
-            "this":"THIS", 
-            "true":"TRUE",
-            "var":"VAR",
-            "while":"WHILE"
-        }
         i = start_index
         while i < len(line):
             if line[i].isalpha() or self.is_digit(line[i]):
@@ -176,47 +354,12 @@ class Scanner:
                 continue
             else:
                 break
-        identifier = line[start_index:i]
+        identifier = sys.intern(line[start_index:i])
         if identifier in RESERVED_WORDS:
             return Token(RESERVED_WORDS[identifier], line_number, lexeme = identifier), i - 1
         else:
             return Token("IDENTIFIER", line_number, lexeme = identifier), i - 1
 
-    def get_end_index_for_strings(self, line, start_index):
-        """Returns the index of the second double
-        quote character. If not found, the function
-        returns -1.
-        >>> scnr = Scanner('')
-        >>> scnr.get_end_index_for_strings('\"Something else far\"', 0)
-        19
-        >>> scnr.get_end_index_for_strings('\"Something for my father', 0)
-        -1
-        """
-        for index in range(start_index + 1, len(line)):
-            if line[index] == '\"':
-                return index
-        else:
-            return -1
-
-    def get_end_index_for_numbers(self, line, start_index):
-        """Returns the index where the last number
-        is found in the line.
-        >>> scnr = Scanner('')
-        >>> scnr.get_end_index_for_numbers('for something 1029 there', 14)
-        17
-        >>> scnr.get_end_index_for_numbers('102945439543', 0)
-        11
-        """
-        for index in range(start_index + 1, len(line)):
-            if self.is_digit(line[index]):
-                continue
-            else:
-                if index < len(line) - 1 and line[index] == '.' and self.is_digit(line[index + 1]):
-                    continue
-                else:
-                    return index - 1
-        return len(line) - 1
-
     def is_digit(self, char):
         """Determines if a character is a digit.
         >>> scnr = Scanner('')
@@ -235,6 +378,71 @@ class Scanner:
         """
         return char >= '0' and char <= '9'
 
+def eof_line(source, newlines):
+    """Returns the line number given to the
+    EOF token of a whole-script buffer holding
+    newlines line breaks. It matches the line list
+    run_file used to build: one entry per line
+    from readlines(), plus an empty line when the
+    first line ends with a newline.
+    >>> eof_line('', 0)
+    0
+    >>> eof_line('print 1;', 0)
+    1
+    >>> eof_line('print 1;\\n', 1)
+    2
+    >>> eof_line(b'print 1;\\nprint 2;', 1)
+    3
+    """
+    last_line = newlines
+    if len(source) > 0 and source[-1:] not in ('\n', b'\n'):
+        last_line += 1
+    if newlines > 0:
+        last_line += 1
+    return last_line
+
+def map_source(file):
+    """Memory-maps the script in file, opened
+    in binary mode, so it can be scanned without
+    reading it into memory first. Empty files,
+    which cannot be mapped, give an empty buffer.
+    >>> import tempfile
+    >>> with tempfile.TemporaryFile() as file:
+    ...     __ = file.write(b'print 1;')
+    ...     file.flush()
+    ...     source = map_source(file)
+    ...     Scanner(source).get_tokens()
+    [Token('PRINT', 1, 'print', None), Token('NUMBER', 1, '1', 1.0), Token('SEMICOLON', 1, ';', None), Token('EOF', 1, None, None)]
+    >>> with tempfile.TemporaryFile() as file:
+    ...     map_source(file)
+    b''
+    """
+    if os.fstat(file.fileno()).st_size == 0:
+        return b''
+    return mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
+
+@contextlib.contextmanager
+def mapped_source(file):
+    """Gives the buffer map_source makes for
+    file, and closes the memory map on exit.
+    Tokens hold their own copies of lexemes, so
+    the map can go once the script is parsed.
+    >>> import tempfile
+    >>> with tempfile.TemporaryFile() as file:
+    ...     __ = file.write(b'print 1;')
+    ...     file.flush()
+    ...     with mapped_source(file) as source:
+    ...         tokens = Scanner(source).get_tokens()
+    >>> source.closed, len(tokens)
+    (True, 4)
+    """
+    source = map_source(file)
+    try:
+        yield source
+    finally:
+        if isinstance(source, mmap.mmap):
+            source.close()
+
 if __name__ == '__main__':
     import doctest
-    doctest.testmod()
\ No newline at end of file
+    doctest.testmod()
@@ -0,0 +1,84 @@
+class Shape:
+    __slots__ = ('klass', 'parent', 'name', 'slot', 'transitions')
+
+    def __init__(self, klass, parent = None, name = None):
+        """Initializes a Shape object, the layout
+        shared by instances of klass that gained the
+        same fields in the same order. A shape holds
+        only the field it adds, name, at index slot of
+        the values list of such an instance, and the
+        shape it was reached from, parent, which holds
+        the earlier fields. Every class starts from its
+        own empty shape, and adding a field moves an
+        instance along a transition to the next shape,
+        made once and then shared.
+        >>> root = Shape('Point')
+        >>> point = root.with_field('x').with_field('y')
+        >>> point.slots(), point is root.with_field('x').with_field('y')
+        ({'x': 0, 'y': 1}, True)
+        >>> root.with_field('y').slots()
+        {'y': 0}
+        """
+        self.klass = klass
+        self.parent = parent
+        self.name = name
+        self.slot = -1 if parent == None else parent.slot + 1
+        self.transitions = {}
+
+    def with_field(self, name):
+        """Returns the shape reached by adding
+        field name to this one.
+        """
+        shape = self.transitions.get(name)
+        if shape == None:
+            shape = self.transitions[name] = Shape(self.klass, self, name)
+        return shape
+
+    def slot_of(self, name):
+        """Returns the slot of field name in
+        this shape, or None. The fields are looked
+        up along the parent links, so a shape costs
+        the same whatever the number of fields before
+        it; inline caches keep the answer per site.
+        >>> Shape('Point').with_field('x').with_field('y').slot_of('x')
+        0
+        """
+        shape = self
+        while shape.parent != None:
+            if shape.name == name:
+                return shape.slot
+            shape = shape.parent
+        return None
+
+    def slots(self):
+        """Returns a dict mapping each field
+        name of this shape to its slot.
+        """
+        slots = {}
+        shape = self
+        while shape.parent != None:
+            slots[shape.name] = shape.slot
+            shape = shape.parent
+        return dict(reversed(slots.items()))
+
+def find_property(shape, name):
+    """Returns what a read of name finds on an
+    instance of shape: the slot of its field, or
+    else the method of its class, or None. Inline
+    caches of get expressions remember it.
+    """
+    slot = shape.slot_of(name)
+    if slot != None:
+        return slot
+    return shape.klass.find_method(name)
+
+def find_field(shape, name):
+    """Returns where a write of name goes on an
+    instance of shape: the slot of its field, or
+    else the shape the new field leads to. Inline
+    caches of set expressions remember it.
+    """
+    slot = shape.slot_of(name)
+    if slot != None:
+        return slot
+    return shape.with_field(name)
@@ -1,6 +1,8 @@
 from abc import ABC, abstractclassmethod
 
 class Stmt(ABC):
+    __slots__ = ()
+
     @abstractclassmethod
     def __init__(self):
         pass
@@ -1,26 +1,40 @@
 from Statement import Stmt
 
 class Block(Stmt):
+    __slots__ = ('statements',)
+    fields = ('statements',)
+
     def __init__(self, statements):
        self.statements = statements
     def accept(self, visitor):
         return visitor.visit_block_stmt(self)
 
 class Class(Stmt):
+    __slots__ = ('name', 'superclass', 'methods', 'access', 'slot')
+    fields = ('name', 'superclass', 'methods')
+
     def __init__(self, name, superclass, methods):
        self.name = name
        self.superclass = superclass
        self.methods = methods
+       self.access = None
+       self.slot = None
     def accept(self, visitor):
         return visitor.visit_class_stmt(self)
 
 class Expression(Stmt):
+    __slots__ = ('expression',)
+    fields = ('expression',)
+
     def __init__(self, expression):
        self.expression = expression
     def accept(self, visitor):
         return visitor.visit_expression_stmt(self)
 
 class If(Stmt):
+    __slots__ = ('condition', 'then_branch', 'else_branch')
+    fields = ('condition', 'then_branch', 'else_branch')
+
     def __init__(self, condition, then_branch, else_branch):
        self.condition = condition
        self.then_branch = then_branch
@@ -29,20 +43,33 @@ class If(Stmt):
         return visitor.visit_if_stmt(self)
 
 class Function(Stmt):
+    __slots__ = ('name', 'params', 'body', 'access', 'slot', 'upvalues', 'cells')
+    fields = ('name', 'params', 'body')
+
     def __init__(self, name, params, body):
        self.name = name
        self.params = params
        self.body = body
+       self.access = None
+       self.slot = None
+       self.upvalues = None
+       self.cells = None
     def accept(self, visitor):
         return visitor.visit_function_stmt(self)
 
 class Print(Stmt):
+    __slots__ = ('expression',)
+    fields = ('expression',)
+
     def __init__(self, expression):
        self.expression = expression
     def accept(self, visitor):
         return visitor.visit_print_stmt(self)
 
 class Return(Stmt):
+    __slots__ = ('keyword', 'value')
+    fields = ('keyword', 'value')
+
     def __init__(self, keyword, value):
        self.keyword = keyword
        self.value = value
@@ -50,6 +77,9 @@ class Return(Stmt):
         return visitor.visit_return_stmt(self)
 
 class While(Stmt):
+    __slots__ = ('condition', 'body')
+    fields = ('condition', 'body')
+
     def __init__(self, condition, body):
        self.condition = condition
        self.body = body
@@ -57,9 +87,14 @@ class While(Stmt):
         return visitor.visit_while_stmt(self)
 
 class Var(Stmt):
+    __slots__ = ('name', 'initializer', 'access', 'slot')
+    fields = ('name', 'initializer')
+
     def __init__(self, name, initializer):
        self.name = name
        self.initializer = initializer
+       self.access = None
+       self.slot = None
     def accept(self, visitor):
         return visitor.visit_var_stmt(self)
 
@@ -95,36 +95,122 @@ Operand must be a number.
 >>> run_file("Tests/test20.lox")
 [line 1] Error at 'true': Expect '(' after 'while'.
 [line 3] Error at ';': Expect ')' after condition.
+>>> run_file("Tests/test21.lox")
+2
+610
+square with area
+9
+blob with area
+unknown
+25
+true
+>>> run_file("Tests/test22.lox")
+201
+1
+false
+200
+true
+3
+40200
+-1
+5
+boxed
+200
+>>> run_file("Tests/test23.lox")
+Operands must be two numbers or two strings.
+[line 2]
+>>> run_file("Tests/test24.lox")
+[line 1] Error at ';': Expect ')' after expression.
+[line 2] Error at ';': Expect expression.
+[line 4] Error at 'var': Expect expression.
+[line 5] Error at '=': Invalid assignment target.
+>>> run_file("Tests/test25.lox")
+112
+113
+5
+base
+3
+1
+8
+2
+1
+>>> run_file("Tests/test26.lox")
+6
+nil
+nil
+6
+2
+2
+last
+concat
+13
+3
+Undefined property small.
+[line 22]
+>>> run_file("Tests/test27.lox")
+3
+1
+3
+2
+30
+12
+30
+13
+method
+field
+method
+11
+other
+6
+Undefined property a.
+[line 10]
+>>> run_file("Tests/test28.lox")
+f
+g
+>>> run_file("Tests/test29.lox")
+1
+Undefined property y.
+[line 5]
+>>> import contextlib, glob, io
+>>> def output(path, backend):
+...     text = io.StringIO()
+...     with contextlib.redirect_stdout(text):
+...         run_file(path, backend)
+...     return text.getvalue()
+>>> [(path, backend) for path in sorted(glob.glob("Tests/*.lox")) for backend in ('closures', 'vm', 'python') if output(path, backend) != output(path, 'tree')]
+[]
 """
 import sys
-from Scanner import Scanner
+from Core import execute
+from Scanner import Scanner, mapped_source
 from Interpreter import Interpreter
 from Parser import Parser
 from Resolver import Resolver
+from TokenBuffer import TokenBuffer
 
-def run_file(file_path):
+def run_file(file_path, backend = 'tree'):
     """This function is executed when two
     arguments are passed in the command-line.
     The second argument is a file path to open and
-    read all its lines. An exception is raised if the
-    file path is not found.
+    memory-map, so the script is scanned straight from
+    the mapped file, closed once it is parsed, and run
+    with the named backend.
+    An exception is raised if the file path is not found.
     """
     try:
-        with open(file_path, 'r') as file:
-            lines = file.readlines()
-            if len(lines) > 0 and lines[0][-1] == '\n':
-                lines.append("")
-            scnr = Scanner(lines)
-            token_list = scnr.get_tokens()
-            if scnr.lox_error == False:
-                parser = Parser(token_list)
-                abstract_syntax_tree = parser.parse()
-                if parser.lox_error == False:
-                    interpreter = Interpreter(abstract_syntax_tree)
-                    resolver = Resolver(interpreter)
-                    resolver.resolve(abstract_syntax_tree)
-                    if resolver.lox_error == False:
-                        interpreter.interpret(interpreter.tree)
+        with open(file_path, 'rb') as file, mapped_source(file) as source:
+            scnr = Scanner(source)
+            parser = Parser(TokenBuffer(scnr.iter_tokens()), scnr)
+            abstract_syntax_tree = parser.parse()
+            interpreter = None
+            if scnr.lox_error == False and parser.lox_error == False:
+                interpreter = Interpreter(abstract_syntax_tree)
+                resolver = Resolver(interpreter)
+                resolver.resolve(abstract_syntax_tree)
+                if resolver.lox_error == True:
+                    interpreter = None
+        if interpreter != None:
+            execute(interpreter, backend)
     except FileNotFoundError:
         print("File Not Found")
     except SystemExit:
@@ -1,4 +1,6 @@
 class Token:
+    __slots__ = ('TOKEN_TYPE', 'LINE', 'LITERAL', 'LEXEME')
+
     def __init__(self, token_type, line, lexeme = None, literal = None):
         """Initializes a token object.
         >>> obj = Token("COMMA", 1, ",")
@@ -18,6 +20,8 @@ class Token:
         'Something'
         >>> obj.LEXEME
         '.'
+        >>> hasattr(obj, '__dict__')
+        False
         """
         self.TOKEN_TYPE = token_type
         self.LINE = line
@@ -50,6 +54,16 @@ class Token:
         "Token('AND', 2, 'and', None)"
         """
         return f"Token({self.TOKEN_TYPE!r}, {self.LINE!r}, {self.LEXEME!r}, {self.LITERAL!r})"
+
+    def __reduce__(self):
+        """Pickles a Token as a call to its
+        constructor, which is smaller and faster to
+        load than the generic state of its slots.
+        >>> import pickle
+        >>> pickle.loads(pickle.dumps(Token("NUMBER", 3, '1.5', 1.5)))
+        Token('NUMBER', 3, '1.5', 1.5)
+        """
+        return (Token, (self.TOKEN_TYPE, self.LINE, self.LEXEME, self.LITERAL))
     
     def get_token_type(self):
         """Getter method for field
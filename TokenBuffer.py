@@ -0,0 +1,46 @@
+class TokenBuffer:
+    def __init__(self, tokens, capacity = 8):
+        """Initializes a TokenBuffer object, a
+        small ring buffer over a token iterator
+        that can be indexed like the token list
+        the Parser normally reads from.
+        >>> from Token import Token
+        >>> buffer = TokenBuffer(iter([Token('EOF', 1)]))
+        >>> buffer.capacity
+        8
+        >>> buffer.count
+        0
+        """
+        self.tokens = iter(tokens)
+        self.capacity = capacity
+        self.ring = [None] * capacity
+        self.count = 0
+
+    def __getitem__(self, index):
+        """Returns the token at the absolute
+        position index, pulling tokens from the
+        iterator on demand. Only the last capacity
+        tokens stay reachable.
+        >>> from Token import Token
+        >>> buffer = TokenBuffer((Token('NUMBER', 1, str(i), float(i)) for i in range(10)), 4)
+        >>> buffer[2]
+        Token('NUMBER', 1, '2', 2.0)
+        >>> buffer[5]
+        Token('NUMBER', 1, '5', 5.0)
+        >>> buffer[4]
+        Token('NUMBER', 1, '4', 4.0)
+        >>> buffer[1]
+        Traceback (most recent call last):
+        ...
+        IndexError: token 1 already left the lookahead window
+        """
+        while index >= self.count:
+            self.ring[self.count % self.capacity] = next(self.tokens)
+            self.count += 1
+        if index < self.count - self.capacity:
+            raise IndexError(f"token {index} already left the lookahead window")
+        return self.ring[index % self.capacity]
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
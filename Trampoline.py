@@ -0,0 +1,85 @@
+from types import GeneratorType
+
+# Nesting depth past which the Parser, Resolver and Interpreter stop
+# recursing and continue on an explicit stack of generators.
+DEEP_NESTING = 64
+
+def trampoline(generator, visitor = None):
+    """Runs generator on an explicit stack instead
+    of the Python call stack. Whenever a generator
+    yields another generator, that one is run and its
+    return value is sent back to the generator that
+    yielded it. When a visitor is given, generators may
+    also yield syntax tree nodes: node.accept(visitor)
+    is then run in the same way, or its value sent back
+    directly when the visit is not a generator.
+    Exceptions travel up the stack like in ordinary
+    calls.
+    >>> def count_down(n):
+    ...     if n == 0:
+    ...         return 0
+    ...     return 1 + (yield count_down(n - 1))
+    >>> trampoline(count_down(100000))
+    100000
+    >>> def fail(n):
+    ...     if n == 0:
+    ...         raise ValueError("bottom")
+    ...     yield fail(n - 1)
+    >>> def catch():
+    ...     try:
+    ...         yield fail(50000)
+    ...     except ValueError as error:
+    ...         return str(error)
+    >>> trampoline(catch())
+    'bottom'
+    """
+    stack = [generator]
+    value = None
+    error = None
+    while len(stack) > 0:
+        try:
+            if error == None:
+                child = stack[-1].send(value)
+            else:
+                exception = error
+                error = None
+                child = stack[-1].throw(exception)
+        except StopIteration as stop:
+            stack.pop()
+            value = stop.value
+            continue
+        except Exception as exception:
+            stack.pop()
+            if len(stack) == 0:
+                raise
+            error = exception
+            continue
+
+        if visitor != None and not isinstance(child, GeneratorType):
+            child = child.accept(visitor)
+            if not isinstance(child, GeneratorType):
+                value = child
+                continue
+        stack.append(child)
+        value = None
+    return value
+
+def accept_iteratively(node, visitor):
+    """Returns node.accept(visitor), running
+    the visit on an explicit stack when it is
+    a generator.
+    >>> from ExprSubClasses import Literal
+    >>> class Doubler:
+    ...     def visit_literal_expr(self, expr):
+    ...         return expr.value * 2
+    >>> accept_iteratively(Literal(21), Doubler())
+    42
+    """
+    visit = node.accept(visitor)
+    if isinstance(visit, GeneratorType):
+        return trampoline(visit, visitor)
+    return visit
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
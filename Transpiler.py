@@ -0,0 +1,709 @@
+from functools import partial
+from math import isfinite
+from Environment import Cell, UNDEFINED, LOCAL, CELL, UPVALUE
+from ExprSubClasses import Binary, Get, Grouping, Literal, Logical, Unary, Variable, This, Assign, Set
+from ExprVisitor import ExprVisitor
+from LoxCallable import LoxCallable
+from LoxClass import LoxClass
+from LoxError import runtime_error, LoxException as RuntimeException
+from LoxFunction import LoxFunction
+from LoxInstance import LoxInstance
+from StmtVisitor import StmtVisitor
+from Trampoline import accept_iteratively
+
+# Python operators of the binary expressions, with the
+# check their operands need.
+ARITHMETIC = {'MINUS':'-', 'SLASH':'/', 'STAR':'*'}
+COMPARISONS = {'GREATER_THAN':'>', 'GREATER_EQUAL':'>=', 'LESS_THAN':'<', 'LESS_EQUAL':'<='}
+EQUALITIES = {'EQUAL_EQUAL':'==', 'NOT_EQUAL':'!='}
+
+class TranspiledFunction(LoxCallable):
+    __slots__ = ('function', 'name', 'argument_count', 'receiver', 'invoke')
+
+    def __init__(self, function, name, argument_count, receiver = None):
+        """Initializes a TranspiledFunction
+        object, a Lox function translated by a
+        Transpiler into the Python function
+        function. A method takes the instance it
+        is bound to as its first argument, so
+        invoke passes the receiver along.
+        >>> function = TranspiledFunction(lambda this, n: (this, n), 'f', 1)
+        >>> str(function), function.arity()
+        ('<fn f>', 1)
+        >>> function.bind('instance').call(None, [2.0])
+        ('instance', 2.0)
+        >>> function.call(None, [3.0], 'receiver')
+        ('receiver', 3.0)
+        """
+        self.function = function
+        self.name = name
+        self.argument_count = argument_count
+        self.receiver = receiver
+        self.invoke = function if receiver is None else partial(function, receiver)
+
+    def call(self, interpreter, arguments, receiver = None):
+        """Runs the function with arguments,
+        and receiver as the instance of a method
+        when it is given.
+        """
+        if receiver == None:
+            return self.invoke(*arguments)
+        return self.function(receiver, *arguments)
+
+    def arity(self):
+        """Returns the number of parameters.
+        """
+        return self.argument_count
+
+    def bind(self, instance):
+        """Returns this method bound
+        to instance.
+        """
+        return TranspiledFunction(self.function, self.name, self.argument_count, instance)
+
+    def __str__(self):
+        """Returns how the function is
+        printed in Lox.
+        """
+        return f"<fn {self.name}>"
+
+def is_simple(expr):
+    """Checks whether expr makes no calls
+    and assigns nothing, so evaluating it
+    cannot change a local variable.
+    """
+    if isinstance(expr, (Literal, Variable, This)):
+        return True
+    elif isinstance(expr, Grouping):
+        return is_simple(expr.expression)
+    elif isinstance(expr, Unary):
+        return is_simple(expr.right)
+    elif isinstance(expr, (Binary, Logical)):
+        return is_simple(expr.left) and is_simple(expr.right)
+    return False
+
+def is_boolean(expr):
+    """Checks whether expr always gives a
+    bool, whose Python truth is its Lox truth.
+    """
+    if isinstance(expr, Literal):
+        return isinstance(expr.value, bool)
+    elif isinstance(expr, Grouping):
+        return is_boolean(expr.expression)
+    elif isinstance(expr, Unary):
+        return expr.operator.get_token_type() != 'MINUS'
+    elif isinstance(expr, Binary):
+        return expr.operator.get_token_type() in COMPARISONS or expr.operator.get_token_type() in EQUALITIES
+    elif isinstance(expr, Logical):
+        return is_boolean(expr.left) and is_boolean(expr.right)
+    return False
+
+class Transpiler(StmtVisitor, ExprVisitor):
+    def __init__(self, interpreter):
+        """Initializes a Transpiler object, an
+        execution backend that translates the resolved
+        tree of interpreter into Python source and runs
+        it with compile and exec. Lox functions become
+        Python functions and their locals Python locals;
+        a captured variable is a Cell that closures take
+        as a keyword-only default, so each closure keeps
+        the cells alive when it was made. Globals stay in
+        the interpreter's slots, and code the Resolver
+        marked deep is left to interpreter.
+        >>> from Interpreter import Interpreter
+        >>> from Parser import Parser
+        >>> from Resolver import Resolver
+        >>> from Scanner import Scanner
+        >>> source = '''
+        ... fun fib(n) { if (n < 2) return n; return fib(n - 2) + fib(n - 1); }
+        ... class Pair { init(a, b) { this.a = a; this.b = b; } sum() { return this.a + this.b; } }
+        ... print Pair(fib(10), 3).sum();'''
+        >>> tree = Parser(Scanner(source).get_tokens()).parse()
+        >>> interpreter = Interpreter(tree)
+        >>> Resolver(interpreter).resolve(tree)
+        >>> Transpiler(interpreter).interpret(tree)
+        58
+        >>> source = "fun count(n) { var total = 0; while (total < n) total = total + 1; return total; }"
+        >>> tree = Parser(Scanner(source).get_tokens()).parse()
+        >>> Resolver(interpreter).resolve(tree)
+        >>> print(Transpiler(interpreter).translate(tree))
+        def script():
+            def count_1(n_2):
+                total_3 = 0.0
+                while (total_3 < n_2 if type(total_3) is type(n_2) is float else fail(k1, "Operands must be numbers.")):
+                    total_3 = (total_3 + 1.0 if type(total_3) is float else fail(k2, "Operands must be two numbers or two strings."))
+                return total_3
+            G[3] = TranspiledFunction(count_1, 'count', 1)
+        """
+        self.interpreter = interpreter
+        self.names = 0
+        self.constants = {}
+        self.namespace = self.runtime()
+        self.lines = []
+        self.indent = 1
+        self.depth = 0
+        self.slot_names = []
+        self.upvalue_names = []
+        self.initializer_this = None
+
+    def runtime(self):
+        """Returns the namespace the translated
+        code runs in: the global slots and the
+        helpers for calls, properties and errors.
+        """
+        interpreter = self.interpreter
+        global_environment = interpreter.globals
+
+        def call(paren, callee, *arguments):
+            if type(callee) is TranspiledFunction:
+                if callee.argument_count == len(arguments):
+                    return callee.invoke(*arguments)
+            elif not isinstance(callee, LoxCallable):
+                raise RuntimeException(paren, "Can only call functions and classes")
+            if len(arguments) != callee.arity():
+                raise RuntimeException(paren, f"Expected {callee.arity()} arguments but got {len(arguments)}")
+            return callee.call(interpreter, list(arguments))
+
+        def instance(name, instance):
+            if isinstance(instance, LoxInstance):
+                return instance
+            raise RuntimeException(name, "Only instances have fields.")
+
+        def set_field(expr, instance, value):
+            interpreter.set_property(expr, instance, value)
+            return value
+
+        def assign(cell, value):
+            cell.value = value
+            return value
+
+        def assign_global(slot, name, value):
+            global_environment.assign_slot(slot, name, value)
+            return value
+
+        def super_method(method, superclass, instance):
+            bound = superclass.find_method(method.get_lexeme())
+            if bound == None:
+                raise RuntimeException(method, f"Undefined property \'{method.get_lexeme()}\'")
+            return bound.bind(instance)
+
+        def superclass(name, value):
+            if not isinstance(value, LoxClass):
+                raise RuntimeException(name, "Superclass must be a class")
+            return value
+
+        def undefined(name):
+            raise RuntimeException(name, f"Undefined variable \'{name.get_lexeme()}\'")
+
+        def fail(token, message):
+            raise RuntimeException(token, message)
+
+        def run_deep(statement):
+            accept_iteratively(statement, interpreter.deep_interpreter)
+
+        return {
+            'G':global_environment.values, 'UNDEFINED':UNDEFINED, 'ADDABLE':(float, str),
+            'Cell':Cell, 'LoxClass':LoxClass, 'LoxFunction':LoxFunction, 'LoxInstance':LoxInstance,
+            'TranspiledFunction':TranspiledFunction,
+            'stringify':interpreter.stringify, 'assign_slot':global_environment.assign_slot,
+            'call':call, 'get':interpreter.get_property, 'method':interpreter.find_property, 'instance':instance,
+            'store':interpreter.set_property, 'set_field':set_field, 'assign':assign,
+            'assign_global':assign_global, 'super_method':super_method, 'superclass':superclass,
+            'undefined':undefined, 'fail':fail, 'run_deep':run_deep
+        }
+
+    def interpret(self, statements):
+        """Translates statements, runs them
+        and reports runtime errors like the
+        interpreter does.
+        """
+        programs = self.compile(statements)
+        try:
+            for program in programs:
+                program()
+        except RuntimeException as error:
+            runtime_error(error)
+
+    def compile(self, statements):
+        """Returns the Python functions running
+        statements in order. When CPython cannot
+        compile the translation, for nesting its own
+        compiler limits, each top-level statement is
+        compiled alone and the ones still failing are
+        left to the interpreter.
+        """
+        units = [self.translate_statement(statement) for statement in statements]
+        try:
+            return [self.load(line for unit in units for line in unit)]
+        except (SyntaxError, RecursionError, MemoryError):
+            pass
+        programs = []
+        for statement, unit in zip(statements, units):
+            try:
+                programs.append(self.load(unit))
+            except (SyntaxError, RecursionError, MemoryError):
+                programs.append(partial(self.namespace['run_deep'], statement))
+        return programs
+
+    def load(self, lines):
+        """Compiles the body lines of a script
+        function and returns the function.
+        """
+        source = self.script(list(lines))
+        namespace = dict(self.namespace)
+        exec(compile(source, '<lox>', 'exec'), namespace)
+        return namespace['script']
+
+    def script(self, lines):
+        """Returns the source of a script
+        function with body lines.
+        """
+        return '\n'.join(['def script():'] + (lines or ['    pass']))
+
+    def translate(self, statements):
+        """Returns the Python source
+        statements are translated into.
+        """
+        return self.script([line for statement in statements for line in self.translate_statement(statement)])
+
+    def translate_statement(self, statement):
+        """Returns the lines of the script
+        body that run a top-level statement.
+        """
+        self.lines = []
+        if statement in self.interpreter.deep_nodes:
+            self.emit(f"run_deep({self.constant(statement)})")
+        else:
+            statement.accept(self)
+        return self.lines
+
+    def emit(self, line):
+        """Appends a line of source
+        at the current indentation.
+        """
+        self.lines.append('    ' * self.indent + line)
+
+    def emit_body(self, statement):
+        """Translates the body of an if,
+        while or function, which Python needs
+        to be non-empty.
+        """
+        start = len(self.lines)
+        self.indent += 1
+        statement.accept(self)
+        if len(self.lines) == start:
+            self.emit('pass')
+        self.indent -= 1
+
+    def constant(self, value):
+        """Returns the name the translated
+        code reads value by, for tokens and
+        other values with no Python literal.
+        """
+        name = self.constants.get(id(value))
+        if name == None:
+            name = self.constants[id(value)] = f"k{len(self.constants) + 1}"
+            self.namespace[name] = value
+        return name
+
+    def unique(self, lexeme):
+        """Returns a new Python name for a
+        Lox variable or function. Lox names have
+        no underscores, so the number keeps it apart
+        from other variables, helpers and temporaries.
+        """
+        self.names += 1
+        if not lexeme.isidentifier():
+            lexeme = 'v'
+        return f"{lexeme}_{self.names}"
+
+    def declare(self, lexeme):
+        """Gives the next slot of the current
+        frame a new Python name and returns it.
+        """
+        name = self.unique(lexeme)
+        self.slot_names.append(name)
+        return name
+
+    def temporary(self, letter = 'a'):
+        """Returns the temporary of the
+        current expression depth, which nested
+        expressions cannot overwrite.
+        """
+        return f"_{letter}{self.depth}"
+
+    def expression(self, expr):
+        """Returns the Python expression
+        translating expr.
+        """
+        self.depth += 1
+        source = expr.accept(self)
+        self.depth -= 1
+        return source
+
+    def condition(self, expr):
+        """Returns a Python expression true
+        when expr is truthy in Lox.
+        """
+        if is_boolean(expr):
+            return self.expression(expr)
+        value = self.temporary('c')
+        return f"({value} := {self.expression(expr)}) is not None and {value} is not False"
+
+    def variable(self, name, access, slot):
+        """Returns the Python expression
+        reading a variable the way access tells.
+        """
+        if access == LOCAL:
+            return self.slot_names[slot]
+        elif access == CELL:
+            return f"{self.slot_names[slot]}.value"
+        elif access == UPVALUE:
+            return f"{self.upvalue_names[slot]}.value"
+        value = self.temporary()
+        return f"({value} if ({value} := G[{slot}]) is not UNDEFINED else undefined({self.constant(name)}))"
+
+    def cell(self, access, slot):
+        """Returns the name of the cell of
+        a captured variable.
+        """
+        if access == CELL:
+            return self.slot_names[slot]
+        return self.upvalue_names[slot]
+
+    def function(self, declaration, is_initializer = False, is_method = False):
+        """Emits the Python function a Lox
+        function is translated into and returns
+        the expression making its callable. A
+        function marked deep stays a LoxFunction
+        run by the interpreter.
+        """
+        upvalues = [self.slot_names[source] if source >= 0 else self.upvalue_names[-1 - source] for source in declaration.upvalues]
+        if declaration in self.interpreter.deep_nodes:
+            cells = ''.join(f"{upvalue}, " for upvalue in upvalues)
+            return f"LoxFunction({self.constant(declaration)}, ({cells}), {is_initializer}, None, True)"
+
+        lexeme = declaration.name.get_lexeme()
+        python_name = self.unique(lexeme)
+        enclosing = (self.slot_names, self.upvalue_names, self.initializer_this)
+        self.slot_names = []
+        self.upvalue_names = upvalues
+        if is_method:
+            self.declare('this')
+        for parameter in declaration.params:
+            self.declare(parameter.get_lexeme())
+        parameters = list(self.slot_names)
+        if len(upvalues) > 0:
+            parameters.append('*')
+            parameters.extend(f"{upvalue}={upvalue}" for upvalue in upvalues)
+        self.initializer_this = None
+        if is_initializer:
+            self.initializer_this = self.variable(None, CELL if 0 in declaration.cells else LOCAL, 0)
+
+        self.emit(f"def {python_name}({', '.join(parameters)}):")
+        start = len(self.lines)
+        self.indent += 1
+        for slot in declaration.cells:
+            self.emit(f"{self.slot_names[slot]} = Cell({self.slot_names[slot]})")
+        for statement in declaration.body:
+            statement.accept(self)
+        if is_initializer:
+            self.emit(f"return {self.initializer_this}")
+        elif len(self.lines) == start:
+            self.emit('pass')
+        self.indent -= 1
+
+        self.slot_names, self.upvalue_names, self.initializer_this = enclosing
+        return f"TranspiledFunction({python_name}, {lexeme!r}, {len(declaration.params)})"
+
+    def define(self, statement, name, value):
+        """Emits the definition of the variable
+        statement declares, named name when local.
+        """
+        if statement.access == None:
+            self.emit(f"G[{statement.slot}] = {value}")
+        elif statement.access == CELL:
+            self.emit(f"{name} = Cell({value})")
+        else:
+            self.emit(f"{name} = {value}")
+
+    def visit_var_stmt(self, statement):
+        """Translates a variable declaration.
+        """
+        value = 'None'
+        if statement.initializer != None:
+            value = self.expression(statement.initializer)
+        name = None
+        if statement.access != None:
+            name = self.declare(statement.name.get_lexeme())
+        self.define(statement, name, value)
+
+    def visit_block_stmt(self, statement):
+        """Translates a block, whose variables
+        have Python names of their own, so it
+        only drops them from the frame's slots.
+        """
+        base = len(self.slot_names)
+        for inner_statement in statement.statements:
+            inner_statement.accept(self)
+        del self.slot_names[base:]
+
+    def visit_class_stmt(self, statement):
+        """Translates a class statement. The
+        class variable is defined before the
+        methods capture it, and the superclass
+        takes the next slot in a cell meanwhile.
+        """
+        if statement.superclass != None:
+            self.emit(f"_s = superclass({self.constant(statement.superclass.name)}, {self.expression(statement.superclass)})")
+        name = None
+        if statement.access != None:
+            name = self.declare(statement.name.get_lexeme())
+        self.define(statement, name, 'None')
+        superclass = 'None'
+        if statement.superclass != None:
+            superclass = self.declare('super')
+            self.emit(f"{superclass} = Cell(_s)")
+            superclass = f"{superclass}.value"
+
+        methods = []
+        for method in statement.methods:
+            lexeme = method.name.get_lexeme()
+            methods.append(f"{lexeme!r}: {self.function(method, lexeme == 'init', True)}")
+        lox_class = f"LoxClass({statement.name.get_lexeme()!r}, {superclass}, {{{', '.join(methods)}}})"
+
+        if statement.superclass != None:
+            self.slot_names.pop()
+        if statement.access == None:
+            self.emit(f"G[{statement.slot}] = {lox_class}")
+        elif statement.access == CELL:
+            self.emit(f"{name}.value = {lox_class}")
+        else:
+            self.emit(f"{name} = {lox_class}")
+
+    def visit_function_stmt(self, statement):
+        """Translates a function declaration.
+        A function capturing itself gets its
+        cell before it is made.
+        """
+        if statement.access == None:
+            self.emit(f"G[{statement.slot}] = {self.function(statement)}")
+            return None
+        name = self.declare(statement.name.get_lexeme())
+        if statement.access == CELL:
+            self.emit(f"{name} = Cell()")
+            self.emit(f"{name}.value = {self.function(statement)}")
+        else:
+            self.emit(f"{name} = {self.function(statement)}")
+
+    def visit_expression_stmt(self, statement):
+        """Translates an expression statement.
+        Assignments become Python assignments,
+        whose value is not needed.
+        """
+        expr = statement.expression
+        if isinstance(expr, Assign):
+            value = self.expression(expr.value)
+            if expr.access == LOCAL:
+                self.emit(f"{self.slot_names[expr.slot]} = {value}")
+            elif expr.access == None:
+                self.emit(f"assign_slot({expr.slot}, {self.constant(expr.name)}, {value})")
+            else:
+                self.emit(f"{self.cell(expr.access, expr.slot)}.value = {value}")
+        elif isinstance(expr, Set) and isinstance(expr.lox_object, This):
+            lox_object = self.expression(expr.lox_object)
+            self.emit(f"store({self.constant(expr)}, {lox_object}, {self.expression(expr.value)})")
+        elif isinstance(expr, Set):
+            self.emit(f"_o = instance({self.constant(expr.name)}, {self.expression(expr.lox_object)})")
+            self.emit(f"store({self.constant(expr)}, _o, {self.expression(expr.value)})")
+        else:
+            self.emit(self.expression(expr))
+
+    def visit_print_stmt(self, statement):
+        """Translates a print statement.
+        """
+        self.emit(f"print(stringify({self.expression(statement.expression)}))")
+
+    def visit_if_stmt(self, statement):
+        """Translates an if statement.
+        """
+        self.emit(f"if {self.condition(statement.condition)}:")
+        self.emit_body(statement.then_branch)
+        if statement.else_branch != None:
+            self.emit('else:')
+            self.emit_body(statement.else_branch)
+
+    def visit_while_stmt(self, statement):
+        """Translates a while statement.
+        """
+        self.emit(f"while {self.condition(statement.condition)}:")
+        self.emit_body(statement.body)
+
+    def visit_return_stmt(self, statement):
+        """Translates a return statement. An
+        initializer always returns this.
+        """
+        if self.initializer_this != None:
+            self.emit(f"return {self.initializer_this}")
+        elif statement.value == None:
+            self.emit('return None')
+        else:
+            self.emit(f"return {self.expression(statement.value)}")
+
+    def visit_literal_expr(self, expr):
+        """Translates a literal.
+        """
+        if isinstance(expr.value, float) and not isfinite(expr.value):
+            return self.constant(expr.value)
+        return repr(expr.value)
+
+    def visit_grouping_expr(self, expr):
+        """Translates a grouping, which is
+        its inner expression.
+        """
+        return self.expression(expr.expression)
+
+    def visit_variable_expr(self, expr):
+        """Translates a variable read.
+        """
+        return self.variable(expr.name, expr.access, expr.slot)
+
+    def visit_this_expr(self, expr):
+        """Translates a this expression.
+        """
+        return self.variable(expr.keyword, expr.access, expr.slot)
+
+    def visit_assign_expr(self, expr):
+        """Translates an assignment, whose
+        value is the value assigned.
+        """
+        value = self.expression(expr.value)
+        if expr.access == LOCAL:
+            return f"({self.slot_names[expr.slot]} := {value})"
+        elif expr.access == None:
+            return f"assign_global({expr.slot}, {self.constant(expr.name)}, {value})"
+        return f"assign({self.cell(expr.access, expr.slot)}, {value})"
+
+    def visit_super_expr(self, expr):
+        """Translates a super expression into
+        the superclass method bound to this.
+        """
+        superclass = self.variable(expr.keyword, expr.access, expr.slot)
+        this = self.variable(expr.keyword, expr.this_access, expr.this_slot)
+        return f"super_method({self.constant(expr.method)}, {superclass}, {this})"
+
+    def visit_get_expr(self, expr):
+        """Translates a property read.
+        """
+        return f"get({self.constant(expr)}, {self.expression(expr.lox_object)})"
+
+    def visit_set_expr(self, expr):
+        """Translates a property write. The
+        object is checked before the value is
+        evaluated, like the interpreter does.
+        """
+        lox_object = f"instance({self.constant(expr.name)}, {self.expression(expr.lox_object)})"
+        return f"set_field({self.constant(expr)}, {lox_object}, {self.expression(expr.value)})"
+
+    def visit_call_expr(self, expr):
+        """Translates a call. When evaluating the
+        arguments makes no call, a function of the
+        right arity is invoked inline and anything
+        else goes through the call helper, which
+        evaluates the arguments in its place.
+        """
+        callee = self.temporary()
+        arguments = [self.expression(argument) for argument in expr.arguments]
+        paren = self.constant(expr.paren)
+        rest = ''.join(f", {argument}" for argument in arguments)
+        if not all(is_simple(argument) for argument in expr.arguments):
+            return f"call({paren}, {self.expression(expr.callee)}{rest})"
+        elif type(expr.callee) is Get:
+            return self.invoke(expr, arguments)
+        checked = f"type({callee} := {self.expression(expr.callee)}) is TranspiledFunction and {callee}.argument_count == {len(arguments)}"
+        return f"({callee}.invoke({', '.join(arguments)}) if {checked} else call({paren}, {callee}{rest}))"
+
+    def invoke(self, expr, arguments):
+        """Translates a call of a property with
+        the translated arguments. A method of the
+        right arity found for the shape of an instance
+        gets the instance as its first argument, with
+        no bound method made; anything else goes
+        through the get and call helpers.
+        """
+        callee = self.temporary()
+        instance = self.temporary('b')
+        rest = ''.join(f", {argument}" for argument in arguments)
+        get = self.constant(expr.callee)
+        checked = (f"type({instance} := {self.expression(expr.callee.lox_object)}) is LoxInstance"
+            f" and type({callee} := method({get}, {instance}.shape)) is TranspiledFunction and {callee}.argument_count == {len(arguments)}")
+        fallback = f"call({self.constant(expr.paren)}, get({get}, {instance}){rest})"
+        return f"({callee}.function({instance}{rest}) if {checked} else {fallback})"
+
+    def visit_logical_expr(self, expr):
+        """Translates a logical expression,
+        which gives the operand deciding it.
+        """
+        keyword = 'or' if expr.operator.get_token_type() == 'OR' else 'and'
+        left = self.expression(expr.left)
+        right = self.expression(expr.right)
+        if is_boolean(expr.left):
+            return f"({left} {keyword} {right})"
+        value = self.temporary()
+        truthy = f"({value} := {left}) is not None and {value} is not False"
+        if keyword == 'or':
+            return f"({value} if {truthy} else {right})"
+        return f"({right} if {truthy} else {value})"
+
+    def visit_unary_expr(self, expr):
+        """Translates a unary expression.
+        """
+        value = self.temporary()
+        right = self.expression(expr.right)
+        if expr.operator.get_token_type() == 'MINUS' and isinstance(expr.right, Literal) and type(expr.right.value) is float:
+            return f"(-{right})"
+        elif expr.operator.get_token_type() == 'MINUS':
+            return f"(-{value} if type({value} := {right}) is float else fail({self.constant(expr.operator)}, \"Operand must be a number.\"))"
+        if is_boolean(expr.right):
+            return f"(not {right})"
+        return f"(({value} := {right}) is None or {value} is False)"
+
+    def visit_binary_expr(self, expr):
+        """Translates a binary expression. An
+        operand that is a number literal needs no
+        check, and a local variable is read in place
+        unless the other operand could change it.
+        """
+        operator = expr.operator.get_token_type()
+        left = self.expression(expr.left)
+        right = self.expression(expr.right)
+        if operator in EQUALITIES:
+            return f"({left} {EQUALITIES[operator]} {right})"
+
+        symbol = '+' if operator == 'PLUS' else ARITHMETIC.get(operator) or COMPARISONS[operator]
+        error = f"fail({self.constant(expr.operator)}, \"Operands must be numbers.\")"
+        if operator == 'PLUS':
+            error = f"fail({self.constant(expr.operator)}, \"Operands must be two numbers or two strings.\")"
+
+        checks = []
+        operands = []
+        for operand, source, temporary in ((expr.left, left, 'a'), (expr.right, right, 'b')):
+            if isinstance(operand, Literal) and type(operand.value) is float:
+                operands.append(source)
+            elif isinstance(operand, Variable) and operand.access == LOCAL and (temporary == 'b' or is_simple(expr.right)):
+                operands.append(source)
+                checks.append(source)
+            else:
+                operands.append(self.temporary(temporary))
+                checks.append(f"{self.temporary(temporary)} := {source}")
+        if len(checks) == 0:
+            return f"({operands[0]} {symbol} {operands[1]})"
+        result = f"{operands[0]} {symbol} {operands[1]}"
+        if len(checks) == 1:
+            return f"({result} if type({checks[0]}) is float else {error})"
+        kinds = 'in ADDABLE' if operator == 'PLUS' else 'is float'
+        return f"({result} if type({checks[0]}) is type({checks[1]}) {kinds} else {error})"
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,452 @@
+from Bytecode import *
+from BytecodeCompiler import BytecodeCompiler
+from Environment import Cell, UNDEFINED
+from LoxCallable import LoxCallable
+from LoxClass import LoxClass
+from LoxError import runtime_error, LoxException as RuntimeException
+from LoxInstance import LoxInstance
+from Shape import find_property, find_field
+
+# Deepest nesting of Lox calls before the
+# machine reports a stack overflow.
+FRAMES_MAX = 10000
+
+class VMFunction(LoxCallable):
+    __slots__ = ('chunk', 'upvalues', 'receiver')
+
+    def __init__(self, chunk, upvalues = (), receiver = None):
+        """Initializes a VMFunction object, a
+        compiled function with the cells it
+        captured and, for a bound method, the
+        instance in its first slot.
+        >>> str(VMFunction(Chunk('f', 1)))
+        '<fn f>'
+        """
+        self.chunk = chunk
+        self.upvalues = upvalues
+        self.receiver = receiver
+
+    def arity(self):
+        """Returns the number of parameters.
+        """
+        return self.chunk.arity
+
+    def call(self, machine, arguments):
+        """Runs the function to completion on
+        machine, a VirtualMachine.
+        """
+        return machine.call_value(self, arguments)
+
+    def bind(self, instance):
+        """Returns this method bound
+        to instance.
+        """
+        return VMFunction(self.chunk, self.upvalues, instance)
+
+    def __str__(self):
+        """Returns a human readable string
+        representing the function.
+        """
+        return str(self.chunk)
+
+class CallFrame:
+    __slots__ = ('function', 'ip', 'base', 'top')
+
+    def __init__(self, function, base, top):
+        """Initializes a CallFrame object for
+        a running function: the position of its
+        next instruction, the stack index of its
+        first slot, and the stack index the stack
+        is cut back to when it returns.
+        """
+        self.function = function
+        self.ip = 0
+        self.base = base
+        self.top = top
+
+class VirtualMachine:
+    def __init__(self, interpreter):
+        """Initializes a VirtualMachine object,
+        an execution backend running the Chunks of
+        the BytecodeCompiler on an explicit value
+        stack and call frame stack, so Lox calls
+        never recurse in Python. The globals and
+        the printing of values are the ones of
+        interpreter.
+        >>> from Interpreter import Interpreter
+        >>> from Parser import Parser
+        >>> from Resolver import Resolver
+        >>> from Scanner import Scanner
+        >>> source = '''
+        ... fun count(n) { if (n == 0) return 0; return 1 + count(n - 1); }
+        ... class A { init(x) { this.x = x; } get() { return this.x; } }
+        ... class B < A { get() { fun twice() { return super.get() * 2; } return twice; } }
+        ... print count(5000) + B(21).get()();'''
+        >>> tree = Parser(Scanner(source).get_tokens()).parse()
+        >>> interpreter = Interpreter(tree)
+        >>> Resolver(interpreter).resolve(tree)
+        >>> VirtualMachine(interpreter).interpret(tree)
+        5042
+        """
+        self.interpreter = interpreter
+        self.globals = interpreter.globals.values
+        self.stack = []
+        self.frames = []
+
+    def interpret(self, statements):
+        """Compiles statements and runs them,
+        reporting runtime errors like the
+        interpreter does.
+        """
+        chunk = BytecodeCompiler().compile(statements)
+        if chunk == None:
+            return None
+        try:
+            self.call_value(VMFunction(chunk), [])
+        except RuntimeException as error:
+            runtime_error(error)
+
+    def call_value(self, function, arguments):
+        """Calls a VMFunction with arguments
+        and runs until it returns its value.
+        """
+        floor = len(self.frames)
+        self.stack.append(function)
+        self.stack.extend(arguments)
+        self.push_frame(function, len(self.stack) - 1 - len(arguments))
+        return self.run(floor)
+
+    def push_frame(self, function, top):
+        """Starts a call of function, whose
+        callee sits at stack index top with the
+        arguments above it. A bound method gets
+        its instance in the callee's place, as
+        slot 0, and captured parameters are boxed.
+        A method read by GET_METHOD is unbound and
+        has its instance right above it, which
+        becomes slot 0 in the same way as the first
+        argument of a function.
+        """
+        stack = self.stack
+        if function.receiver != None:
+            stack[top] = function.receiver
+            base = top
+        else:
+            base = top + 1
+        for slot in function.chunk.cells:
+            stack[base + slot] = Cell(stack[base + slot])
+        frame = CallFrame(function, base, top)
+        self.frames.append(frame)
+        return frame
+
+    def run(self, floor):
+        """Runs instructions until the frame
+        stack shrinks back to floor frames, and
+        returns the value of the last return.
+        """
+        stack = self.stack
+        frames = self.frames
+        global_values = self.globals
+        stringify = self.interpreter.stringify
+        push = stack.append
+        pop = stack.pop
+
+        frame = frames[-1]
+        function = frame.function
+        chunk = function.chunk
+        code = chunk.code
+        constants = chunk.constants
+        upvalues = function.upvalues
+        base = frame.base
+        ip = frame.ip
+
+        while True:
+            op = code[ip]
+            if op == GET_LOCAL:
+                push(stack[base + code[ip + 1]])
+                ip += 2
+            elif op == CONSTANT:
+                push(constants[code[ip + 1]])
+                ip += 2
+            elif op == GET_GLOBAL:
+                value = global_values[code[ip + 1]]
+                if value is UNDEFINED:
+                    name = chunk.tokens[ip]
+                    raise RuntimeException(name, f"Undefined variable \'{name.get_lexeme()}\'")
+                push(value)
+                ip += 2
+            elif op == POP_JUMP_IF_FALSE:
+                value = pop()
+                if value is None or value is False:
+                    ip += 2 + code[ip + 1]
+                else:
+                    ip += 2
+            elif op == LESS:
+                b = pop()
+                a = stack[-1]
+                if type(a) is not float or type(b) is not float:
+                    raise RuntimeException(chunk.tokens[ip], "Operands must be numbers.")
+                stack[-1] = a < b
+                ip += 1
+            elif op == ADD:
+                b = pop()
+                a = stack[-1]
+                if (type(a) is float and type(b) is float) or (type(a) is str and type(b) is str):
+                    stack[-1] = a + b
+                else:
+                    raise RuntimeException(chunk.tokens[ip], "Operands must be two numbers or two strings.")
+                ip += 1
+            elif op == SUBTRACT:
+                b = pop()
+                a = stack[-1]
+                if type(a) is not float or type(b) is not float:
+                    raise RuntimeException(chunk.tokens[ip], "Operands must be numbers.")
+                stack[-1] = a - b
+                ip += 1
+            elif op == CALL or op == INVOKE:
+                count = code[ip + 1]
+                top = len(stack) - 1 - count
+                if op == INVOKE:
+                    top -= 1
+                    if stack[top + 1] is None:
+                        del stack[top + 1]
+                callee = stack[top]
+                if len(frames) == FRAMES_MAX:
+                    raise RuntimeException(chunk.tokens[ip], "Stack overflow.")
+                if type(callee) is VMFunction:
+                    if count != callee.chunk.arity:
+                        raise RuntimeException(chunk.tokens[ip], f"Expected {callee.chunk.arity} arguments but got {count}")
+                    frame.ip = ip + 2
+                    frame = self.push_frame(callee, top)
+                elif type(callee) is LoxClass:
+                    instance = LoxInstance(callee)
+                    initializer = callee.initializer
+                    if count != callee.initializer_arity:
+                        raise RuntimeException(chunk.tokens[ip], f"Expected {callee.initializer_arity} arguments but got {count}")
+                    stack[top] = instance
+                    if initializer == None:
+                        ip += 2
+                        continue
+                    frame.ip = ip + 2
+                    frame = self.push_frame(initializer.bind(instance), top)
+                elif isinstance(callee, LoxCallable):
+                    if count != callee.arity():
+                        raise RuntimeException(chunk.tokens[ip], f"Expected {callee.arity()} arguments but got {count}")
+                    arguments = stack[top + 1:]
+                    del stack[top:]
+                    push(callee.call(self, arguments))
+                    ip += 2
+                    continue
+                else:
+                    raise RuntimeException(chunk.tokens[ip], "Can only call functions and classes")
+                function = frame.function
+                chunk = function.chunk
+                code = chunk.code
+                constants = chunk.constants
+                upvalues = function.upvalues
+                base = frame.base
+                ip = 0
+            elif op == RETURN:
+                value = pop()
+                frames.pop()
+                del stack[frame.top:]
+                push(value)
+                if len(frames) == floor:
+                    return pop()
+                frame = frames[-1]
+                function = frame.function
+                chunk = function.chunk
+                code = chunk.code
+                constants = chunk.constants
+                upvalues = function.upvalues
+                base = frame.base
+                ip = frame.ip
+            elif op == SET_LOCAL:
+                stack[base + code[ip + 1]] = stack[-1]
+                ip += 2
+            elif op == POP:
+                pop()
+                ip += 1
+            elif op == LOOP:
+                ip += 2 - code[ip + 1]
+            elif op == JUMP:
+                ip += 2 + code[ip + 1]
+            elif op == GET_PROPERTY:
+                instance = stack[-1]
+                if not isinstance(instance, LoxInstance):
+                    raise RuntimeException(chunk.tokens[ip], "Only instances have properties.")
+                cache = constants[code[ip + 1]]
+                shape = instance.shape
+                if shape is cache.key:
+                    cache.hits += 1
+                    found = cache.value
+                else:
+                    found = cache.lookup(shape, find_property)
+                    if found == None:
+                        raise RuntimeException(chunk.tokens[ip], f"Undefined property {cache.name}.")
+                if type(found) is int:
+                    stack[-1] = instance.values[found]
+                else:
+                    stack[-1] = found.bind(instance)
+                ip += 2
+            elif op == GET_METHOD:
+                instance = stack[-1]
+                if not isinstance(instance, LoxInstance):
+                    raise RuntimeException(chunk.tokens[ip], "Only instances have properties.")
+                cache = constants[code[ip + 1]]
+                shape = instance.shape
+                if shape is cache.key:
+                    cache.hits += 1
+                    found = cache.value
+                else:
+                    found = cache.lookup(shape, find_property)
+                    if found == None:
+                        raise RuntimeException(chunk.tokens[ip], f"Undefined property {cache.name}.")
+                if type(found) is int:
+                    stack[-1] = instance.values[found]
+                    push(None)
+                else:
+                    stack[-1] = found
+                    push(instance)
+                ip += 2
+            elif op == SET_PROPERTY:
+                value = pop()
+                instance = stack[-1]
+                if not isinstance(instance, LoxInstance):
+                    raise RuntimeException(chunk.tokens[ip], "Only instances have fields.")
+                cache = constants[code[ip + 1]]
+                shape = instance.shape
+                if shape is cache.key:
+                    cache.hits += 1
+                    target = cache.value
+                else:
+                    target = cache.lookup(shape, find_field)
+                if type(target) is int:
+                    instance.values[target] = value
+                else:
+                    instance.shape = target
+                    instance.values.append(value)
+                stack[-1] = value
+                ip += 2
+            elif op == GET_UPVALUE:
+                push(upvalues[code[ip + 1]].value)
+                ip += 2
+            elif op == GET_CELL:
+                push(stack[base + code[ip + 1]].value)
+                ip += 2
+            elif op == SET_UPVALUE:
+                upvalues[code[ip + 1]].value = stack[-1]
+                ip += 2
+            elif op == SET_CELL:
+                stack[base + code[ip + 1]].value = stack[-1]
+                ip += 2
+            elif op == SET_GLOBAL:
+                slot = code[ip + 1]
+                if global_values[slot] is UNDEFINED:
+                    name = chunk.tokens[ip]
+                    raise RuntimeException(name, f"Undefined variable \'{name.get_lexeme()}\'")
+                global_values[slot] = stack[-1]
+                ip += 2
+            elif op == DEFINE_GLOBAL:
+                global_values[code[ip + 1]] = pop()
+                ip += 2
+            elif op == MULTIPLY or op == DIVIDE or op == GREATER or op == GREATER_EQUAL or op == LESS_EQUAL:
+                b = pop()
+                a = stack[-1]
+                if type(a) is not float or type(b) is not float:
+                    raise RuntimeException(chunk.tokens[ip], "Operands must be numbers.")
+                if op == MULTIPLY:
+                    stack[-1] = a * b
+                elif op == DIVIDE:
+                    stack[-1] = a / b
+                elif op == GREATER:
+                    stack[-1] = a > b
+                elif op == GREATER_EQUAL:
+                    stack[-1] = a >= b
+                else:
+                    stack[-1] = a <= b
+                ip += 1
+            elif op == EQUAL or op == NOT_EQUAL:
+                b = pop()
+                a = stack[-1]
+                equal = (b is None) if a is None else a == b
+                stack[-1] = equal if op == EQUAL else not equal
+                ip += 1
+            elif op == NIL:
+                push(None)
+                ip += 1
+            elif op == TRUE:
+                push(True)
+                ip += 1
+            elif op == FALSE:
+                push(False)
+                ip += 1
+            elif op == NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value is False
+                ip += 1
+            elif op == NEGATE:
+                value = stack[-1]
+                if type(value) is not float:
+                    raise RuntimeException(chunk.tokens[ip], "Operand must be a number.")
+                stack[-1] = -value
+                ip += 1
+            elif op == JUMP_IF_FALSE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip += 2 + code[ip + 1]
+                else:
+                    ip += 2
+            elif op == JUMP_IF_TRUE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip += 2
+                else:
+                    ip += 2 + code[ip + 1]
+            elif op == POPN:
+                del stack[len(stack) - code[ip + 1]:]
+                ip += 2
+            elif op == PRINT:
+                print(stringify(pop()))
+                ip += 1
+            elif op == CLOSURE:
+                prototype = constants[code[ip + 1]]
+                push(VMFunction(prototype, tuple(stack[base + source] if source >= 0 else upvalues[-1 - source] for source in prototype.upvalues)))
+                ip += 2
+            elif op == BOX:
+                stack[-1] = Cell(stack[-1])
+                ip += 1
+            elif op == MAKE_CELL:
+                push(Cell())
+                ip += 1
+            elif op == CHECK_INSTANCE:
+                if not isinstance(stack[-1], LoxInstance):
+                    raise RuntimeException(chunk.tokens[ip], "Only instances have fields.")
+                ip += 1
+            elif op == GET_SUPER:
+                superclass = pop()
+                name = constants[code[ip + 1]]
+                method = superclass.find_method(name)
+                if method == None:
+                    raise RuntimeException(chunk.tokens[ip], f"Undefined property \'{name}\'")
+                stack[-1] = method.bind(stack[-1])
+                ip += 2
+            elif op == CLASS:
+                superclass = stack[-1].value if code[ip + 2] == 1 else None
+                push(LoxClass(constants[code[ip + 1]], superclass, {}))
+                ip += 3
+            elif op == METHOD:
+                method = pop()
+                stack[-1].add_method(constants[code[ip + 1]], method)
+                ip += 2
+            elif op == SUPERCLASS:
+                if not isinstance(stack[-1], LoxClass):
+                    raise RuntimeException(chunk.tokens[ip], "Superclass must be a class")
+                stack[-1] = Cell(stack[-1])
+                ip += 1
+            else:
+                raise ValueError(f"unknown opcode {op}")
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()